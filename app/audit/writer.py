@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from typing import Callable, Deque, List
+from uuid import UUID
+
+import structlog
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import Config
+from app.db import AsyncCustomSessionLocal
+from app.db.bulk import bulk_insert
+from app.metrics import registry
+from app.models.audit_log import AuditLogEvent, EventType
+
+logger = structlog.getLogger(__name__)
+
+# What happens to an event recorded while the queue is full.
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+
+class AuditLogWriter:
+    """Writes audit log events in batches from a background task, so recording an event never waits on the database.
+
+    Events are held in a bounded queue until either `batch_size` events are waiting or `flush_interval` seconds
+    have passed, then written with one multi-row INSERT per batch. Recording an event only appends it to the
+    queue, so requests take the same time however many events are being written.
+
+    When the queue is full an event is dropped rather than making the request wait. `overflow` sets whether the
+    new event, or the oldest queued event, is dropped. Dropped events are counted and logged.
+
+    Events are held in memory by each worker process until they are written, any still queued when the process
+    is killed are lost. stop() writes every queued event, so a graceful shutdown loses none.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow: str = DROP_NEWEST,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown audit log overflow policy {overflow}, expected one of {OVERFLOW_POLICIES}"
+            )
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        # Events can be recorded from threads other than the event loop's, i.e. by synchronous dependencies.
+        self._queue: Deque[AuditLogEvent] = deque()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._batch_ready: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+        self.written = registry.counter(
+            "audit.events.written", "Audit log events written to the database"
+        )
+        self.dropped = registry.counter(
+            "audit.events.dropped",
+            "Audit log events dropped as the queue was full or they could not be written",
+        )
+        self.flush_errors = registry.counter(
+            "audit.flush.errors", "Batches of audit log events which failed to write"
+        )
+        self.flush_duration = registry.timer(
+            "audit.flush.duration", "Time taken to write a batch of audit log events"
+        )
+        registry.gauge(
+            "audit.queue.depth",
+            "Audit log events waiting to be written",
+            lambda: len(self),
+        )
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def record(
+        self,
+        event_type: EventType,
+        username: str | None = None,
+        case_id: UUID | None = None,
+    ) -> None:
+        """Queue an event to be written, returning straight away."""
+        event = AuditLogEvent(event_type=event_type, username=username, case_id=case_id)
+        with self._lock:
+            if len(self._queue) >= self.max_size:
+                self.dropped.inc()
+                if self.overflow == DROP_NEWEST:
+                    logger.warning(
+                        "Audit log queue full, dropped event",
+                        event_type=event_type.value,
+                    )
+                    return
+                dropped = self._queue.popleft()
+                logger.warning(
+                    "Audit log queue full, dropped oldest event",
+                    event_type=dropped.event_type.value,
+                )
+            self._queue.append(event)
+            batch_ready = len(self._queue) >= self.batch_size
+        if batch_ready and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._batch_ready.set)
+
+    def _take_batch(self) -> List[AuditLogEvent]:
+        with self._lock:
+            return [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+
+    async def flush(self) -> None:
+        """Write every queued event, a batch at a time.
+
+        A batch which fails to write is logged and dropped, rather than retried, so a failing database cannot
+        fill the queue with events which will never be written.
+        """
+        while batch := self._take_batch():
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as session:
+                    await session.run_sync(bulk_insert, batch)
+                    await session.commit()
+            except Exception:
+                self.flush_errors.inc()
+                self.dropped.inc(len(batch))
+                logger.exception("Failed to write audit log events", events=len(batch))
+                continue
+            self.flush_duration.observe(time.perf_counter() - start)
+            self.written.inc(len(batch))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), timeout=self.flush_interval
+                )
+            except TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start writing events from a background task on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task, once it has written any events which are still queued.
+
+        The task is woken rather than cancelled, so a batch which is being written is not lost.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+        self._loop = self._task = self._batch_ready = None
+        await self.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queue.clear()
+
+
+audit_log_writer = AuditLogWriter(
+    AsyncCustomSessionLocal,
+    max_size=Config.AUDIT_QUEUE_SIZE,
+    batch_size=Config.AUDIT_BATCH_SIZE,
+    flush_interval=Config.AUDIT_FLUSH_INTERVAL,
+    overflow=Config.AUDIT_QUEUE_OVERFLOW,
+)
@@ -0,0 +1,225 @@
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import jwt
+import structlog
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.exceptions import InvalidTokenError
+
+from app.config import Config
+from app.metrics import registry
+
+logger = structlog.getLogger(__name__)
+
+# Algorithms tokens can be signed with using a key pair, so they can be verified without the private key.
+SIGNING_ALGORITHMS = ("RS256", "EdDSA")
+# Used to sign tokens with the SECRET_KEY when no signing key is configured.
+SECRET_KEY_ALGORITHM = "HS256"
+RSA_KEY_SIZE = 2048
+
+
+def public_jwk(key: jwt.PyJWK) -> dict:
+    """The public part of a key, as a JWK which can be published to the services verifying tokens."""
+    key_obj = key.key
+    if hasattr(key_obj, "public_key"):
+        key_obj = key_obj.public_key()
+    jwk = key.Algorithm.to_jwk(key_obj, as_dict=True)
+    jwk.update({"kid": key.key_id, "alg": key.algorithm_name, "use": "sig"})
+    return jwk
+
+
+def generate_signing_key(kid: str, algorithm: str = "RS256") -> dict:
+    """A new private key, as a JWK to be written to a signing key file."""
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(key, as_dict=True)
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+        jwk = jwt.algorithms.OKPAlgorithm.to_jwk(key, as_dict=True)
+    else:
+        raise ValueError(
+            f"Unknown signing algorithm {algorithm}, expected one of {SIGNING_ALGORITHMS}"
+        )
+    jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+    return jwk
+
+
+def parse_jwk(data: dict, private: bool = False) -> jwt.PyJWK:
+    key = jwt.PyJWK(data)
+    if key.key_id is None:
+        raise ValueError("Signing keys must have a kid")
+    if key.algorithm_name not in SIGNING_ALGORITHMS:
+        raise ValueError(
+            f"Key {key.key_id} uses {key.algorithm_name}, expected one of {SIGNING_ALGORITHMS}"
+        )
+    if private and not hasattr(key.key, "public_key"):
+        raise ValueError(f"Key {key.key_id} is not a private key")
+    return key
+
+
+def read_signing_key(path: str) -> jwt.PyJWK:
+    with open(path) as file:
+        return parse_jwk(json.load(file), private=True)
+
+
+def read_jwks(path: str) -> Dict[str, jwt.PyJWK]:
+    with open(path) as file:
+        keys = [parse_jwk(data) for data in json.load(file)["keys"]]
+    return {key.key_id: key for key in keys}
+
+
+def write_key_file(path: str, data: dict) -> None:
+    """Replace a key file in a single step, so workers reloading it never read a partly written file."""
+    temp_path = f"{path}.tmp"
+    with open(
+        os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+    ) as file:
+        json.dump(data, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def file_version(path: str) -> Tuple[int, int, int]:
+    """Changes whenever the file is written or replaced, including by renaming a new file over it."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+class SigningKeys:
+    """The key access tokens are signed with, and the keys they are verified with, read from JWK files.
+
+    `signing_key_file` holds the private key as a JWK, including its `kid` and `alg`, which is added to the header
+    of each token. `jwks_file` holds the public keys tokens are verified with as a JWK set, the key used is picked by
+    the token's `kid`. Without a `jwks_file`, tokens are verified with the signing key.
+
+    Keys are parsed once and cached. Every `reload_interval` seconds, or sooner when a token has an unknown `kid`,
+    the files are checked and re-read if they have changed, so keys can be rotated without a restart. If a file
+    cannot be read the previous keys are kept.
+
+    Without a `signing_key_file`, tokens are signed and verified with `secret_key` using HS256, and have no `kid`.
+    """
+
+    def __init__(
+        self,
+        signing_key_file: str | None,
+        jwks_file: str | None,
+        reload_interval: float,
+        secret_key: str,
+    ):
+        self.signing_key_file = signing_key_file
+        self.jwks_file = jwks_file
+        self.reload_interval = reload_interval
+        self.secret_key = secret_key
+        self._signing_key: jwt.PyJWK | None = None
+        self._verification_keys: Dict[str, jwt.PyJWK] = {}
+        self._jwks: dict = {"keys": []}
+        self._versions: Dict[str, Tuple[int, int, int]] = {}
+        self._checked_at = 0.0
+
+        self.reload_errors = registry.counter(
+            "auth.keys.reload_errors", "Failed attempts to read the signing key files"
+        )
+        if self.enabled:
+            # Fail at start up rather than on the first request if the files cannot be read.
+            self._load(raise_errors=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether tokens are signed with a key pair, rather than the secret key."""
+        return self.signing_key_file is not None
+
+    def _files(self) -> List[str]:
+        return [path for path in (self.signing_key_file, self.jwks_file) if path]
+
+    def _load(self, raise_errors: bool = False) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            versions = {path: file_version(path) for path in self._files()}
+            if versions == self._versions:
+                return
+            signing_key = read_signing_key(self.signing_key_file)
+            if self.jwks_file:
+                verification_keys = read_jwks(self.jwks_file)
+            else:
+                # Verified with the public key, as RSA private keys cannot verify signatures.
+                verification_keys = {
+                    signing_key.key_id: jwt.PyJWK(public_jwk(signing_key))
+                }
+        except Exception:
+            if raise_errors:
+                raise
+            self.reload_errors.inc()
+            logger.exception("Failed to read the signing keys, keeping previous keys")
+            return
+        if signing_key.key_id not in verification_keys:
+            logger.warning(
+                "Signing key is not in the JWKS, tokens it signs cannot be verified",
+                kid=signing_key.key_id,
+            )
+        self._signing_key = signing_key
+        self._verification_keys = verification_keys
+        self._jwks = {"keys": [public_jwk(key) for key in verification_keys.values()]}
+        self._versions = versions
+        logger.info(
+            "Read signing keys",
+            kid=signing_key.key_id,
+            verification_kids=list(verification_keys),
+        )
+
+    def reload_if_changed(self, force: bool = False) -> None:
+        """Re-read the key files if they have changed, checking at most once every reload_interval seconds.
+
+        force checks straight away, unless the files were checked in the last second, so tokens with unknown
+        kids cannot be used to make every request read the files.
+        """
+        if not self.enabled:
+            return
+        since_checked = time.monotonic() - self._checked_at
+        if since_checked >= self.reload_interval or (force and since_checked >= 1):
+            self._load()
+
+    def jwks(self) -> dict:
+        """The public keys tokens can be verified with, as a JWK set."""
+        self.reload_if_changed()
+        return self._jwks
+
+    def encode(self, payload: dict) -> str:
+        if not self.enabled:
+            return jwt.encode(payload, self.secret_key, algorithm=SECRET_KEY_ALGORITHM)
+        self.reload_if_changed()
+        key = self._signing_key
+        return jwt.encode(
+            payload,
+            key.key,
+            algorithm=key.algorithm_name,
+            headers={"kid": key.key_id},
+        )
+
+    def decode(self, token: str) -> dict:
+        """Verify a token with the key named by its kid, returning its claims.
+
+        Raises:
+            InvalidTokenError: If the token is invalid, expired, or signed with an unknown key.
+        """
+        if not self.enabled:
+            return jwt.decode(token, self.secret_key, algorithms=[SECRET_KEY_ALGORITHM])
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            raise InvalidTokenError("Token has no kid")
+        self.reload_if_changed()
+        if kid not in self._verification_keys:
+            self.reload_if_changed(force=True)
+        key = self._verification_keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Token signed with unknown key {kid}")
+        # Only the key's own algorithm is accepted, so a token cannot choose how it is verified.
+        return jwt.decode(token, key.key, algorithms=[key.algorithm_name])
+
+
+signing_keys = SigningKeys(
+    Config.JWT_SIGNING_KEY_FILE,
+    Config.JWT_JWKS_FILE,
+    reload_interval=Config.JWT_KEYS_RELOAD_SECONDS,
+    secret_key=Config.SECRET_KEY,
+)
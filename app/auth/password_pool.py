@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import Config
+from app.metrics import registry
+
+
+class PasswordPoolSaturatedError(Exception):
+    """Raised when the password hashing pool has no free workers or queue slots."""
+
+
+class PasswordHashingPool:
+    """Runs argon2 password hashing and verification on a fixed number of worker threads.
+
+    Argon2 is deliberately slow and memory hungry, running it on the event loop would stop every other request
+    being served until it completes. The argon2 bindings release the GIL, so threads allow hashes to be computed
+    in parallel with requests.
+
+    At most `workers` hashes run at once, limiting the memory used to `workers * ARGON2_MEMORY_COST`.
+    A further `queue_size` calls can wait for a free worker, after which calls are rejected rather than queued,
+    so a burst of logins cannot build an unbounded backlog.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run the function on the pool and wait for its result.
+
+        Raises:
+            PasswordPoolSaturatedError: If every worker is busy and the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            registry.counter(
+                "auth.password_pool.rejected",
+                "Password hashes rejected as the pool was full",
+            ).inc()
+            raise PasswordPoolSaturatedError()
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(function, *args)
+        # The slot is released when the hash completes, even if the request waiting for it has been cancelled.
+        future.add_done_callback(self._release)
+        with registry.timer(
+            "auth.password_pool.duration",
+            "Time taken to hash a password, including time queued",
+        ).time():
+            return await asyncio.wrap_future(future)
+
+
+password_pool = PasswordHashingPool(
+    workers=Config.PASSWORD_HASH_WORKERS, queue_size=Config.PASSWORD_HASH_QUEUE_SIZE
+)
+registry.gauge(
+    "auth.password_pool.in_flight",
+    "Password hashes running or waiting for a worker",
+    lambda: password_pool.in_flight,
+)
@@ -0,0 +1,115 @@
+import hashlib
+import secrets
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+import structlog
+from sqlalchemy import Row, delete, update
+from sqlmodel import Session
+
+from app.config import Config
+from app.metrics import registry
+from app.models.refresh_tokens import RefreshToken
+
+logger = structlog.getLogger(__name__)
+
+logins = registry.counter(
+    "auth.tokens.login", "Access tokens issued by logging in with a password"
+)
+refreshes = registry.counter(
+    "auth.tokens.refresh", "Access tokens issued in exchange for a refresh token"
+)
+rejected = registry.counter(
+    "auth.refresh_tokens.rejected",
+    "Refresh tokens which were unknown, expired, revoked or already used",
+)
+reused = registry.counter(
+    "auth.refresh_tokens.reused",
+    "Refresh tokens sent again after being used, revoking every token from the same login",
+)
+
+
+def _now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are random, rather than chosen by users, so a fast hash cannot be used to guess them."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(
+    session: Session,
+    username: str,
+    family_id: UUID | None = None,
+    expires_at: datetime | None = None,
+) -> str:
+    """Add a new refresh token to the session, returning the token to send to the client.
+
+    Without a family_id the token starts a new family, for a login, and expires after REFRESH_TOKEN_EXPIRE_HOURS.
+    Tokens are not removed as they are used, but rows which have expired are removed whenever a family is started.
+    """
+    if family_id is None:
+        family_id = uuid4()
+        session.execute(delete(RefreshToken).where(RefreshToken.expires_at <= _now()))
+    if expires_at is None:
+        expires_at = _now() + timedelta(hours=Config.REFRESH_TOKEN_EXPIRE_HOURS)
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            username=username,
+            expires_at=expires_at,
+        )
+    )
+    return token
+
+
+def use_refresh_token(session: Session, token: str) -> Row | None:
+    """Mark a refresh token as used, returning its family_id, username and expires_at if it could be exchanged.
+
+    Marking the token is a single UPDATE by primary key, so when the same token is sent twice at once only one
+    request succeeds. If the token had already been used it may have been stolen, so every token in its family
+    is revoked, and the client must log in again.
+    """
+    token_hash = hash_refresh_token(token)
+    now = _now()
+    used = session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(
+            RefreshToken.family_id, RefreshToken.username, RefreshToken.expires_at
+        )
+    ).first()
+    if used is not None:
+        return used
+
+    rejected.inc()
+    previous = session.get(RefreshToken, token_hash)
+    if previous is not None and previous.used_at is not None:
+        reused.inc()
+        logger.warning(
+            "Used refresh token sent again, revoking its family",
+            username=previous.username,
+        )
+        revoke_refresh_tokens(session, previous.family_id)
+    return None
+
+
+def revoke_refresh_tokens(session: Session, family_id: UUID) -> None:
+    session.execute(delete(RefreshToken).where(RefreshToken.family_id == family_id))
+
+
+def revoke_refresh_token(session: Session, token: str, username: str) -> bool:
+    """Revoke a refresh token, and every token in its family, if it belongs to the user."""
+    refresh_token = session.get(RefreshToken, hash_refresh_token(token))
+    if refresh_token is None or refresh_token.username != username:
+        return False
+    revoke_refresh_tokens(session, refresh_token.family_id)
+    return True
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime
+from typing import Callable, Dict, FrozenSet, Hashable, Tuple
+
+import structlog
+from sqlalchemy import delete, select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.auth.user_cache import user_cache
+from app.config import Config
+from app.db import AsyncCustomSessionLocal
+from app.metrics import registry
+from app.models.revoked_tokens import RevokedToken
+from app.models.users import User
+
+logger = structlog.getLogger(__name__)
+
+
+def _read_revocations(
+    session: Session,
+) -> Tuple[FrozenSet[str], Dict[str, Hashable]]:
+    """The unexpired revoked token IDs, and the version of each user's authorisation by their username."""
+    now = datetime.now(UTC).replace(tzinfo=None)
+    revoked = session.scalars(
+        select(RevokedToken.jti).where(RevokedToken.expires_at > now)
+    )
+    users = session.execute(select(User.username, User.disabled, User.scopes))
+    versions = {
+        username: (disabled, tuple(scopes or ()))
+        for username, disabled, scopes in users
+    }
+    return frozenset(revoked), versions
+
+
+class RevocationList:
+    """The IDs of revoked access tokens and the usernames of disabled users, held in memory by each worker.
+
+    Both are read from the database every `refresh_interval` seconds by a background task, so checking a token
+    needs no database access. A token revoked by this worker applies straight away, changes made by other
+    processes apply once the list is next refreshed.
+
+    Each refresh also removes users whose scopes or disabled flag have changed, or who have been deleted, from the
+    user cache, so changes made by other processes, such as the management commands, apply to cached users
+    within `refresh_interval` seconds rather than USER_CACHE_TTL.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+        refresh_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.revoked_tokens: FrozenSet[str] = frozenset()
+        self.disabled_users: FrozenSet[str] = frozenset()
+        self.user_versions: Dict[str, Hashable] = {}
+        self.refreshed_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+        self.refresh_errors = registry.counter(
+            "auth.revocation_list.refresh_errors",
+            "Failed attempts to read the revoked tokens and disabled users",
+        )
+        registry.gauge(
+            "auth.revocation_list.age",
+            "Seconds since the revoked tokens and disabled users were last read",
+            lambda: time.monotonic() - self.refreshed_at if self.refreshed_at else 0,
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self.revoked_tokens
+
+    def is_disabled(self, username: str) -> bool:
+        return username in self.disabled_users
+
+    def is_known(self, username: str) -> bool:
+        """Whether the user existed when the list was last refreshed."""
+        return username in self.user_versions
+
+    async def revoke(
+        self, session: AsyncSession, jti: str, username: str, expires_at: datetime
+    ) -> None:
+        """Revoke an access token, removing the tokens revoked by any user which have since expired."""
+        session.add(RevokedToken(jti=jti, username=username, expires_at=expires_at))
+        await session.exec(
+            delete(RevokedToken).where(
+                RevokedToken.expires_at <= datetime.now(UTC).replace(tzinfo=None)
+            )
+        )
+        await session.commit()
+        self.revoked_tokens = self.revoked_tokens | {jti}
+
+    async def refresh(self) -> None:
+        """Read the revoked tokens and disabled users. On failure the previous sets are kept."""
+        try:
+            async with self.session_factory() as session:
+                revoked, user_versions = await session.run_sync(_read_revocations)
+        except Exception:
+            self.refresh_errors.inc()
+            logger.exception("Failed to read the revoked tokens and disabled users")
+            return
+        if self.loaded:
+            for username in self.user_versions.keys() | user_versions.keys():
+                if self.user_versions.get(username) != user_versions.get(username):
+                    user_cache.invalidate(username)
+        self.revoked_tokens = revoked
+        self.disabled_users = frozenset(
+            username for username, (disabled, _) in user_versions.items() if disabled
+        )
+        self.user_versions = user_versions
+        self.refreshed_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Read the list, then keep it up to date from a background task on the running event loop."""
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList(
+    AsyncCustomSessionLocal, refresh_interval=Config.AUTH_REVOCATION_REFRESH_SECONDS
+)
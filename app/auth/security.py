@@ -1,26 +1,35 @@
 from typing import Annotated
 from datetime import timezone, timedelta, datetime
+import uuid
 
 from passlib.hash import argon2
-import jwt
 from jwt.exceptions import InvalidTokenError
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from fastapi import HTTPException, Depends, status, Security
 from app.models.users import User, TokenData
+from app.models.audit_log import EventType
+from app.audit.writer import audit_log_writer
+from app.auth.user_cache import get_cached_user, cache_user
+from app.auth.password_pool import password_pool
+from app.auth.revocation import revocation_list
+from app.auth.keys import signing_keys
 from app.config import Config
-from app.db import get_session
-from sqlmodel import Session
+from app.db import get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 import logging
 
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-SECRET_KEY = Config.SECRET_KEY
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/latest/token")
+password_hasher = argon2.using(
+    rounds=Config.ARGON2_TIME_COST,
+    memory_cost=Config.ARGON2_MEMORY_COST,
+    parallelism=Config.ARGON2_PARALLELISM,
+)
 
 
 def verify_password(plain_password, hashed_password):
-    return argon2.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
@@ -34,7 +43,7 @@ def get_password_hash(password):
         password: Returns a hashed and salted password using
         passlib argon2.
     """
-    return argon2.hash(password)
+    return password_hasher.hash(password)
 
 
 def authenticate_user(session, username: str, password: str) -> str | User | bool:
@@ -54,9 +63,46 @@ def authenticate_user(session, username: str, password: str) -> str | User | boo
     """
     user = session.get(User, username)
     if not user:
+        audit_log_writer.record(EventType.user_wrong_password)
         return False
     if not verify_password(password, user.hashed_password):
+        audit_log_writer.record(EventType.user_wrong_password, username=username)
         return False
+    audit_log_writer.record(EventType.user_authenticated, username=username)
+    return user
+
+
+async def async_authenticate_user(
+    session: AsyncSession, username: str, password: str
+) -> User | bool:
+    """
+    Asyncio version of authenticate_user, used by the login endpoint.
+
+    The password is verified on the password hashing pool, so the event loop can continue serving
+    other requests while argon2 runs.
+
+    Raises:
+        PasswordPoolSaturatedError: If too many passwords are already being verified.
+    """
+    user = await session.get(User, username)
+    if not user:
+        audit_log_writer.record(EventType.user_wrong_password)
+        return False
+    if not await password_pool.run(verify_password, password, user.hashed_password):
+        audit_log_writer.record(EventType.user_wrong_password, username=username)
+        return False
+    audit_log_writer.record(EventType.user_authenticated, username=username)
+    return user
+
+
+async def get_user(session: AsyncSession, username: str) -> User | None:
+    """The user, from the user cache if they have been read recently, otherwise from the database."""
+    user = get_cached_user(username)
+    if user is None:
+        user = await session.get(User, username)
+        if user is None:
+            return None
+        user = cache_user(user)
     return user
 
 
@@ -87,19 +133,28 @@ def create_access_token(
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # jti identifies the token, so it can be revoked before it expires.
+    to_encode.update(
+        {"exp": expire, "iat": datetime.now(timezone.utc), "jti": uuid.uuid4().hex}
+    )
+    encoded_jwt = signing_keys.encode(to_encode)
     return encoded_jwt
 
 
 def token_decode(token: str) -> dict:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    """
+    Verifies a token with the key named by its kid header, or the secret key if no signing key is configured.
+
+    Raises:
+        InvalidTokenError: If the token is invalid, expired, or signed with an unknown key.
+    """
+    return signing_keys.decode(token)
 
 
 async def get_current_user(
     security_scopes: SecurityScopes,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
 ):
     """
     Checks the current user token to return a user.
@@ -107,7 +162,10 @@ async def get_current_user(
     Args:
         security_scopes:  Security scopes user should have access to.
         token: Uses the oauth2 scheme to get the current JWT.
-        session: Uses the session object to get the current user.
+        session: Uses the session object to get the current user, if they have not been cached.
+
+    With AUTH_VERIFICATION_MODE set to claims, and once the revocation list has been read, the user is built from
+    the token's claims, otherwise it is read from the database. Tokens revoked by their jti are always rejected.
 
     Returns:
         user: Returns the current user object by verifying against the JWT.
@@ -130,22 +188,37 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_decode(token)
         username: str = payload.get("sub")
         token_data = TokenData(username=username)
     except InvalidTokenError:
         logging.warning(f"Invalid Token Authorisation on token {token}")
         raise credentials_exception
-    user = session.get(User, token_data.username)
-    if user is None:
+    if revocation_list.is_revoked(payload.get("jti")):
         raise credentials_exception
 
-    if security_scopes.scopes and not user.scopes:
-        raise scopes_exception
+    if (
+        Config.AUTH_VERIFICATION_MODE == "claims"
+        and revocation_list.loaded
+        and revocation_list.is_known(token_data.username)
+    ):
+        # The token's signature guarantees its scopes were those of the user when it was issued.
+        scopes = payload.get("scopes") or []
+        user = User(
+            username=token_data.username,
+            hashed_password="",
+            scopes=scopes,
+            disabled=revocation_list.is_disabled(token_data.username),
+        )
+    else:
+        # Users deleted, or created, since the list was refreshed are read from the database.
+        user = await get_user(session, token_data.username)
+        if user is None:
+            raise credentials_exception
+        scopes = user.scopes or []
 
-    for scope in security_scopes.scopes:
-        if scope not in user.scopes:
-            raise scopes_exception
+    if not set(security_scopes.scopes).issubset(scopes):
+        raise scopes_exception
 
     return user
 
@@ -0,0 +1,45 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.cache import TTLCache
+from app.config import Config
+from app.models.users import User
+
+# Usernames of users changed in a session, these are removed from the cache once the changes are committed.
+CHANGED_USERS_KEY = "changed_users"
+
+user_cache = TTLCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
+
+
+def get_cached_user(username: str) -> User | None:
+    return user_cache.get(username)
+
+
+def cache_user(user: User) -> User:
+    """Cache a copy of the user which is not attached to any session, so it can be shared between requests.
+
+    Returns:
+        User: The copy of the user which has been cached.
+    """
+    user_copy = User.model_validate(user, from_attributes=True)
+    user_cache.set(user.username, user_copy)
+    return user_copy
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, user: User) -> None:
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault(CHANGED_USERS_KEY, set()).add(user.username)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for username in session.info.pop(CHANGED_USERS_KEY, ()):
+        user_cache.invalidate(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(CHANGED_USERS_KEY, None)
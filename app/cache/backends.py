@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Set
+
+import structlog
+
+from app.metrics import registry
+
+logger = structlog.getLogger(__name__)
+
+
+class CacheBackend:
+    """Stores bytes by key for a cache, see LRUCacheBackend and RedisCacheBackend.
+
+    get and set are awaited by requests. delete is called by the session's after commit events, which run
+    synchronously, so it must not block on the network.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.evictions = registry.counter(
+            f"{name}.evictions", "Entries removed to make room for new entries"
+        )
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """Holds up to maxsize entries in each worker process, evicting the least recently used entry when full."""
+
+    def __init__(self, name: str, maxsize: int):
+        super().__init__(name)
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        registry.gauge(f"{name}.size", "Entries in the cache", lambda: len(self))
+
+    async def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shares entries between worker processes using Redis, or a Redis compatible server such as Valkey.
+
+    Entries expire after ttl seconds, evictions are made by the server so are not counted here.
+    The cache should never stop a request being served, so errors talking to the server are logged and treated
+    as cache misses.
+    """
+
+    def __init__(self, name: str, url: str, ttl: int, client: Any = None):
+        super().__init__(name)
+        if client is None:
+            # Only needed when the Redis backend is used.
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.errors = registry.counter(
+            f"{name}.errors", "Requests to the cache server which failed"
+        )
+        # Deletes are sent in the background, this keeps a reference to them until they complete.
+        self._deletes: Set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.client.get(key)
+        except Exception as error:
+            self._log_error("get", error)
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.client.set(key, value, ex=self.ttl)
+        except Exception as error:
+            self._log_error("set", error)
+
+    def delete(self, key: str) -> None:
+        """Send the delete in the background, when there is no event loop the entry is left to expire."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._delete(key))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+
+    async def _delete(self, key: str) -> None:
+        try:
+            await self.client.delete(key)
+        except Exception as error:
+            self._log_error("delete", error)
+
+    def clear(self) -> None:
+        raise NotImplementedError("Shared caches are not cleared by the API")
+
+    def _log_error(self, operation: str, error: Exception) -> None:
+        self.errors.inc()
+        logger.warning(
+            "Cache request failed",
+            cache=self.name,
+            operation=operation,
+            error=str(error),
+        )
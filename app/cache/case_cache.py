@@ -0,0 +1,112 @@
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import RelationshipDirection, Session, object_session
+from sqlmodel import SQLModel
+
+from app.cache.backends import CacheBackend, LRUCacheBackend, RedisCacheBackend
+from app.config import Config
+from app.metrics import registry
+from app.models.cases import Case
+
+# Ids of cases changed in a session, these are removed from the cache once the changes are committed.
+CHANGED_CASES_KEY = "changed_cases"
+
+
+class CaseCache:
+    """Caches the serialised response of each case, along with the ETag of the version it was serialised from.
+
+    An entry is only used if its ETag matches the case's current ETag, so a stale entry is never returned even if
+    it was not invalidated, i.e. when the case was changed by another worker process. Entries are invalidated when
+    changes to a case are committed, so they do not take up space once they are stale.
+    """
+
+    def __init__(self, backend: CacheBackend | None):
+        self.backend = backend
+        self.hits = registry.counter(
+            "cases.cache.hits", "Case reads served from the cache"
+        )
+        self.misses = registry.counter(
+            "cases.cache.misses", "Case reads which were not in the cache"
+        )
+        self.invalidations = registry.counter(
+            "cases.cache.invalidations", "Cases removed from the cache as they changed"
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def _key(case_id: UUID) -> str:
+        return f"case:{case_id}"
+
+    async def get(self, case_id: UUID, etag: str) -> bytes | None:
+        """The cached response of the case, if the cached version has the given ETag."""
+        entry = await self.backend.get(self._key(case_id))
+        if entry is not None:
+            cached_etag, _, body = entry.partition(b"\n")
+            if cached_etag.decode() == etag:
+                self.hits.inc()
+                return body
+        self.misses.inc()
+        return None
+
+    async def set(self, case_id: UUID, etag: str, body: bytes) -> None:
+        await self.backend.set(self._key(case_id), etag.encode() + b"\n" + body)
+
+    def invalidate(self, case_id: UUID) -> None:
+        if self.backend is not None:
+            self.invalidations.inc()
+            self.backend.delete(self._key(case_id))
+
+
+def create_backend(config) -> CacheBackend | None:
+    if config.CASE_CACHE_BACKEND == "memory":
+        return LRUCacheBackend("cases.cache", maxsize=config.CASE_CACHE_SIZE)
+    if config.CASE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(
+            "cases.cache", url=config.CASE_CACHE_URL, ttl=config.CASE_CACHE_TTL
+        )
+    if config.CASE_CACHE_BACKEND == "none":
+        return None
+    raise ValueError(
+        f"Unknown CASE_CACHE_BACKEND {config.CASE_CACHE_BACKEND}, expected memory, redis or none"
+    )
+
+
+case_cache = CaseCache(create_backend(Config))
+
+
+def _record_changed_case(get_case_id: Callable[[SQLModel], UUID]):
+    def listener(mapper, connection, target: SQLModel) -> None:
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(CHANGED_CASES_KEY, set()).add(get_case_id(target))
+
+    return listener
+
+
+def _listen_for_changes(model: type[SQLModel], get_case_id: Callable[[SQLModel], UUID]):
+    listener = _record_changed_case(get_case_id)
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, listener)
+
+
+# A case's cached response includes its direct children, so changes to them also invalidate the case.
+_listen_for_changes(Case, lambda case: case.id)
+for _relationship in inspect(Case).relationships:
+    if _relationship.direction == RelationshipDirection.ONETOMANY:
+        [(_, _foreign_key)] = _relationship.local_remote_pairs
+        _listen_for_changes(
+            _relationship.mapper.class_,
+            lambda child, key=_foreign_key.key: getattr(child, key),
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_cases(session: Session) -> None:
+    for case_id in session.info.pop(CHANGED_CASES_KEY, ()):
+        case_cache.invalidate(case_id)
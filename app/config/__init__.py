@@ -17,9 +17,120 @@ class BaseConfig(object):
 
     DB_LOGGING = os.environ.get("DB_LOGGING", "False") == "True"
 
+    # Connection pool settings, these apply to each worker process.
+    # Connections in use can reach DB_POOL_SIZE + DB_MAX_OVERFLOW, after which requests wait up to
+    # DB_POOL_TIMEOUT seconds for a free connection.
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    # Connections older than this many seconds are replaced, -1 disables recycling.
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    # Test connections before use, so connections to a database which has failed over are replaced.
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "True") == "True"
+    # The most connections the API can open to Postgres across every worker process, checked when the server starts.
+    # When 0 the budget is read from the database's max_connections.
+    DB_CONNECTION_BUDGET = int(os.environ.get("DB_CONNECTION_BUDGET", "0"))
+
+    # Read only endpoints use these replicas when set, a comma separated list of postgresql:// URLs.
+    DB_READ_REPLICA_URLS = [
+        url.strip()
+        for url in os.environ.get("DB_READ_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    # How each read chooses a replica, round_robin or least_connections.
+    DB_READ_REPLICA_SELECTION = os.environ.get(
+        "DB_READ_REPLICA_SELECTION", "round_robin"
+    )
+    # Seconds a client reads from the primary after it writes, so it sees its own writes despite replica lag.
+    DB_READ_YOUR_WRITES_SECONDS = float(
+        os.environ.get("DB_READ_YOUR_WRITES_SECONDS", "5")
+    )
+
+    # Production server settings, see gunicorn.conf.py
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "2"))
+    SERVER_PORT = int(os.environ.get("SERVER_PORT", "8027"))
+    # Connections which can wait to be accepted while every worker is busy.
+    SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", "2048"))
+    # Seconds idle connections are kept open, this should be longer than the ingress keeps idle upstream connections.
+    SERVER_KEEPALIVE = int(os.environ.get("SERVER_KEEPALIVE", "75"))
+    # Workers are replaced after serving this many requests, plus up to the jitter so they are not all replaced at once.
+    SERVER_MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS", "10000"))
+    SERVER_MAX_REQUESTS_JITTER = int(
+        os.environ.get("SERVER_MAX_REQUESTS_JITTER", "1000")
+    )
+    # Seconds a worker being replaced or shut down has to finish the requests it is serving.
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30"))
+
+    # The most cases which can be sent to the bulk create endpoint in one request,
+    # and the number of cases inserted per transaction.
+    BULK_CREATE_MAX_CASES = int(os.environ.get("BULK_CREATE_MAX_CASES", "10000"))
+    BULK_CREATE_BATCH_SIZE = int(os.environ.get("BULK_CREATE_BATCH_SIZE", "500"))
+
     SENTRY_DSN = os.environ.get("SENTRY_DSN")
 
     SECRET_KEY = os.environ.get("SECRET_KEY", "TEST_KEY")
+    # Access tokens are signed with the private JWK in JWT_SIGNING_KEY_FILE, using RS256 or EdDSA, and verified with
+    # the public keys in the JWK set in JWT_JWKS_FILE, which is published at /.well-known/jwks.json.
+    # Without a signing key, tokens are signed with SECRET_KEY using HS256.
+    JWT_SIGNING_KEY_FILE = os.environ.get("JWT_SIGNING_KEY_FILE")
+    JWT_JWKS_FILE = os.environ.get("JWT_JWKS_FILE")
+    # Seconds between each worker checking the key files for changes, so rotated keys apply within this time.
+    JWT_KEYS_RELOAD_SECONDS = float(os.environ.get("JWT_KEYS_RELOAD_SECONDS", "60"))
+
+    # Authenticated users are cached by each worker. Changes to a user's scopes or disabled flag made by another
+    # process, such as the management commands, are picked up when the worker next reads the users, every
+    # AUTH_REVOCATION_REFRESH_SECONDS, and any other change within USER_CACHE_TTL seconds. Set to 0 to disable the cache.
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "60"))
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+
+    # How requests are authorised: "database" checks the user's scopes and whether they are disabled against the
+    # users table, cached as above. "claims" trusts the scopes signed into the access token and checks the user
+    # against the sets of existing and disabled users, so authorisation needs no database access.
+    AUTH_VERIFICATION_MODE = os.environ.get("AUTH_VERIFICATION_MODE", "database")
+    # Seconds between each worker reading the revoked tokens and disabled users, so revoking a token or disabling
+    # a user in another process takes up to this long to apply.
+    AUTH_REVOCATION_REFRESH_SECONDS = float(
+        os.environ.get("AUTH_REVOCATION_REFRESH_SECONDS", "30")
+    )
+    # Hours a refresh token, and every refresh token it is exchanged for, can be used after logging in, after which
+    # the user must log in with their password again.
+    REFRESH_TOKEN_EXPIRE_HOURS = float(
+        os.environ.get("REFRESH_TOKEN_EXPIRE_HOURS", "12")
+    )
+
+    # Responses of individual cases can be cached, either in each worker process ("memory"), or shared between
+    # processes using Redis or a Redis compatible server ("redis"). Not cached by default ("none").
+    CASE_CACHE_BACKEND = os.environ.get("CASE_CACHE_BACKEND", "none")
+    # The most cases held by each worker process when using the memory backend.
+    CASE_CACHE_SIZE = int(os.environ.get("CASE_CACHE_SIZE", "1024"))
+    CASE_CACHE_URL = os.environ.get("CASE_CACHE_URL", "redis://localhost:6379/0")
+    # Seconds cases are kept for by the redis backend.
+    CASE_CACHE_TTL = int(os.environ.get("CASE_CACHE_TTL", "3600"))
+    # Seconds case statistics are cached for by each worker process. Set to 0 to disable the cache.
+    CASE_STATS_CACHE_TTL = float(os.environ.get("CASE_STATS_CACHE_TTL", "60"))
+    # Cases read from the database, and held in memory, at once by GET /cases/export.
+    CASE_EXPORT_CHUNK_SIZE = int(os.environ.get("CASE_EXPORT_CHUNK_SIZE", "500"))
+
+    # Audit log events are queued by each worker and written in batches of up to AUDIT_BATCH_SIZE, at least every
+    # AUDIT_FLUSH_INTERVAL seconds. When AUDIT_QUEUE_SIZE events are waiting either the new event ("drop_newest")
+    # or the oldest waiting event ("drop_oldest") is dropped.
+    AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1"))
+    AUDIT_QUEUE_OVERFLOW = os.environ.get("AUDIT_QUEUE_OVERFLOW", "drop_newest")
+    # Used by the manage-audit-partitions command. Monthly partitions of the audit log are created this many months
+    # ahead, and partitions older than AUDIT_RETENTION_MONTHS are dropped.
+    AUDIT_PARTITIONS_AHEAD = int(os.environ.get("AUDIT_PARTITIONS_AHEAD", "3"))
+    AUDIT_RETENTION_MONTHS = int(os.environ.get("AUDIT_RETENTION_MONTHS", "24"))
+
+    # Argon2 parameters used when hashing new passwords, existing hashes are verified with the parameters they
+    # were created with. Each hash uses ARGON2_MEMORY_COST KiB of memory while it runs.
+    ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", "65536"))
+    ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", "4"))
+    # Number of passwords hashed at once per worker process, and the number of logins which can wait for them.
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", "8"))
 
     LOGGER_CONFIG = STRUCTURED_LOGGING
 
@@ -1,19 +1,107 @@
+from fastapi import Depends, Request
+from sqlalchemy import make_url
 from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import Config
 from sqlalchemy.orm import sessionmaker
-from app.db.session import CustomSession
+from app.db.pool import instrumented_pool_class, register_pool_metrics
+from app.db.replicas import ReplicaSelector, is_pinned_to_primary
+from app.db.session import CustomSession, AsyncCustomSession
+from app.metrics import registry
 
 
 db_url = f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+async_db_url = f"postgresql+asyncpg://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
 
-engine = create_engine(db_url, echo=Config.DB_LOGGING)
+pool_options = {
+    "pool_size": Config.DB_POOL_SIZE,
+    "max_overflow": Config.DB_MAX_OVERFLOW,
+    "pool_timeout": Config.DB_POOL_TIMEOUT,
+    "pool_recycle": Config.DB_POOL_RECYCLE,
+    "pool_pre_ping": Config.DB_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    db_url,
+    echo=Config.DB_LOGGING,
+    poolclass=instrumented_pool_class("sync", QueuePool),
+    **pool_options,
+)
+
+# Used by the API so database queries do not block the event loop while they wait on the database.
+# The synchronous engine is still used by migrations and management commands.
+async_engine = create_async_engine(
+    async_db_url,
+    echo=Config.DB_LOGGING,
+    poolclass=instrumented_pool_class("primary", AsyncAdaptedQueuePool),
+    **pool_options,
+)
+
+register_pool_metrics("sync", engine)
+register_pool_metrics("primary", async_engine.sync_engine)
+
+# Each replica has its own pool of up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per worker.
+read_replica_engines = [
+    create_async_engine(
+        make_url(url).set(drivername="postgresql+asyncpg"),
+        echo=Config.DB_LOGGING,
+        poolclass=instrumented_pool_class(f"replica_{index}", AsyncAdaptedQueuePool),
+        **pool_options,
+    )
+    for index, url in enumerate(Config.DB_READ_REPLICA_URLS)
+]
+for index, replica_engine in enumerate(read_replica_engines):
+    register_pool_metrics(f"replica_{index}", replica_engine.sync_engine)
+
+replica_selector = (
+    ReplicaSelector(read_replica_engines, Config.DB_READ_REPLICA_SELECTION)
+    if read_replica_engines
+    else None
+)
 
 
 CustomSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=CustomSession
 )
 
+# Instances are not expired on commit as reading expired attributes outside an awaited call is not possible.
+AsyncCustomSessionLocal = async_sessionmaker(
+    autoflush=False,
+    bind=async_engine,
+    class_=AsyncCustomSession,
+    expire_on_commit=False,
+)
+
 
 def get_session():
     with CustomSessionLocal() as db_session:
         yield db_session
+
+
+async def get_async_session():
+    async with AsyncCustomSessionLocal() as db_session:
+        yield db_session
+
+
+async def get_async_read_session(
+    request: Request, session: AsyncSession = Depends(get_async_session)
+):
+    """A session for endpoints which only read, using a read replica when any are configured.
+
+    Clients which wrote within the last DB_READ_YOUR_WRITES_SECONDS read from the primary, so they see their own
+    writes, see app.db.replicas.ReadYourWritesMiddleware. Sessions only connect when first used, so the unused
+    primary session does not take a connection.
+    """
+    if replica_selector is None or is_pinned_to_primary(request):
+        registry.counter(
+            "db.read_sessions.primary", "Read only sessions which used the primary"
+        ).inc()
+        yield session
+        return
+    registry.counter(
+        "db.read_sessions.replica", "Read only sessions which used a read replica"
+    ).inc()
+    async with AsyncCustomSessionLocal(bind=replica_selector.choose()) as read_session:
+        yield read_session
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List, Sequence
+from uuid import UUID
+from sqlalchemy import Table, insert, select
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import RelationshipDirection
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Session, SQLModel
+
+
+# The most ids sent in a single IN clause, SQLite allows at most 32766 parameters per statement.
+MAX_IN_IDS = 1000
+
+
+def collect_rows(instance: SQLModel, rows: Dict[Table, List[dict]]) -> None:
+    """Add the row for an unsaved instance, and the rows of the children attached to it, to rows.
+
+    Foreign keys to the parent are set on each child's row, as they would be when the session flushes
+    the relationship.
+    """
+    mapper = inspect(type(instance))
+    row = {
+        attribute.columns[0].name: getattr(instance, attribute.key)
+        for attribute in mapper.column_attrs
+    }
+    rows.setdefault(mapper.local_table, []).append(row)
+
+    for relationship in mapper.relationships:
+        if relationship.direction != RelationshipDirection.ONETOMANY:
+            continue
+        # Read from __dict__ so relationships which were not set are not lazy loaded
+        related = instance.__dict__.get(relationship.key)
+        if related is None:
+            continue
+        children = related if isinstance(related, list) else [related]
+        for child in children:
+            for parent_column, child_column in relationship.local_remote_pairs:
+                setattr(child, child_column.key, getattr(instance, parent_column.key))
+            collect_rows(child, rows)
+
+
+def bulk_insert(session: Session, instances: Sequence[SQLModel]) -> None:
+    """Insert unsaved instances, along with their children, using one executemany statement per table.
+
+    This bypasses the unit of work, so is much faster than adding each instance to the session,
+    but the instances are not attached to the session and the UUID4 collision handling of CustomSession.commit
+    does not apply. Parent tables are inserted before the tables which reference them.
+    """
+    rows: Dict[Table, List[dict]] = {}
+    for instance in instances:
+        collect_rows(instance, rows)
+    for table in SQLModel.metadata.sorted_tables:
+        if table in rows:
+            session.execute(insert(table), rows[table])
+
+
+def load_by_ids(
+    session: Session, model: type[SQLModel], ids: Iterable[UUID]
+) -> Dict[UUID, SQLModel]:
+    """Read the instances with the given ids using WHERE id IN (...), rather than a query for each instance.
+
+    Instances already in the session are not read again. Ids which do not exist are missing from the result.
+    """
+    instances = {}
+    missing = []
+    for instance_id in set(ids):
+        instance = session.identity_map.get(identity_key(model, instance_id))
+        if instance is not None:
+            instances[instance_id] = instance
+        else:
+            missing.append(instance_id)
+    for start in range(0, len(missing), MAX_IN_IDS):
+        statement = select(model).where(
+            model.id.in_(missing[start : start + MAX_IN_IDS])
+        )
+        for instance in session.scalars(statement):
+            instances[instance.id] = instance
+    return instances
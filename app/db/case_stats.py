@@ -0,0 +1,134 @@
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from sqlalchemy import Date, case, cast, func, literal_column, select, true
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+from app.cache import TTLCache
+from app.config import Config
+from app.models.case_adaptations import CaseAdaptations
+from app.models.case_notes import CaseNote
+from app.models.case_stats import (
+    CaseStatsResponse,
+    DateBucket,
+    DateBucketCount,
+    EligibilityOutcomeCount,
+    ValueCount,
+)
+from app.models.cases import Case
+from app.models.eligibility_outcomes import EligibilityOutcomes
+
+
+# Statistics are computed over every case, so are cached briefly rather than computed for every request.
+# Entries are held per worker process and are not invalidated when cases change.
+stats_cache = TTLCache(maxsize=128, ttl=Config.CASE_STATS_CACHE_TTL)
+
+
+def _value(value) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+def _bucket_start(dialect: str, bucket: DateBucket) -> ColumnElement:
+    """The first day of the bucket each case was created in."""
+    if dialect == "postgresql":
+        return cast(func.date_trunc(bucket.value, Case.created_at), Date)
+    if bucket == DateBucket.day:
+        return func.date(Case.created_at)
+    if bucket == DateBucket.week:
+        # The next Sunday on or after the date, less six days, is the Monday on or before it.
+        return func.date(Case.created_at, "weekday 0", "-6 days")
+    return func.date(Case.created_at, "start of month")
+
+
+def _array_elements(dialect: str, column: ColumnElement):
+    """A table of the values of a JSON array column, with a single column named value.
+
+    Columns which are not arrays, i.e. JSON null, have no values rather than raising an error.
+    """
+    json_type = func.json_typeof if dialect == "postgresql" else func.json_type
+    array = case((json_type(column) == "array", column), else_=literal_column("'[]'"))
+    if dialect == "postgresql":
+        return func.json_array_elements_text(array).table_valued("value")
+    return func.json_each(array).table_valued("value")
+
+
+def read_case_stats(
+    session: Session,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    bucket: DateBucket = DateBucket.month,
+) -> CaseStatsResponse:
+    """Count the cases, grouped by their type, eligibility outcomes, notes, adaptations, languages and the date
+    they were created on, with one GROUP BY query for each.
+
+    Only cases created in [created_after, created_before) are counted. Related rows are only joined to the cases
+    when filtering by date, so unfiltered counts read just the indexed columns of the related table.
+    """
+    dialect = session.get_bind().dialect.name
+    filters = []
+    if created_after:
+        filters.append(Case.created_at >= created_after)
+    if created_before:
+        filters.append(Case.created_at < created_before)
+
+    def grouped(*columns, model=Case):
+        statement = select(*columns, func.count()).select_from(model)
+        if filters and model is not Case:
+            statement = statement.join(Case, model.case_id == Case.id)
+        return session.execute(
+            statement.where(*filters).group_by(*columns).order_by(*columns)
+        ).all()
+
+    def counts(rows) -> List[ValueCount]:
+        return [ValueCount(value=_value(value), count=count) for value, count in rows]
+
+    total = session.execute(
+        select(func.count()).select_from(Case).where(*filters)
+    ).scalar_one()
+
+    json_arrays = {}
+    for name, column in (
+        ("adaptations", CaseAdaptations.needed_adaptations),
+        ("languages", CaseAdaptations.languages),
+    ):
+        elements = _array_elements(dialect, column)
+        statement = (
+            select(elements.c.value, func.count())
+            .select_from(CaseAdaptations)
+            .join(elements, true())
+        )
+        if filters:
+            statement = statement.join(Case, CaseAdaptations.case_id == Case.id)
+        json_arrays[name] = counts(
+            session.execute(
+                statement.where(*filters)
+                .group_by(elements.c.value)
+                .order_by(elements.c.value)
+            ).all()
+        )
+
+    start = _bucket_start(dialect, bucket).label("start")
+    return CaseStatsResponse(
+        total=total,
+        case_types=counts(grouped(Case.case_type)),
+        eligibility_outcomes=[
+            EligibilityOutcomeCount(
+                eligibility_type=_value(eligibility_type),
+                outcome=_value(outcome),
+                count=count,
+            )
+            for eligibility_type, outcome, count in grouped(
+                EligibilityOutcomes.eligibility_type,
+                EligibilityOutcomes.outcome,
+                model=EligibilityOutcomes,
+            )
+        ],
+        note_types=counts(grouped(CaseNote.note_type, model=CaseNote)),
+        created=[
+            DateBucketCount(start=start_date, count=count)
+            for start_date, count in grouped(start)
+        ],
+        **json_arrays,
+    )
@@ -0,0 +1,117 @@
+import hashlib
+from datetime import UTC, datetime
+from typing import Iterable, List, Tuple
+from uuid import UUID
+from sqlalchemy import CompoundSelect, literal, select, union_all
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import RelationshipDirection
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# The table name, id and updated_at of a row
+Version = Tuple[str, UUID, datetime]
+
+
+def _child_relationships(model: type[SQLModel]):
+    return [
+        relationship
+        for relationship in inspect(model).relationships
+        if relationship.direction == RelationshipDirection.ONETOMANY
+    ]
+
+
+def version_statement(model: type[SQLModel], instance_id: UUID) -> CompoundSelect:
+    """Select the version of an instance's row, and the rows of its children, without loading the instances.
+
+    Only direct children are included, i.e. Case.notes but not the children of a note.
+    """
+    statements = [
+        select(
+            literal(model.__table__.name).label("table_name"),
+            model.id,
+            model.updated_at,
+        ).where(model.id == instance_id)
+    ]
+    for relationship in _child_relationships(model):
+        child = relationship.mapper.class_
+        [(_, foreign_key)] = relationship.local_remote_pairs
+        statements.append(
+            select(
+                literal(child.__table__.name).label("table_name"),
+                child.id,
+                child.updated_at,
+            ).where(foreign_key == instance_id)
+        )
+    return union_all(*statements)
+
+
+def instance_versions(instance: SQLModel) -> List[Version]:
+    """The versions of an instance's row and its children, read from an instance with its children loaded."""
+    versions = [(type(instance).__table__.name, instance.id, instance.updated_at)]
+    for relationship in _child_relationships(type(instance)):
+        related = getattr(instance, relationship.key)
+        if related is None:
+            continue
+        for child in related if relationship.uselist else [related]:
+            versions.append((type(child).__table__.name, child.id, child.updated_at))
+    return versions
+
+
+def _normalise(timestamp: datetime) -> str:
+    # Naive UTC and timezone aware timestamps of the same instant give the same ETag.
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(UTC).replace(tzinfo=None)
+    return timestamp.isoformat()
+
+
+def compute_etag(versions: Iterable[Version]) -> str:
+    """Create a strong ETag which changes whenever the row, or any of its children, are changed, added or removed."""
+    digest = hashlib.blake2b(digest_size=16)
+    for table_name, row_id, updated_at in sorted(
+        versions, key=lambda version: (version[0], str(version[1]))
+    ):
+        digest.update(f"{table_name}:{row_id}:{_normalise(updated_at)}\n".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def current_etag(
+    session: Session, model: type[SQLModel], instance_id: UUID, lock: bool = False
+) -> str | None:
+    """Read the current ETag of an instance with a single query, returning None if the instance does not exist.
+
+    If lock is set the instance's row is locked until the end of the transaction first, so it cannot be changed
+    between reading its ETag and writing to it.
+    """
+    if lock:
+        session.execute(
+            select(model.id).where(model.id == instance_id).with_for_update()
+        )
+    versions = session.execute(version_statement(model, instance_id)).all()
+    if not any(table_name == model.__table__.name for table_name, _, _ in versions):
+        return None
+    return compute_etag(versions)
+
+
+async def read_etag(
+    session: AsyncSession, model: type[SQLModel], instance_id: UUID, lock: bool = False
+) -> str | None:
+    """Asyncio version of current_etag."""
+    return await session.run_sync(current_etag, model, instance_id, lock)
+
+
+def etag_matches(header: str, etag: str, weak: bool = False) -> bool:
+    """Check whether an If-Match or If-None-Match header includes the ETag.
+
+    If-None-Match uses weak comparison, so W/ prefixed ETags match, If-Match uses strong comparison.
+    """
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
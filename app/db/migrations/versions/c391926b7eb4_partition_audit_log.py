@@ -0,0 +1,112 @@
+"""partition audit log
+
+Revision ID: c391926b7eb4
+Revises: 5f1c2e9a7b3d
+Create Date: 2026-10-18 14:05:22.418730
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c391926b7eb4"
+down_revision: Union[str, None] = "5f1c2e9a7b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "created_at, updated_at, id, event_type, username, case_id"
+# Partitions are created for the months after the migration is run, after which manage-audit-partitions
+# creates them.
+MONTHS_AHEAD = 3
+
+
+def audit_log_columns() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "event_type",
+            postgresql.ENUM(name="eventtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("username", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("case_id", sa.Uuid(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["username"], ["users.username"]),
+    ]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # The existing table is replaced by a partitioned table, as an existing table cannot be partitioned.
+    op.rename_table("audit_log", "audit_log_unpartitioned")
+    op.execute(
+        "ALTER TABLE audit_log_unpartitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_unpartitioned_pkey"
+    )
+    op.drop_index("ix_audit_log_case_id", table_name="audit_log_unpartitioned")
+
+    op.create_table(
+        "audit_log",
+        *audit_log_columns(),
+        sa.PrimaryKeyConstraint("created_at", "id"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_audit_log_case_id_created_at",
+        "audit_log",
+        ["case_id", "created_at"],
+        unique=False,
+    )
+    # Holds any events outside of the monthly partitions, so they can still be written.
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+
+    # A partition for each month with existing events, up to MONTHS_AHEAD months from now.
+    oldest = op.get_bind().scalar(
+        sa.text("SELECT min(created_at) FROM audit_log_unpartitioned")
+    )
+    month = (oldest.date() if oldest else date.today()).replace(day=1)
+    last = add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        next_month = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_log_{month:%Y_%m} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    op.execute(
+        f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_unpartitioned"
+    )
+    op.drop_table("audit_log_unpartitioned")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "audit_log_unpartitioned",
+        *audit_log_columns(),
+        sa.PrimaryKeyConstraint("id", name="audit_log_unpartitioned_pkey"),
+    )
+    op.execute(
+        f"INSERT INTO audit_log_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM audit_log"
+    )
+    # Dropping the partitioned table drops each of its partitions.
+    op.drop_table("audit_log")
+    op.rename_table("audit_log_unpartitioned", "audit_log")
+    op.execute(
+        "ALTER TABLE audit_log RENAME CONSTRAINT audit_log_unpartitioned_pkey TO audit_log_pkey"
+    )
+    op.create_index(
+        op.f("ix_audit_log_case_id"), "audit_log", ["case_id"], unique=False
+    )
@@ -0,0 +1,90 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlmodel import SQLModel
+from sqlmodel.sql.expression import Select
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, instance_id: uuid.UUID) -> str:
+    """Encode the position of the last row of a page as an opaque, URL safe cursor.
+
+    Args:
+        created_at: The created_at timestamp of the last row returned.
+        instance_id: The ID of the last row returned, used to break ties between rows created at the same time.
+
+    Returns:
+        str: A base64 encoded cursor which can be passed back to fetch the next page.
+    """
+    payload = json.dumps([created_at.isoformat(), str(instance_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor created by encode_cursor.
+
+    Raises:
+        HTTPException: HTTP 400 is raised if the cursor has been tampered with or is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        created_at, instance_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(created_at), uuid.UUID(instance_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_order(
+    statement: Select, model: type[SQLModel], cursor: str | None = None
+) -> Select:
+    """Order a select statement by (created_at, id), starting after the row the cursor was created for, if any."""
+    if cursor:
+        created_at, instance_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(model.created_at, model.id) > tuple_(created_at, instance_id),
+            # Implied by the row comparison, but Postgres only skips the partitions of tables partitioned by
+            # created_at, such as the audit log, when created_at is compared directly.
+            model.created_at >= created_at,
+        )
+    return statement.order_by(model.created_at, model.id)
+
+
+def keyset_paginate(
+    statement: Select, model: type[SQLModel], limit: int, cursor: str | None = None
+) -> Select:
+    """Restrict a select statement to a single page ordered by (created_at, id).
+
+    Rather than using an OFFSET, which requires the database to read and discard every previous row,
+    the page is started directly after the last row of the previous page.
+    This allows the (created_at, id) index to be used to read only the rows in the page,
+    so the cost of each page stays the same regardless of the size of the table.
+
+    One more row than the limit is selected, so it is possible to tell if there is a next page.
+
+    Args:
+        statement: The select statement, including any filters, to paginate.
+        model: The model being selected, this must have created_at and id columns.
+        limit: The maximum number of rows to return.
+        cursor: The cursor returned with the previous page, if any.
+    """
+    return keyset_order(statement, model, cursor).limit(limit + 1)
+
+
+def next_cursor(rows: list[Any], limit: int) -> str | None:
+    """Trim the extra row selected by keyset_paginate and return the cursor for the next page.
+
+    Returns:
+        str | None: The cursor for the next page or None if this is the last page.
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last_row = rows[-1]
+    return encode_cursor(last_row.created_at, last_row.id)
@@ -0,0 +1,105 @@
+import re
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import Connection, text
+
+# Tables partitioned by month have one partition per month, named <table>_<year>_<month>, e.g. audit_log_2024_10,
+# along with a default partition holding any rows outside of them.
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_(?P<year>\d{4})_(?P<month>\d{2})$")
+DEFAULT_PARTITION_SUFFIX = "_default"
+
+
+def is_partition(name: str) -> bool:
+    """Whether a table name is the name of a monthly or default partition."""
+    return bool(PARTITION_NAME.match(name)) or name.endswith(DEFAULT_PARTITION_SUFFIX)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """The first day of the month the given number of months after month, which may be negative."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    month = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def month_partitions(connection: Connection, table: str) -> Dict[date, str]:
+    """The monthly partitions of a table, by the month they hold."""
+    names = connection.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions[date(int(match["year"]), int(match["month"]), 1)] = name
+    return partitions
+
+
+def create_partitions(
+    connection: Connection, table: str, today: date, months_ahead: int
+) -> List[str]:
+    """Create the partitions for the current month and the following months_ahead months, if they do not exist.
+
+    A partition cannot be created once rows for its month have been written to the default partition, so
+    partitions should be created well before they are needed.
+    """
+    existing = month_partitions(connection, table)
+    created = []
+    for months in range(months_ahead + 1):
+        month = add_months(month_start(today), months)
+        if month not in existing:
+            connection.execute(text(create_partition_sql(table, month)))
+            created.append(partition_name(table, month))
+    return created
+
+
+def expired_months(partitions: Dict[date, str], today: date, retention_months: int):
+    """The months of the partitions which only hold rows older than retention_months."""
+    oldest_kept = add_months(month_start(today), -retention_months)
+    return sorted(month for month in partitions if month < oldest_kept)
+
+
+def expire_partitions(
+    connection: Connection,
+    table: str,
+    today: date,
+    retention_months: int,
+    archive: bool = False,
+) -> List[str]:
+    """Drop the partitions which only hold rows older than retention_months.
+
+    With archive the partitions are detached rather than dropped, leaving them as standalone tables which are
+    no longer read by queries of the partitioned table, so they can be exported before being dropped.
+    Dropping or detaching a partition does not need to delete its rows one by one, unlike a DELETE.
+    """
+    partitions = month_partitions(connection, table)
+    expired = []
+    for month in expired_months(partitions, today, retention_months):
+        name = partitions[month]
+        if archive:
+            connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        else:
+            connection.execute(text(f"DROP TABLE {name}"))
+        expired.append(name)
+    return expired
@@ -0,0 +1,99 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+from app.metrics import registry
+
+
+class InstrumentedPoolMixin:
+    """Records how long each connection checkout waits for a free connection.
+
+    The wait time is the best indicator of whether the pool is too small for the load,
+    as requests queue for a connection once every connection in the pool and its overflow are in use.
+    """
+
+    metrics_name: str = "default"
+
+    def _do_get(self):
+        wait_timer = registry.timer(
+            f"db.pool.{self.metrics_name}.checkout_wait",
+            "Time spent waiting for a database connection",
+        )
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            registry.counter(
+                f"db.pool.{self.metrics_name}.checkout_timeouts",
+                "Checkouts which gave up waiting for a database connection",
+            ).inc()
+            raise
+        finally:
+            wait_timer.observe(time.perf_counter() - start)
+
+
+def instrumented_pool_class(
+    name: str, pool_class: type[Pool] = QueuePool
+) -> type[Pool]:
+    """Create a subclass of the given pool class which records its checkout wait times under the given name."""
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (InstrumentedPoolMixin, pool_class),
+        {"metrics_name": name},
+    )
+
+
+def register_pool_metrics(name: str, engine: Engine) -> None:
+    """Export the current state of an engine's connection pool.
+
+    The pool is read from the engine each time, as the engine replaces its pool when it is disposed.
+    """
+    registry.gauge(
+        f"db.pool.{name}.size",
+        "Number of connections the pool keeps open",
+        lambda: engine.pool.size(),
+    )
+    registry.gauge(
+        f"db.pool.{name}.checked_out",
+        "Number of connections currently in use",
+        lambda: engine.pool.checkedout(),
+    )
+    registry.gauge(
+        f"db.pool.{name}.overflow",
+        "Number of connections open beyond the pool size",
+        lambda: max(0, engine.pool.overflow()),
+    )
+
+
+class ConnectionBudgetExceededError(Exception):
+    """Raised when every worker's connection pool could open more connections than the database allows."""
+
+
+def read_connection_budget(engine: Engine) -> int:
+    """The number of connections the database accepts from non-superusers."""
+    with engine.connect() as connection:
+        max_connections = int(
+            connection.exec_driver_sql("SHOW max_connections").scalar()
+        )
+        reserved = int(
+            connection.exec_driver_sql("SHOW superuser_reserved_connections").scalar()
+        )
+    return max_connections - reserved
+
+
+def check_connection_budget(
+    workers: int, pool_size: int, max_overflow: int, budget: int
+) -> int:
+    """Check the connections opened by every worker's pool fit within the budget, returning the most they can open.
+
+    Raises:
+        ConnectionBudgetExceededError: If the pools could open more connections than the budget.
+    """
+    connections = workers * (pool_size + max_overflow)
+    if connections > budget:
+        raise ConnectionBudgetExceededError(
+            f"{workers} workers with a pool size of {pool_size} and max overflow of {max_overflow} can open "
+            f"{connections} database connections, but the budget is {budget}. "
+            "Reduce WEB_CONCURRENCY, DB_POOL_SIZE or DB_MAX_OVERFLOW."
+        )
+    return connections
@@ -0,0 +1,36 @@
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Context manager which records every SQL statement an engine sends to the database.
+
+    This is used to check the number of queries an operation makes stays constant,
+    rather than growing with the amount of data being read.
+
+    Example:
+        with QueryCounter(engine) as counter:
+            client.get("/cases/")
+        assert counter.count == 6
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
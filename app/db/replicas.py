@@ -0,0 +1,84 @@
+import itertools
+import threading
+import time
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Set on responses to requests which write, so the client's reads go to the primary until it expires.
+PRIMARY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaSelector:
+    """Chooses the read replica each read only session uses.
+
+    round_robin uses each replica in turn, least_connections uses the replica whose pool in this worker has the
+    fewest connections checked out, which favours replicas which are answering queries quickly.
+    """
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(self, engines: Sequence[AsyncEngine], strategy: str = "round_robin"):
+        if not engines:
+            raise ValueError("At least one read replica is needed")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(
+                f"Unknown replica selection {strategy}, expected one of {', '.join(self.STRATEGIES)}"
+            )
+        self.engines = list(engines)
+        self.strategy = strategy
+        self._cycle = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+
+    def choose(self) -> AsyncEngine:
+        if self.strategy == "least_connections":
+            return min(
+                self.engines, key=lambda engine: engine.sync_engine.pool.checkedout()
+            )
+        with self._lock:
+            return next(self._cycle)
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """Whether the client wrote recently, so should read from the primary to see its own writes."""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pins clients to the primary for pin_seconds after each successful write.
+
+    Replicas can lag behind the primary, so a client reading straight after writing might not see its write.
+    Successful responses to requests which are not GET, HEAD or OPTIONS set a cookie holding the time the pin
+    expires, which is checked by get_async_read_session. The cookie can only make a client read from the primary,
+    so it does not need to be signed.
+    """
+
+    def __init__(self, app: ASGIApp, pin_seconds: float):
+        self.app = app
+        self.pin_seconds = pin_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pinned_until = time.time() + self.pin_seconds
+                cookie = (
+                    f"{PRIMARY_COOKIE}={pinned_until:.3f}; Max-Age={int(self.pin_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,42 +1,206 @@
 import logging
-from sqlmodel import Session
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from sqlalchemy import Table, event
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import RelationshipDirection
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 import uuid
+from app.metrics import registry
 
 logger = logging.getLogger(__name__)
 
+# Keys used in Session.info to begin a savepoint from within the flush, see begin_flush_savepoint.
+FLUSH_IN_SAVEPOINT = "flush_in_savepoint"
+FLUSH_SAVEPOINT = "flush_savepoint"
+
+
+@contextmanager
+def keep_instances_on_commit(session: Session) -> Iterator[None]:
+    """Stop the session expiring its instances when it commits.
+
+    By default every instance is expired by a commit, so reading any attribute afterwards reads the row again.
+    This is unnecessary when the instances already hold every value written to the database.
+    """
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
+def set_unloaded_relationships_empty(instance: SQLModel) -> None:
+    """Set the relationships of a newly created instance, and its children, which were never assigned to empty.
+
+    Reading an unassigned relationship of a committed instance lazy loads it, even though a new instance
+    cannot have any related rows other than the ones it was created with.
+    """
+    state = inspect(instance)
+    for relationship in state.mapper.relationships:
+        if relationship.key not in state.dict:
+            set_committed_value(
+                instance, relationship.key, [] if relationship.uselist else None
+            )
+        elif relationship.direction == RelationshipDirection.ONETOMANY:
+            related = state.dict[relationship.key]
+            for child in related if relationship.uselist else [related]:
+                if child is not None:
+                    set_unloaded_relationships_empty(child)
+
+
+# Postgres SQLSTATE for a unique constraint violation, which includes primary keys.
+UNIQUE_VIOLATION = "23505"
+SQLITE_UNIQUE_VIOLATION = "UNIQUE constraint failed: "
+
+
+def uuid_primary_key_tables() -> Dict[str, Table]:
+    """Tables with a UUID4 id primary key, by the name of their primary key constraint.
+
+    Postgres names unnamed primary key constraints <table>_pkey.
+    """
+    tables = {}
+    for table in SQLModel.metadata.tables.values():
+        if [column.name for column in table.primary_key.columns] == ["id"]:
+            tables[table.primary_key.name or f"{table.name}_pkey"] = table
+    return tables
+
+
+def is_uuid_collision(error: IntegrityError) -> bool:
+    """Check whether the error was caused by inserting a row with the UUID4 id of an existing row.
+
+    Other unique constraints, such as a username which is already taken, cannot be fixed by generating new ids.
+    Postgres drivers give the SQLSTATE and the name of the violated constraint,
+    SQLite only gives the violated columns in its message, i.e. "UNIQUE constraint failed: cases.id".
+    """
+    original = error.orig
+    sqlstate = getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
+    if sqlstate is not None:
+        # psycopg reports the constraint in its diagnostics, asyncpg on the exception SQLAlchemy wraps.
+        constraint_name = getattr(
+            getattr(original, "diag", None), "constraint_name", None
+        ) or getattr(original.__cause__, "constraint_name", None)
+        return (
+            sqlstate == UNIQUE_VIOLATION
+            and constraint_name in uuid_primary_key_tables()
+        )
+
+    message = str(original)
+    if not message.startswith(SQLITE_UNIQUE_VIOLATION):
+        return False
+    table_names = {table.name for table in uuid_primary_key_tables().values()}
+    columns = message.removeprefix(SQLITE_UNIQUE_VIOLATION).split(", ")
+    return all(
+        column.endswith(".id") and column.removesuffix(".id") in table_names
+        for column in columns
+    )
+
 
 class CustomSession(Session):
     def commit(self, max_retries: int = 3) -> None:
         """Override the standard sqlmodel Session commit method, so we check for UUID4 Collisions as we are writing to
-        the database writing to the database.
+        the database.
+
+        New instances are inserted within a savepoint. If one collides with the id of an existing row only the
+        savepoint is rolled back, the new instances are given new ids and the changes are flushed again,
+        rather than rolling back and replaying the whole transaction.
+
         Args:
             max_retries (int): Number of times to re-try generating UUIDs
         Raises:
             HTTPException: HTTP 500 is raised if unique UUIDs could not be generated.
         """
         retries = 0
-        new_objects = self.new
-        while retries < max_retries:
+        while self.new:
+            changes = self._pending_changes()
+            self.info[FLUSH_IN_SAVEPOINT] = True
             try:
-                return super().commit()  # Call the original commit method
+                self.flush()
+                self.info.pop(FLUSH_SAVEPOINT).commit()
+                break
             except IntegrityError as e:
-                if "UNIQUE constraint failed" in str(e):
-                    logger.error(e)
-                    self.rollback()  # Rollback the database to the previous state so partial data does not persist
-                    retries += 1
-                    for instance in new_objects:
-                        if hasattr(instance, "id") and isinstance(
-                            instance.id, uuid.UUID
-                        ):
-                            logger.warning(
-                                "UUID4 Collision Detected, generating a new UUID."
-                            )
-                            instance.id = uuid.uuid4()  # Regenerate UUID
-                else:
+                savepoint = self.info.pop(FLUSH_SAVEPOINT, None)
+                if savepoint is not None:
+                    savepoint.rollback()
+                if not is_uuid_collision(e):
+                    self.rollback()
                     raise e
-        raise HTTPException(
-            status_code=500,
-            detail="Could not generate a unique UUID after multiple attempts.",
-        )
+                logger.error(e)
+                retries += 1
+                registry.counter(
+                    "db.uuid_collision_retries",
+                    "Flushes retried with new ids after a UUID4 collision",
+                ).inc()
+                if retries >= max_retries:
+                    self.rollback()
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Could not generate a unique UUID after multiple attempts.",
+                    )
+                logger.warning("UUID4 Collision Detected, generating a new UUID.")
+                self._restore_pending_changes(*changes)
+            finally:
+                self.info.pop(FLUSH_IN_SAVEPOINT, None)
+        return super().commit()
+
+    def _pending_changes(
+        self,
+    ) -> Tuple[List[Any], List[Tuple[Any, Dict[str, Any]]], List[Any]]:
+        """Record the unflushed changes, as rolling back a savepoint discards them from the session."""
+        modified = []
+        for instance in self.dirty:
+            state = inspect(instance)
+            modified.append(
+                (
+                    instance,
+                    {
+                        attribute.key: state.dict[attribute.key]
+                        for attribute in state.attrs
+                        if attribute.key in state.dict
+                        and attribute.history.has_changes()
+                    },
+                )
+            )
+        return list(self.new), modified, list(self.deleted)
+
+    def _restore_pending_changes(
+        self,
+        new: List[Any],
+        modified: List[Tuple[Any, Dict[str, Any]]],
+        deleted: List[Any],
+    ) -> None:
+        """Re-apply the changes discarded by rolling back a savepoint, giving the new instances new ids."""
+        for instance in new:
+            if isinstance(getattr(instance, "id", None), uuid.UUID):
+                instance.id = uuid.uuid4()
+        self.add_all(new)
+        for instance, values in modified:
+            for key, value in values.items():
+                setattr(instance, key, value)
+        for instance in deleted:
+            self.delete(instance)
+
+
+@event.listens_for(CustomSession, "before_flush")
+def begin_flush_savepoint(session: CustomSession, flush_context, instances) -> None:
+    """Begin the savepoint CustomSession.commit flushes within.
+
+    Session.begin_nested() flushes any pending changes before beginning the savepoint, so the savepoint has to begin
+    from within the flush for the changes to be written inside it.
+    """
+    if session.info.pop(FLUSH_IN_SAVEPOINT, False):
+        session.info[FLUSH_SAVEPOINT] = session.begin_nested()
+
+
+class AsyncCustomSession(AsyncSession):
+    """Asyncio version of the CustomSession.
+
+    All operations are run by a CustomSession, so commits have the same UUID4 collision handling.
+    Synchronous code, such as BaseRequest.create, can be given the CustomSession by using run_sync.
+    """
+
+    sync_session_class = CustomSession
@@ -0,0 +1,27 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """A timestamp stored as UTC in a column without a timezone, and read back as a timezone aware datetime.
+
+    Drivers differ in how they write timezone aware datetimes to timestamp without time zone columns: psycopg2
+    and SQLite drop the timezone, asyncpg rejects them. Converting to naive UTC before writing, including values
+    compared against the column in queries, stores the same value with every driver.
+    Naive datetimes are assumed to already be in UTC.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | None, dialect) -> datetime | None:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: datetime | None, dialect) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value
@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .routers import case_information, security
+from .routers import case_information, security, metrics
 from .config.docs import config as docs_config
 from fastapi_versionizer.versionizer import Versionizer
+from .config import Config
+from .db import read_replica_engines
+from .db.replicas import ReadYourWritesMiddleware
+from .audit.writer import audit_log_writer
+from .auth.revocation import revocation_list
+from .models.base import build_translation_plans
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit_log_writer.start()
+    await revocation_list.start()
+    yield
+    await revocation_list.stop()
+    # Queued audit log events are written before the worker exits.
+    await audit_log_writer.stop()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(**docs_config)
+    app = FastAPI(**docs_config, lifespan=lifespan)
+    # Built up front, rather than by the first request to use each request class.
+    build_translation_plans()
     app.include_router(case_information.router)
     app.include_router(security.router)
+    app.include_router(metrics.router)
+
+    if read_replica_engines:
+        app.add_middleware(
+            ReadYourWritesMiddleware, pin_seconds=Config.DB_READ_YOUR_WRITES_SECONDS
+        )
 
     Versionizer(
         app=app,
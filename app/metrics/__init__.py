@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+
+class Counter:
+    """A value which only ever increases, i.e. the number of requests served."""
+
+    def __init__(self, description: str):
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> dict:
+        return {"description": self.description, "value": self.value}
+
+
+class Gauge:
+    """A value which can go up and down, read from the given callback when the metrics are collected."""
+
+    def __init__(self, description: str, callback: Callable[[], float]):
+        self.description = description
+        self.callback = callback
+
+    @property
+    def value(self) -> float:
+        return self.callback()
+
+    def snapshot(self) -> dict:
+        return {"description": self.description, "value": self.value}
+
+
+class Timer:
+    """Records how long an operation takes.
+
+    Percentiles are calculated from the most recent samples, so they reflect current behaviour.
+    """
+
+    def __init__(self, description: str, max_samples: int = 1024):
+        self.description = description
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self._samples.append(seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, percentile: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "description": self.description,
+            "count": self.count,
+            "total_seconds": self.total,
+            "max_seconds": self.max,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "p99_seconds": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Holds every metric recorded by the API, so they can be exported by the metrics endpoint.
+
+    Metrics are stored in memory for the lifetime of the worker process.
+    Asking for a metric which already exists returns the existing metric.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge | Timer] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], Counter | Gauge | Timer]):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(name, lambda: Counter(description))
+
+    def gauge(
+        self, name: str, description: str, callback: Callable[[], float]
+    ) -> Gauge:
+        gauge = self._get_or_create(name, lambda: Gauge(description, callback))
+        gauge.callback = callback
+        return gauge
+
+    def timer(self, name: str, description: str) -> Timer:
+        return self._get_or_create(name, lambda: Timer(description))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+registry = MetricsRegistry()
@@ -5,3 +5,5 @@ from .case_notes import CaseNote  # noqa: F401
 from .person import Person  # noqa: F401
 from .audit_log import AuditLogEvent  # noqa: F401
 from .eligibility_outcomes import EligibilityOutcomes  # noqa: F401
+from .revoked_tokens import RevokedToken  # noqa: F401
+from .refresh_tokens import RefreshToken  # noqa: F401
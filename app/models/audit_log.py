@@ -1,4 +1,7 @@
-from app.models.base import TableModelMixin
+from datetime import UTC, datetime
+from app.models.base import TableModelMixin, BaseResponse
+from app.db.types import UTCDateTime
+from sqlalchemy import Index
 from sqlmodel import Field
 from uuid import UUID
 from enum import Enum
@@ -14,13 +17,32 @@ class EventType(str, Enum):
     other = "Other"
 
 
-class AuditLogEvent(TableModelMixin, table=True):
-    __tablename__ = "audit_log"
-
+class BaseAuditLogEvent:
     event_type: EventType
 
     # Log events can be associated with a user, but this is not required.
     username: str | None = Field(foreign_key="users.username")
 
     # Log events can be associated with a case, but this is not required.
-    case_id: UUID | None = Field(foreign_key="cases.id", index=True)
+    case_id: UUID | None = Field(foreign_key="cases.id")
+
+
+class AuditLogEvent(BaseAuditLogEvent, TableModelMixin, table=True):
+    __tablename__ = "audit_log"
+    # On Postgres the table is partitioned by the month events were created in, see app.db.partitions.
+    # A case's history is read with the (case_id, created_at) index of each partition.
+    __table_args__ = (
+        Index("ix_audit_log_case_id_created_at", "case_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # The primary key of a partitioned table must include the column it is partitioned by.
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        primary_key=True,
+        sa_type=UTCDateTime,
+    )
+
+
+class AuditLogEventResponse(BaseAuditLogEvent, BaseResponse):
+    pass
@@ -1,13 +1,31 @@
 import uuid
-from functools import cached_property
-from typing import List, Tuple, Any
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    get_args,
+)
 
 from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
 from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql.base import ExecutableOption
 from sqlalchemy.inspection import inspect
 from sqlmodel import Field, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, UTC
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from app.db.bulk import bulk_insert, load_by_ids
+from app.db.types import UTCDateTime
+from app.db.session import keep_instances_on_commit, set_unloaded_relationships_empty
 from pydantic.config import ConfigDict
 
 
@@ -18,14 +36,16 @@ class TimestampMixin(SQLModel):
     updated_at, is set when the object is first instantiated and
                 updated every time the object is commited to the database.
 
-    Note: As SQLite doesn't support timezone aware timezones you need to add TZInfo when writing tests.
-    TODO: Use Postgres as the testing database to fix the above.
+    Both are stored as UTC, without a timezone, and are always timezone aware in Python, see UTCDateTime.
     """
 
-    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=UTCDateTime
+    )
 
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
+        sa_type=UTCDateTime,
         sa_column_kwargs={"onupdate": lambda: datetime.now(UTC)},
     )
 
@@ -49,9 +69,89 @@ class TableModelMixin(TimestampMixin):
         validate_assignment = True
 
 
+# The fields of each response class, with the response class of any related fields, built the first time
+# the class is serialised.
+_serialisation_plans: Dict[
+    type["BaseResponse"], Tuple[Tuple[str, type["BaseResponse"] | None], ...]
+] = {}
+
+
 class BaseResponse(TableModelMixin):
     model_config = ConfigDict(from_attributes=True)
-    pass
+
+    class Meta:
+        # The relationship loading strategy used to read everything the response needs in a fixed number of queries.
+        # Without this each relationship is lazy loaded with its own query per instance as the response is built.
+        load_options: Tuple[ExecutableOption, ...] = ()
+
+    @classmethod
+    def load_options(cls) -> Tuple[ExecutableOption, ...]:
+        return cls.Meta.load_options
+
+    @classmethod
+    def serialise(cls, instance: SQLModel) -> dict:
+        """Convert an instance read from, or written to, the database into a dict of the response's fields.
+
+        This is a fast alternative to model_validate followed by model_dump, which skips validating the instance
+        as its values were validated when they were written. The values are left as they are, so the dict should
+        be encoded with orjson, which handles UUIDs, datetimes and enums natively, see SerialisedJSONResponse.
+        """
+        plan = _serialisation_plans.get(cls)
+        if plan is None:
+            plan = _serialisation_plans[cls] = tuple(
+                (name, _find_subclass(field.annotation, BaseResponse))
+                for name, field in cls.model_fields.items()
+            )
+        data = {}
+        for name, response_class in plan:
+            value = getattr(instance, name)
+            if response_class is not None and value is not None:
+                if isinstance(value, list):
+                    value = [response_class.serialise(item) for item in value]
+                else:
+                    value = response_class.serialise(value)
+            data[name] = value
+        return data
+
+
+ResponseType = TypeVar("ResponseType", bound=BaseResponse)
+
+
+class PageResponse(BaseModel, Generic[ResponseType]):
+    """A single page of results.
+
+    next is an opaque cursor which can be passed back to fetch the following page, it is None on the last page.
+    """
+
+    items: List[ResponseType]
+    next: str | None = None
+
+
+@dataclass(frozen=True)
+class RelatedField:
+    request_class: type["BaseRequest"]
+    # Whether the relationship is a list, rather than one-to-one.
+    many: bool
+
+
+@dataclass(frozen=True)
+class TranslationPlan:
+    """How a request class is translated into its model, see BaseRequest.translation_plan.
+
+    fields are the names of the fields which are copied as they are, related are the fields which are
+    translated into instances of a related model by their own request class. default_factories are the
+    model's default factories, which are called directly when creating an instance as pydantic inspects
+    the signature of each factory every time it is called.
+    """
+
+    fields: FrozenSet[str]
+    related: Dict[str, RelatedField]
+    default_factories: Dict[str, Callable[[], Any]]
+
+
+# The translation plan of each request class, built the first time the class is translated
+# or at startup by build_translation_plans.
+_translation_plans: Dict[type["BaseRequest"], TranslationPlan] = {}
 
 
 class BaseRequest(BaseModel):
@@ -66,109 +166,476 @@ class BaseRequest(BaseModel):
             )
         return self.Meta.model
 
-    @cached_property
+    @classmethod
+    def translation_plan(cls) -> TranslationPlan:
+        """The fields and related request classes used to translate the request, built once per class.
+
+        Building the plan inspects the model's relationships, which requires every model to be defined,
+        so it cannot be built when the class is created.
+        """
+        plan = _translation_plans.get(cls)
+        if plan is None:
+            plan = _translation_plans[cls] = _build_translation_plan(cls)
+        return plan
+
+    @property
     def related_fields(self) -> List[str]:
-        related_fields = []
-        model = self.Meta.model
-        if not model:
-            return related_fields
-        relationship_list: Tuple[str, Any] = inspect(model).relationships.items()
-        for relationship in relationship_list:
-            field_name = relationship[0]
-            if field_name in self.model_fields:
-                related_fields.append(field_name)
-        return related_fields
-
-    def retrieve(self, session: Session, instance_id: uuid.UUID) -> SQLModel | None:
-        return session.get(self.model, instance_id)
+        return list(self.translation_plan().related)
+
+    def retrieve(
+        self,
+        session: Session,
+        instance_id: uuid.UUID,
+        options: Sequence[ExecutableOption] = (),
+    ) -> SQLModel | None:
+        return session.get(self.model, instance_id, options=options)
 
     def create(self, session: Session) -> SQLModel:
-        data = self.translate(session, create=True)
-        instance = self.model(**data)
+        """Create a new instance from the request.
+
+        Every column is given its value before the insert, so the instance is kept as it is after the commit
+        rather than being read back. Relationships which were not in the request are set to empty,
+        so the response can be built without any further queries.
+        """
+        instance = self.build(session)
         session.add(instance)
-        session.commit()
-        session.refresh(instance)
+        with keep_instances_on_commit(session):
+            session.commit()
+        set_unloaded_relationships_empty(instance)
         return instance
 
+    def build(self, session: Session) -> SQLModel:
+        """Create a new unsaved instance, with its related instances, from the request."""
+        data = self.translate(session, create=True)
+        return self.model(**data)
+
+    @classmethod
+    def bulk_create(
+        cls, session: Session, requests: Sequence["BaseRequest"]
+    ) -> List[SQLModel]:
+        """Create instances for many requests in a single transaction.
+
+        Rows are inserted with one statement per table rather than one per instance, see app.db.bulk.bulk_insert.
+        The returned instances are not attached to the session.
+
+        Raises:
+            IntegrityError: If any row could not be inserted, in which case none of the rows are inserted.
+        """
+        instances = [request.build(session) for request in requests]
+        try:
+            bulk_insert(session, instances)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return instances
+
     def update(self, instance: SQLModel, session: Session) -> SQLModel:
+        """Update the instance from the request.
+
+        The instance is kept as it is after the commit rather than being read back, so it should be retrieved with
+        every relationship the response needs already loaded.
+        """
         data = self.translate(session, create=False)
         for field_name, field_value in data.items():
             setattr(instance, field_name, field_value)
 
         session.add(instance)
-        session.commit()
-        session.refresh(instance)
+        with keep_instances_on_commit(session):
+            session.commit()
+        return instance
+
+    async def async_retrieve(
+        self,
+        session: AsyncSession,
+        instance_id: uuid.UUID,
+        options: Sequence[ExecutableOption] = (),
+    ) -> SQLModel | None:
+        return await session.get(self.model, instance_id, options=options)
+
+    async def async_create(self, session: AsyncSession) -> SQLModel:
+        """Asyncio version of create.
+
+        Translating the request can read related instances, so the whole operation is run with the
+        session's synchronous CustomSession rather than re-implementing it.
+        """
+        return await session.run_sync(self.create)
+
+    async def async_update(self, instance: SQLModel, session: AsyncSession) -> SQLModel:
+        """Asyncio version of update, see async_create."""
+        return await session.run_sync(
+            lambda sync_session: self.update(instance, sync_session)
+        )
+
+    @classmethod
+    def patch(cls, session: Session, instance: SQLModel, patch: dict) -> SQLModel:
+        """Apply a JSON merge patch (RFC 7396) to the instance, then commit it.
+
+        Only the columns in the patch are set, so only they are written. See apply_merge_patch for how related
+        instances are patched. As with update, the instance should be retrieved with every relationship already
+        loaded.
+        """
+        cls.apply_merge_patch(session, instance, patch)
+        session.add(instance)
+        with keep_instances_on_commit(session):
+            session.commit()
+        set_unloaded_relationships_empty(instance)
         return instance
 
+    @classmethod
+    async def async_patch(
+        cls, session: AsyncSession, instance: SQLModel, patch: dict
+    ) -> SQLModel:
+        """Asyncio version of patch, see async_create."""
+        return await session.run_sync(cls.patch, instance, patch)
+
+    @classmethod
+    async def async_bulk_create(
+        cls, session: AsyncSession, requests: Sequence["BaseRequest"]
+    ) -> List[SQLModel]:
+        """Asyncio version of bulk_create."""
+        return await session.run_sync(cls.bulk_create, requests)
+
     def translate(self, session: Session, create: bool = False) -> dict:
         """
         Convert a dump of request to a dict that can easily be used to create an instance of a model
 
-        This method currently only translates relationships that are two levels deep i.e Case.person
-        and not Case.person.income
-        Todo: Allow deeper level of nested fields to be translated
+        Relationships are translated at every level, i.e. Case.person and Case.person.income.
+        When updating, the related instances referenced by id are read before translating, with one query
+        per model rather than one per instance, see load_referenced_instances.
 
         Args:
             session: active database session
             create: whether to create a new instance of the model. This is particularly useful for when fetching
                     related instances if the data in the request contains the id field
         """
-        data = self.model_dump(exclude_unset=True)
-        related_fields_names = self.related_fields
-        related_fields_data = {}
-        fields = {}
-        for field_name, field_value in data.items():
-            if field_name in related_fields_names and field_value:
-                related_fields_data[field_name] = field_value
-            else:
-                fields[field_name] = field_value
-        return {
-            **fields,
-            **self._translate_related_fields(session, related_fields_data, create),
-        }
-
-    def _translate_related_fields(
-        self, session: Session, fields: dict, create: bool = False
+        referenced = {} if create else self.load_referenced_instances(session)
+        return self._translate(session, create, referenced)
+
+    def _translate(
+        self,
+        session: Session,
+        create: bool,
+        referenced: Dict[type[SQLModel], Dict[uuid.UUID, SQLModel]],
     ) -> dict:
-        """Convert related fields from a dict to an instance of their declared model"""
-        instances = {}
-        for field_name, field_value in fields.items():
+        plan = self.translation_plan()
+        # Only the plain fields are dumped, each related request dumps its own fields as it is translated.
+        data = self.model_dump(include=plan.fields, exclude_unset=True)
+        for field_name in plan.related:
+            if field_name not in self.model_fields_set:
+                continue
             field = getattr(self, field_name)
             if not field:
-                continue
-            if isinstance(field, list):
-                request_class = field[0]
-            else:
-                request_class = field
-
-            if isinstance(field_value, list):
-                instances[field_name] = []
-                for value in field_value:
-                    instance = request_class.dict_to_instance(
-                        session, request_class.model, value, create
-                    )
-                    instances[field_name].append(instance)
+                data[field_name] = field
+            elif isinstance(field, list):
+                data[field_name] = [
+                    request._translate_to_instance(session, create, referenced)
+                    for request in field
+                ]
             else:
-                instance = request_class.dict_to_instance(
-                    session, request_class.model, field_value, create
+                data[field_name] = field._translate_to_instance(
+                    session, create, referenced
                 )
-                instances[field_name] = instance
+        if create:
+            for field_name, default_factory in plan.default_factories.items():
+                if field_name not in data:
+                    data[field_name] = default_factory()
+        return data
+
+    def _translate_to_instance(
+        self,
+        session: Session,
+        create: bool,
+        referenced: Dict[type[SQLModel], Dict[uuid.UUID, SQLModel]],
+    ) -> SQLModel:
+        return self.dict_to_instance(
+            session,
+            self.Meta.model,
+            self._translate(session, create, referenced),
+            create,
+            referenced,
+        )
+
+    def referenced_ids(
+        self, ids: Dict[type[SQLModel], Set[uuid.UUID]] | None = None
+    ) -> Dict[type[SQLModel], Set[uuid.UUID]]:
+        """The ids of the related instances referenced by the request, at every level, grouped by model."""
+        ids = {} if ids is None else ids
+        for field_name in self.translation_plan().related:
+            field = getattr(self, field_name)
+            if not field:
+                continue
+            for request in field if isinstance(field, list) else [field]:
+                if "id" in request.model_fields_set and request.id is not None:
+                    ids.setdefault(request.model, set()).add(request.id)
+                request.referenced_ids(ids)
+        return ids
+
+    def load_referenced_instances(
+        self, session: Session
+    ) -> Dict[type[SQLModel], Dict[uuid.UUID, SQLModel]]:
+        """Read every related instance referenced by the request, with a single query per model.
+
+        The instances are returned by model and id, and passed down while translating the request. This also keeps
+        them in memory until they are used, as the session only holds weak references to them.
+
+        Raises:
+            HTTPException: 404 if any of the instances do not exist.
+        """
+        instances = {}
+        for model, ids in self.referenced_ids().items():
+            found = load_by_ids(session, model, ids)
+            missing = ids - found.keys()
+            if missing:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"{model.__name__} with id {min(missing)} not found",
+                )
+            instances[model] = found
         return instances
 
     def dict_to_instance(
-        self, session: Session, model: SQLModel, values: dict, create: bool = False
+        self,
+        session: Session,
+        model: SQLModel,
+        values: dict,
+        create: bool = False,
+        referenced: Dict[type[SQLModel], Dict[uuid.UUID, SQLModel]] | None = None,
     ) -> SQLModel:
         return model(**values)
 
+    @classmethod
+    def apply_merge_patch(
+        cls,
+        session: Session,
+        instance: SQLModel,
+        patch: Any,
+        location: Tuple[str | int, ...] = ("body",),
+    ) -> None:
+        """Apply a JSON merge patch to an instance, without committing it.
+
+        Fields missing from the patch are left unchanged. The patched fields are validated along with the
+        instance's current values, so required fields do not need to be sent.
+
+        For related instances:
+          - null removes every related instance.
+          - A list replaces the related instances, items with the id of an existing related instance patch it,
+            items without an id create a new related instance, and existing related instances which are not in
+            the list are removed.
+          - An object patches the existing one-to-one related instance, or creates it if there is none.
+
+        Related instances are patched from the ones already loaded with the instance, rather than being read
+        one at a time.
+
+        Raises:
+            RequestValidationError: If the patch, or the instance after it is applied, is invalid.
+            HTTPException: 404 if an id does not belong to one of the instance's related instances.
+        """
+        if not isinstance(patch, dict):
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "dict_type",
+                        "loc": location,
+                        "msg": "Input should be a valid dictionary",
+                        "input": patch,
+                    }
+                ]
+            )
+        plan = cls.translation_plan()
+        field_names = [name for name in plan.fields if name != "id"]
+        current = {name: getattr(instance, name) for name in field_names}
+        # Objects, i.e. JSON columns, are merged with the stored value rather than replacing it.
+        values = {
+            name: _merge_json(current[name], patch[name])
+            for name in field_names
+            if name in patch
+        }
+        try:
+            request = cls.model_validate({**current, **values})
+        except ValidationError as error:
+            raise RequestValidationError(_prefix_errors(error, location))
+        for name in values:
+            setattr(instance, name, getattr(request, name))
+
+        for name, related_field in plan.related.items():
+            if name not in patch:
+                continue
+            request_class = related_field.request_class
+            value = patch[name]
+            if value is None:
+                setattr(instance, name, [] if related_field.many else None)
+            elif related_field.many:
+                if not isinstance(value, list):
+                    raise RequestValidationError(
+                        [
+                            {
+                                "type": "list_type",
+                                "loc": (*location, name),
+                                "msg": "Input should be a valid list",
+                                "input": value,
+                            }
+                        ]
+                    )
+                existing = {related.id: related for related in getattr(instance, name)}
+                setattr(
+                    instance,
+                    name,
+                    [
+                        request_class._patch_related(
+                            session, existing, item, (*location, name, index)
+                        )
+                        for index, item in enumerate(value)
+                    ],
+                )
+            else:
+                related = getattr(instance, name)
+                existing = {related.id: related} if related is not None else {}
+                # An object without an id patches the existing instance, as there can only be one.
+                if (
+                    isinstance(value, dict)
+                    and "id" not in value
+                    and related is not None
+                ):
+                    value = {**value, "id": str(related.id)}
+                setattr(
+                    instance,
+                    name,
+                    request_class._patch_related(
+                        session, existing, value, (*location, name)
+                    ),
+                )
+
+    @classmethod
+    def _patch_related(
+        cls,
+        session: Session,
+        existing: Dict[uuid.UUID, SQLModel],
+        patch: Any,
+        location: Tuple[str | int, ...],
+    ) -> SQLModel:
+        """Patch the existing related instance with the patch's id, or create a new one if it has no id."""
+        if not isinstance(patch, dict) or "id" not in patch:
+            try:
+                request = cls.model_validate(patch)
+            except ValidationError as error:
+                raise RequestValidationError(_prefix_errors(error, location))
+            return request.build(session)
+
+        try:
+            related_id = uuid.UUID(str(patch["id"]))
+        except ValueError:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "uuid_parsing",
+                        "loc": (*location, "id"),
+                        "msg": "Input should be a valid UUID",
+                        "input": patch["id"],
+                    }
+                ]
+            )
+        related = existing.get(related_id)
+        if related is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"{cls.Meta.model.__name__} with id {related_id} not found",
+            )
+        cls.apply_merge_patch(session, related, patch, location)
+        return related
+
+
+def _find_subclass(annotation: Any, base: type) -> type | None:
+    """Find a subclass of base within a type annotation, such as List[CaseNotesRequest] | None."""
+    if isinstance(annotation, type) and issubclass(annotation, base):
+        return annotation
+    for argument in get_args(annotation):
+        subclass = _find_subclass(argument, base)
+        if subclass is not None:
+            return subclass
+    return None
+
+
+def _build_translation_plan(request_class: type[BaseRequest]) -> TranslationPlan:
+    related = {}
+    relationships = inspect(request_class.Meta.model).relationships
+    for name, relationship in relationships.items():
+        if name in request_class.model_fields:
+            field_request_class = _find_subclass(
+                request_class.model_fields[name].annotation, BaseRequest
+            )
+            if field_request_class is not None:
+                related[name] = RelatedField(field_request_class, relationship.uselist)
+    return TranslationPlan(
+        fields=frozenset(request_class.model_fields.keys() - related.keys()),
+        related=related,
+        default_factories={
+            name: field.default_factory
+            for name, field in request_class.Meta.model.model_fields.items()
+            if field.default_factory is not None
+            and not field.default_factory_takes_validated_data
+        },
+    )
+
+
+def _request_subclasses(request_class: type[BaseRequest]) -> List[type[BaseRequest]]:
+    subclasses = []
+    for subclass in request_class.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(_request_subclasses(subclass))
+    return subclasses
+
+
+def build_translation_plans() -> None:
+    """Build the translation plan of every request class with a model, so none are built while serving requests."""
+    for request_class in _request_subclasses(BaseRequest):
+        if getattr(request_class.Meta, "model", None) is not None:
+            request_class.translation_plan()
+
+
+def _merge_json(target: Any, patch: Any) -> Any:
+    """Merge a JSON value into the target as RFC 7396 describes, without changing the target.
+
+    Objects are merged key by key at every level, a null value removes the key. Any other value replaces the target.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    merged = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = _merge_json(merged.get(key), value)
+    return merged
+
+
+def _prefix_errors(
+    error: ValidationError, location: Tuple[str | int, ...]
+) -> List[dict]:
+    """Add the location within the request body to each of the errors from validating part of it."""
+    return [
+        {**details, "loc": (*location, *details["loc"])}
+        for details in error.errors(include_url=False)
+    ]
+
 
 class BaseUpdateRequest(BaseRequest):
     id: uuid.UUID | None = None
 
     def dict_to_instance(
-        self, session: Session, model: SQLModel, values: dict, create: bool = False
+        self,
+        session: Session,
+        model: SQLModel,
+        values: dict,
+        create: bool = False,
+        referenced: Dict[type[SQLModel], Dict[uuid.UUID, SQLModel]] | None = None,
     ) -> SQLModel:
         if not create and "id" in values:
-            instance = session.get(model, values["id"])
+            if referenced is not None:
+                # Read by load_referenced_instances, so this does not query the database.
+                instance = referenced.get(model, {}).get(values["id"])
+            else:
+                instance = session.get(model, values["id"])
             if instance is None:
                 raise HTTPException(
                     status_code=404,
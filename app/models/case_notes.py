@@ -25,7 +25,7 @@ class BaseCaseNote:
 
 class CaseNote(BaseCaseNote, TableModelMixin, table=True):
     __tablename__ = "case_notes"
-    case_id: UUID = Field(foreign_key="cases.id")
+    case_id: UUID = Field(foreign_key="cases.id", index=True)
     # This allows for linking the notes back to the case, this allows us to address case notes directly by using
     # the `Case.notes` syntax, rather than searching for each note using its ID.
     case: "Case" = Relationship(back_populates="notes")  # noqa: F821
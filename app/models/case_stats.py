@@ -0,0 +1,38 @@
+from datetime import date
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel
+
+
+class DateBucket(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ValueCount(BaseModel):
+    value: str
+    count: int
+
+
+class EligibilityOutcomeCount(BaseModel):
+    eligibility_type: str
+    outcome: str
+    count: int
+
+
+class DateBucketCount(BaseModel):
+    # The first day of the bucket, weeks start on Monday.
+    start: date
+    count: int
+
+
+class CaseStatsResponse(BaseModel):
+    total: int
+    case_types: List[ValueCount]
+    eligibility_outcomes: List[EligibilityOutcomeCount]
+    note_types: List[ValueCount]
+    adaptations: List[ValueCount]
+    languages: List[ValueCount]
+    created: List[DateBucketCount]
@@ -1,5 +1,9 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Field, Relationship
 from typing import List
+from uuid import UUID
+from pydantic import BaseModel
 from app.models.base import TableModelMixin, BaseRequest, BaseResponse
 from app.models.types.case_types import CaseTypes
 from app.models.case_notes import (
@@ -34,6 +38,9 @@ class BaseCase:
 
 
 class Case(BaseCase, TableModelMixin, table=True):
+    # Cases are listed in (created_at, id) order, this index allows each page to be read directly.
+    __table_args__ = (Index("ix_cases_created_at_id", "created_at", "id"),)
+
     # Cascade delete ensures all related fields are deleted when the attached case is deleted.
     notes: List[CaseNote] = Relationship(back_populates="case", cascade_delete=True)
     people: List[Person] = Relationship(back_populates="case", cascade_delete=True)
@@ -74,3 +81,32 @@ class CaseResponse(BaseCase, BaseResponse):
     case_tracker: CaseTrackerResponse | None
     eligibility_outcomes: List[EligibilityOutcomesResponse] | None
     case_adaptations: CaseAdaptationsResponse | None
+
+    class Meta(BaseResponse.Meta):
+        # One-to-one relationships are joined onto the case query,
+        # collections are each read with a single additional query for every case being loaded.
+        load_options = (
+            selectinload(Case.notes),
+            selectinload(Case.people),
+            joinedload(Case.case_tracker),
+            selectinload(Case.eligibility_outcomes),
+            joinedload(Case.case_adaptations),
+        )
+
+
+class BulkCaseResult(BaseModel):
+    """The outcome of creating a single case sent to the bulk create endpoint.
+
+    index is the position of the case in the request. id is set if the case was created,
+    otherwise errors describes why it was not.
+    """
+
+    index: int
+    id: UUID | None = None
+    errors: List[dict] | None = None
+
+
+class BulkCaseResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkCaseResult]
@@ -0,0 +1,19 @@
+from datetime import datetime
+from uuid import UUID
+from sqlmodel import Field, SQLModel
+
+
+class RefreshToken(SQLModel, table=True):
+    """A refresh token, which can be exchanged once for a new access token and refresh token.
+
+    Only a SHA-256 hash of the token is stored. Tokens exchanged for one another share a family_id, so every
+    token descended from a login can be revoked at once.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    token_hash: str = Field(primary_key=True)
+    family_id: UUID = Field(index=True)
+    username: str
+    expires_at: datetime = Field(index=True)
+    used_at: datetime | None = None
@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class RevokedToken(SQLModel, table=True):
+    """An access token which was revoked before it expired, identified by its jti claim.
+
+    Rows are only needed until the token expires, after which they are ignored and can be removed.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti: str = Field(primary_key=True)
+    username: str
+    expires_at: datetime = Field(index=True)
@@ -24,6 +24,7 @@ class Token(SQLModel):
 
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 
 class TokenData(SQLModel):
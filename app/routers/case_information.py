@@ -1,17 +1,59 @@
+import json
 import structlog
-from typing import Sequence
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Security, Depends
-from sqlmodel import Session, select
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    Security,
+    Depends,
+    Header,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+from app.models.base import PageResponse
 from app.models.cases import (
+    BulkCaseResponse,
+    BulkCaseResult,
     CaseRequest,
     Case,
     CaseResponse,
     CaseUpdateRequest,
 )
-from app.db import get_session
+from app.models.case_stats import CaseStatsResponse, DateBucket
+from app.models.eligibility_outcomes import EligibilityOutcomes, EligibilityOutcomeType
+from app.models.types.case_types import CaseTypes
+from app.db.case_stats import read_case_stats, stats_cache
+from app.db import get_async_read_session, get_async_session
+from app.cache.case_cache import case_cache
+from app.routers.responses import (
+    SerialisedJSONResponse,
+    serialised_page_response,
+    serialised_response,
+)
+from app.db.etag import compute_etag, etag_matches, instance_versions, read_etag
+from app.db.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    keyset_order,
+    keyset_paginate,
+    next_cursor,
+)
+from app.routers.export import NDJSON_MEDIA_TYPE, ExportFormat, stream_export
+from app.audit.writer import audit_log_writer
 from app.auth.security import get_current_active_user
+from app.models.audit_log import AuditLogEvent, AuditLogEventResponse, EventType
 from app.models.users import UserScopes
+from app.config import Config
 
 
 logger = structlog.getLogger(__name__)
@@ -25,27 +67,179 @@ router = APIRouter(
 )
 
 
+@router.get(
+    "/stats",
+    tags=["cases"],
+    response_model=CaseStatsResponse,
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
+)
+async def read_stats(
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    bucket: DateBucket = DateBucket.month,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> CaseStatsResponse:
+    """Count the cases created between the optional dates, grouped by case type, eligibility outcome, note type,
+    adaptation, language and the day, week or month they were created in.
+
+    Statistics are cached for CASE_STATS_CACHE_TTL seconds, so may not include the most recent changes.
+    """
+    key = (created_after, created_before, bucket)
+    stats = stats_cache.get(key)
+    if stats is None:
+        stats = await session.run_sync(
+            read_case_stats, created_after, created_before, bucket
+        )
+        stats_cache.set(key, stats)
+    return stats
+
+
+@router.get(
+    "/export",
+    tags=["cases"],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {
+                ExportFormat.ndjson.media_type: {},
+                ExportFormat.csv.media_type: {},
+            },
+            "description": "Every matching case, one per line",
+        }
+    },
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
+)
+async def export_cases(
+    format: ExportFormat = ExportFormat.ndjson,
+    cursor: str | None = None,
+    case_type: CaseTypes | None = None,
+    outcome: EligibilityOutcomeType | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> StreamingResponse:
+    """Stream every case matching the filters, along with their related information, in the order they were created.
+
+    Cases are written as newline delimited JSON, or as CSV with the related information in JSON columns.
+    They are read and sent CASE_EXPORT_CHUNK_SIZE at a time, so the memory used does not grow with the number of
+    cases. Each case includes a cursor, to resume an interrupted export pass the cursor of the last case received.
+    """
+    statement = keyset_order(
+        filter_cases(
+            select(Case).options(*CaseResponse.load_options()),
+            case_type,
+            outcome,
+            created_after,
+            created_before,
+        ),
+        Case,
+        cursor,
+    )
+    return StreamingResponse(
+        stream_export(
+            session, statement, CaseResponse, format, Config.CASE_EXPORT_CHUNK_SIZE
+        ),
+        media_type=format.media_type,
+    )
+
+
 @router.get(
     "/{case_id}",
     tags=["cases"],
     response_model=CaseResponse,
     dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
 )
-async def read_case(case_id: UUID, session: Session = Depends(get_session)) -> Case:
-    case: Case | None = session.get(Case, case_id)
+async def read_case(
+    case_id: UUID,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+    """Read a case, along with all of its related information.
+
+    The ETag header changes whenever the case or its related information changes. Send it back in the
+    If-None-Match header to receive a 304 Not Modified response, without the case, if it has not changed.
+
+    When the case cache is enabled the ETag is read first, then the case is only loaded if the cached
+    response is not for the current version, see CaseCache.
+    """
+    if if_none_match or case_cache.enabled:
+        etag = await read_etag(session, Case, case_id)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="Case not found")
+        if if_none_match and etag_matches(if_none_match, etag, weak=True):
+            return Response(status_code=304, headers={"ETag": etag})
+        if case_cache.enabled:
+            body = await case_cache.get(case_id, etag)
+            if body is not None:
+                return SerialisedJSONResponse.from_body(body, headers={"ETag": etag})
+
+    case: Case | None = await session.get(
+        Case, case_id, options=CaseResponse.load_options()
+    )
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
-    return case
+    etag = compute_etag(instance_versions(case))
+    response = serialised_response(CaseResponse, case, headers={"ETag": etag})
+    if case_cache.enabled:
+        # Cached with the ETag of the loaded case, in case it changed after the ETag was read above.
+        await case_cache.set(case_id, etag, response.body)
+    return response
+
+
+def filter_cases(
+    statement: SelectOfScalar,
+    case_type: CaseTypes | None,
+    outcome: EligibilityOutcomeType | None,
+    created_after: datetime | None,
+    created_before: datetime | None,
+) -> SelectOfScalar:
+    """Restrict a select of cases to the cases matching the filters which were given."""
+    if case_type:
+        statement = statement.where(Case.case_type == case_type)
+    if outcome:
+        statement = statement.where(
+            Case.id.in_(
+                select(EligibilityOutcomes.case_id).where(
+                    EligibilityOutcomes.outcome == outcome
+                )
+            )
+        )
+    if created_after:
+        statement = statement.where(Case.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Case.created_at < created_before)
+    return statement
 
 
 @router.get(
     "/",
     tags=["cases"],
+    response_model=PageResponse[CaseResponse],
     dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
 )
-async def read_all_cases(session: Session = Depends(get_session)) -> Sequence[Case]:
-    cases = session.exec(select(Case)).all()
-    return cases
+async def read_all_cases(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    case_type: CaseTypes | None = None,
+    outcome: EligibilityOutcomeType | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+    """Read a page of cases in the order they were created.
+
+    To read the next page pass the returned next cursor back as the cursor parameter, along with the same filters.
+    """
+    statement = filter_cases(
+        select(Case).options(*CaseResponse.load_options()),
+        case_type,
+        outcome,
+        created_after,
+        created_before,
+    )
+    results = await session.exec(keyset_paginate(statement, Case, limit, cursor))
+    cases = list(results.all())
+    return serialised_page_response(CaseResponse, cases, next_cursor(cases, limit))
 
 
 @router.post(
@@ -55,14 +249,70 @@ async def read_all_cases(session: Session = Depends(get_session)) -> Sequence[Ca
     status_code=201,
     dependencies=[Security(get_current_active_user, scopes=[UserScopes.CREATE])],
 )
-def create_case(
+async def create_case(
     request: CaseRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user=Depends(get_current_active_user),
 ):
-    case = request.create(session)
+    case = await request.async_create(session)
     logger.info("Case created", case_id=case.id, user=user.username)
-    return case
+    audit_log_writer.record(
+        EventType.case_created, username=user.username, case_id=case.id
+    )
+    return serialised_response(CaseResponse, case, status_code=201)
+
+
+@router.get(
+    "/{case_id}/audit",
+    tags=["cases"],
+    response_model=PageResponse[AuditLogEventResponse],
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
+)
+async def read_case_audit_log(
+    case_id: UUID,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+    """Read a page of a case's audit log events, in the order they happened.
+
+    Each page is read using the (case_id, created_at) index. On Postgres the audit log is partitioned by month,
+    the cursor and date filters limit the partitions which are read.
+    """
+    statement = select(AuditLogEvent).where(AuditLogEvent.case_id == case_id)
+    if created_after:
+        statement = statement.where(AuditLogEvent.created_at >= created_after)
+    if created_before:
+        statement = statement.where(AuditLogEvent.created_at < created_before)
+
+    results = await session.exec(
+        keyset_paginate(statement, AuditLogEvent, limit, cursor)
+    )
+    events = list(results.all())
+    return serialised_page_response(
+        AuditLogEventResponse, events, next_cursor(events, limit)
+    )
+
+
+async def check_if_match(
+    session: AsyncSession, case_id: UUID, if_match: str | None
+) -> None:
+    """Check the If-Match header of a request modifying a case, if it was sent.
+
+    The case is locked until the end of the transaction, so it cannot be changed by another request between
+    checking and modifying it.
+    """
+    if not if_match:
+        return
+    etag = await read_etag(session, Case, case_id, lock=True)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    if not etag_matches(if_match, etag):
+        raise HTTPException(
+            status_code=412, detail="Case has been changed since it was read"
+        )
 
 
 @router.put(
@@ -71,10 +321,201 @@ def create_case(
     response_model=CaseResponse,
     dependencies=[Security(get_current_active_user, scopes=[UserScopes.UPDATE])],
 )
-def update_case(
-    case_id: UUID, request: CaseUpdateRequest, session: Session = Depends(get_session)
+async def update_case(
+    case_id: UUID,
+    request: CaseUpdateRequest,
+    if_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_active_user),
+):
+    """Update a case.
+
+    Send the ETag of the case being updated in the If-Match header to only update the case if it has not
+    been changed since it was read, otherwise a 412 Precondition Failed response is returned.
+    """
+    await check_if_match(session, case_id, if_match)
+    case = await request.async_retrieve(
+        session, case_id, options=CaseResponse.load_options()
+    )
+    if case is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    case = await request.async_update(case, session)
+    audit_log_writer.record(
+        EventType.case_updated, username=user.username, case_id=case.id
+    )
+    return serialised_response(
+        CaseResponse, case, headers={"ETag": compute_etag(instance_versions(case))}
+    )
+
+
+@router.patch(
+    "/{case_id}",
+    tags=["cases"],
+    response_model=CaseResponse,
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.UPDATE])],
+)
+async def patch_case(
+    case_id: UUID,
+    patch: Dict[str, Any] = Body(media_type="application/merge-patch+json"),
+    if_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_active_user),
 ):
-    case = request.retrieve(session, case_id)
+    """Partially update a case with a JSON merge patch.
+
+    Only the fields in the patch are changed, see BaseRequest.apply_merge_patch. As with update, send the ETag
+    in the If-Match header to only patch the case if it has not been changed since it was read.
+    """
+    await check_if_match(session, case_id, if_match)
+
+    case: Case | None = await session.get(
+        Case, case_id, options=CaseResponse.load_options()
+    )
     if case is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    return request.update(case, session)
+    case = await CaseUpdateRequest.async_patch(session, case, patch)
+    audit_log_writer.record(
+        EventType.case_updated, username=user.username, case_id=case.id
+    )
+    return serialised_response(
+        CaseResponse, case, headers={"ETag": compute_etag(instance_versions(case))}
+    )
+
+
+async def read_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Read each item from either a JSON array or newline delimited JSON (NDJSON) request body.
+
+    NDJSON is read line by line as it is received, so the whole body is not held in memory.
+    Lines which are not valid JSON are returned as None, so they are reported as invalid cases.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_json_line(line)
+        if buffer.strip():
+            yield _parse_json_line(buffer)
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a list of cases")
+    for item in items:
+        yield item
+
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+async def _bulk_create_batch(
+    session: AsyncSession, batch: List[Tuple[int, CaseRequest]]
+) -> List[BulkCaseResult]:
+    try:
+        cases = await CaseRequest.async_bulk_create(
+            session, [request for _, request in batch]
+        )
+    except IntegrityError as e:
+        logger.warning("Bulk case batch failed", error=str(e.orig))
+        errors = [{"type": "integrity_error", "msg": "The case could not be saved"}]
+        return [BulkCaseResult(index=index, errors=errors) for index, _ in batch]
+    return [
+        BulkCaseResult(index=index, id=case.id)
+        for (index, _), case in zip(batch, cases)
+    ]
+
+
+# The body is read by read_bulk_items rather than by FastAPI, so its schema is declared here.
+_CASE_REQUEST_SCHEMA = {"$ref": "#/components/schemas/CaseRequest"}
+BULK_CREATE_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {
+            "schema": {"type": "array", "items": _CASE_REQUEST_SCHEMA}
+        },
+        NDJSON_MEDIA_TYPE: {
+            "schema": {**_CASE_REQUEST_SCHEMA, "description": "One case per line"}
+        },
+    },
+}
+
+
+@router.post(
+    "/bulk",
+    tags=["cases"],
+    response_model=BulkCaseResponse,
+    status_code=201,
+    openapi_extra={"requestBody": BULK_CREATE_REQUEST_BODY},
+    responses={
+        207: {
+            "description": "Some cases could not be created",
+            "model": BulkCaseResponse,
+        },
+        413: {"description": "Too many cases"},
+    },
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.CREATE])],
+)
+async def bulk_create_cases(
+    http_request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_active_user),
+) -> BulkCaseResponse:
+    """Create many cases in one request.
+
+    The body can either be a JSON array of cases or newline delimited JSON (NDJSON) with one case per line,
+    sent with the `application/x-ndjson` content type. Each case has the same schema as `POST /cases/`.
+
+    Every case is validated before any are created. Valid cases are then inserted in batches, each in a
+    single transaction, while invalid cases are reported with their errors.
+    The response status is 201 if every case was created, or 207 if any could not be created.
+    """
+    results: List[BulkCaseResult] = []
+    valid_requests: List[Tuple[int, CaseRequest]] = []
+    async for item in read_bulk_items(http_request):
+        index = len(results) + len(valid_requests)
+        if index >= Config.BULK_CREATE_MAX_CASES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {Config.BULK_CREATE_MAX_CASES} cases can be created at once",
+            )
+        try:
+            valid_requests.append((index, CaseRequest.model_validate(item)))
+        except ValidationError as e:
+            errors = e.errors(
+                include_url=False, include_context=False, include_input=False
+            )
+            results.append(BulkCaseResult(index=index, errors=errors))
+
+    batch_size = Config.BULK_CREATE_BATCH_SIZE
+    for start in range(0, len(valid_requests), batch_size):
+        batch = valid_requests[start : start + batch_size]
+        results.extend(await _bulk_create_batch(session, batch))
+
+    results.sort(key=lambda result: result.index)
+    for result in results:
+        if result.id is not None:
+            audit_log_writer.record(
+                EventType.case_created, username=user.username, case_id=result.id
+            )
+    failed = sum(1 for result in results if result.id is None)
+    if failed:
+        response.status_code = 207
+    logger.info(
+        "Cases bulk created",
+        created=len(results) - failed,
+        failed=failed,
+        user=user.username,
+    )
+    return BulkCaseResponse(
+        created=len(results) - failed, failed=failed, results=results
+    )
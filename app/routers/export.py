@@ -0,0 +1,133 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+
+import anyio
+import orjson
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
+
+from app.db.pagination import encode_cursor
+from app.metrics import registry
+from app.models.base import BaseResponse
+from app.routers.responses import encode_default
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Each row includes the cursor to resume the export from after it, so clients never need to build a cursor.
+CURSOR_FIELD = "cursor"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return NDJSON_MEDIA_TYPE if self == ExportFormat.ndjson else "text/csv"
+
+
+exported_rows = registry.counter("export.rows", "Rows written by exports")
+stopped_exports = registry.counter(
+    "export.stopped",
+    "Exports stopped before every row was written, i.e. as the client disconnected",
+)
+
+
+def _row(response_class: type[BaseResponse], instance: SQLModel) -> dict:
+    row = response_class.serialise(instance)
+    row[CURSOR_FIELD] = encode_cursor(instance.created_at, instance.id)
+    return row
+
+
+def encode_ndjson(
+    response_class: type[BaseResponse], instances: Sequence[SQLModel]
+) -> bytes:
+    """Encode instances as newline delimited JSON, one instance per line, each with the cursor following it."""
+    return b"".join(
+        orjson.dumps(
+            _row(response_class, instance),
+            default=encode_default,
+            option=orjson.OPT_UTC_Z,
+        )
+        + b"\n"
+        for instance in instances
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        # Formatted as in the JSON columns and NDJSON exports, with UTC as Z.
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z).decode().strip('"')
+    if isinstance(value, (dict, list)):
+        # Related instances are written as a JSON column
+        return orjson.dumps(
+            value, default=encode_default, option=orjson.OPT_UTC_Z
+        ).decode()
+    return value
+
+
+def encode_csv(
+    response_class: type[BaseResponse],
+    instances: Sequence[SQLModel],
+    header: bool = False,
+) -> bytes:
+    """Encode instances as CSV rows, with a column for each of the response's fields and a final cursor column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([*response_class.model_fields, CURSOR_FIELD])
+    for instance in instances:
+        writer.writerow(
+            _csv_value(value) for value in _row(response_class, instance).values()
+        )
+    return buffer.getvalue().encode()
+
+
+async def stream_export(
+    session: AsyncSession,
+    statement: Select,
+    response_class: type[BaseResponse],
+    export_format: ExportFormat,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """Stream the instances selected by the statement, encoded chunk_size instances at a time.
+
+    The statement must be ordered by keyset_order, so the cursor written with each instance resumes the export
+    directly after it.
+
+    The rows are read with a server-side cursor, so only one chunk of instances, along with the related instances
+    loaded for it, is held in memory at once. Each chunk is removed from the session once it has been sent.
+
+    When the client disconnects the response is cancelled and the generator closed, the cursor is then closed
+    straight away rather than being left open until the session ends.
+    """
+    result = await session.stream_scalars(
+        statement.execution_options(yield_per=chunk_size)
+    )
+    completed = False
+    try:
+        if export_format == ExportFormat.csv:
+            yield encode_csv(response_class, [], header=True)
+        async for instances in result.partitions():
+            if export_format == ExportFormat.csv:
+                yield encode_csv(response_class, instances)
+            else:
+                yield encode_ndjson(response_class, instances)
+            exported_rows.inc(len(instances))
+            for instance in instances:
+                # Expunging the instance also expunges its related instances
+                session.expunge(instance)
+        completed = True
+    finally:
+        if not completed:
+            stopped_exports.inc()
+        # Shielded, as the close would otherwise be cancelled along with the response.
+        with anyio.CancelScope(shield=True):
+            await result.close()
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Security
+from app.auth.security import get_current_active_user
+from app.metrics import registry
+from app.models.users import UserScopes
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Security(get_current_active_user, scopes=[UserScopes.READ])],
+)
+
+
+@router.get("/")
+async def read_metrics() -> dict:
+    """Returns the current value of every metric recorded by this worker.
+
+    Each worker process records its own metrics, so these should be collected from every worker.
+    """
+    return registry.snapshot()
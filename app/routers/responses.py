@@ -0,0 +1,69 @@
+import uuid
+from typing import Any, Mapping, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from sqlmodel import SQLModel
+
+from app.models.base import BaseResponse
+
+
+def encode_default(value: Any) -> Any:
+    """Encode the values orjson does not handle natively.
+
+    orjson only encodes UUIDs of exactly the uuid.UUID type, asyncpg reads UUID columns as its own subclass.
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError
+
+
+class SerialisedJSONResponse(JSONResponse):
+    """A JSON response encoded with orjson, for content created by BaseResponse.serialise.
+
+    Timezone aware datetimes are written with a Z suffix, as pydantic writes them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=encode_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+
+    @classmethod
+    def from_body(
+        cls, body: bytes, headers: Mapping[str, str] | None = None
+    ) -> Response:
+        """A response with an already encoded body, i.e. one read from a cache."""
+        return Response(body, media_type=cls.media_type, headers=headers)
+
+
+def serialised_response(
+    response_class: type[BaseResponse],
+    instance: SQLModel,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> SerialisedJSONResponse:
+    """Build the response for an instance without validating it against the response model.
+
+    FastAPI does not validate or re-encode a Response returned by an endpoint, so the endpoint's response_model
+    is still used for the documentation but is not applied.
+    """
+    return SerialisedJSONResponse(
+        response_class.serialise(instance), status_code=status_code, headers=headers
+    )
+
+
+def serialised_page_response(
+    response_class: type[BaseResponse],
+    instances: Sequence[SQLModel],
+    next_cursor: str | None,
+) -> SerialisedJSONResponse:
+    """Build the response for a PageResponse, see serialised_response."""
+    return SerialisedJSONResponse(
+        {
+            "items": [response_class.serialise(instance) for instance in instances],
+            "next": next_cursor,
+        }
+    )
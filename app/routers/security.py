@@ -1,17 +1,32 @@
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from app.auth.security import (
     create_access_token,
-    authenticate_user,
+    async_authenticate_user,
+    get_current_active_user,
+    get_user,
+    oauth2_scheme,
+    token_decode,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
-from app.models.users import Token
-from sqlmodel import Session
+from app.auth.revocation import revocation_list
+from app.auth.keys import signing_keys
+from app.auth.password_pool import PasswordPoolSaturatedError
+from app.auth.refresh_tokens import (
+    issue_refresh_token,
+    logins,
+    refreshes,
+    revoke_refresh_token,
+    use_refresh_token,
+)
+from app.config import Config
+from app.models.users import Token, User
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_session
 
 
 router = APIRouter(
@@ -19,37 +34,151 @@ router = APIRouter(
 )
 
 
+def access_token_for(user: User) -> str:
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(
+        data={"sub": user.username},
+        expires_delta=access_token_expires,
+        scopes=user.scopes,
+    )
+
+
 @router.post("/token")
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Token:
     """
     This endpoint accepts a username and password, authenticates the user, and returns a JSON Web Token (JWT) if the credentials are valid.
     This JWT is signed and will expire after 30 minutes. This token can then be used to authenticate subsequent requests.
+    A refresh token is also returned, which can be exchanged at /token/refresh for a new access token without
+    sending the password again.
 
     Args:
         form_data (OAuth2PasswordRequestForm): The form data containing the username and password.
-        session (Session): The current database session
+        session (AsyncSession): The current database session
 
     Returns:
-        Token: An JWT containing the access token and its type.
+        Token: An JWT containing the access token and its type, along with a refresh token.
 
     Raises:
         HTTPException: If authentication fails, an HTTP 401 Unauthorised error is raised with
         a message indicating incorrect username or password.
+        HTTPException: If too many logins are already being processed, an HTTP 503 Service Unavailable
+        error is raised, the client should retry after the Retry-After header.
     """
-    user = authenticate_user(session, form_data.username, form_data.password)
+    try:
+        user = await async_authenticate_user(
+            session, form_data.username, form_data.password
+        )
+    except PasswordPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts are being processed, please try again",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username},
-        expires_delta=access_token_expires,
-        scopes=user.scopes,
+    access_token = access_token_for(user)
+    refresh_token = await session.run_sync(issue_refresh_token, user.username)
+    await session.commit()
+    logins.inc()
+    return Token(
+        access_token=str(access_token),
+        token_type="bearer",
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/token/refresh")
+async def refresh_access_token(
+    refresh_token: Annotated[str, Form()],
+    session: AsyncSession = Depends(get_async_session),
+) -> Token:
+    """
+    Exchange a refresh token for a new access token and a new refresh token, without sending the password.
+
+    Each refresh token can only be used once. Sending a used refresh token again revokes every refresh token
+    issued since the login it came from, so the client must log in again.
+
+    Raises:
+        HTTPException: If the refresh token is unknown, expired, revoked or already used, or the user has been
+        disabled or deleted, an HTTP 401 Unauthorised error is raised.
+    """
+    refresh_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    used = await session.run_sync(use_refresh_token, refresh_token)
+    if used is None:
+        # Commits the revocation of a reused token's family.
+        await session.commit()
+        raise refresh_exception
+    user = await get_user(session, used.username)
+    if user is None or user.disabled:
+        await session.commit()
+        raise refresh_exception
+
+    new_refresh_token = await session.run_sync(
+        issue_refresh_token, user.username, used.family_id, used.expires_at
+    )
+    await session.commit()
+    refreshes.inc()
+    return Token(
+        access_token=access_token_for(user),
+        token_type="bearer",
+        refresh_token=new_refresh_token,
+    )
+
+
+@router.post(
+    "/token/revoke",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(get_current_active_user)],
+)
+async def revoke_access_token(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    refresh_token: Annotated[str | None, Form()] = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Revoke the access token used to make this request, i.e. when logging out, so it cannot be used again.
+
+    The token is rejected straight away by the worker which revoked it, and by every other worker once they
+    next refresh their revocation list. If a refresh token of the same user is sent it is revoked too, along
+    with every refresh token issued since the same login.
+    """
+    payload = token_decode(token)
+    if payload.get("jti") is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token cannot be revoked as it has no jti",
+        )
+    if refresh_token is not None:
+        await session.run_sync(revoke_refresh_token, refresh_token, payload["sub"])
+    await revocation_list.revoke(
+        session,
+        payload["jti"],
+        payload["sub"],
+        datetime.fromtimestamp(payload["exp"], UTC).replace(tzinfo=None),
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/.well-known/jwks.json")
+async def read_jwks(response: Response) -> dict:
+    """
+    The public keys access tokens are signed with, as a JSON Web Key Set, so other services can verify tokens
+    without calling this API. Each token's kid header names the key it was signed with.
+
+    The set is empty if tokens are signed with the secret key.
+    """
+    response.headers["Cache-Control"] = (
+        f"public, max-age={int(Config.JWT_KEYS_RELOAD_SECONDS)}"
     )
-    return Token(access_token=str(access_token), token_type="bearer")
+    return signing_keys.jwks()
@@ -0,0 +1,18 @@
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+from app.config import Config
+from app.config.logging import setup_logging
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """Gunicorn worker serving the API with uvicorn, using the uvloop event loop and httptools HTTP parser.
+
+    The default worker picks these automatically if they are installed,
+    they are set explicitly so a missing dependency stops the server rather than silently running slower.
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The base worker replaces the uvicorn loggers' handlers with gunicorn's, restore the API's log format.
+        setup_logging(Config.LOGGER_CONFIG)
@@ -0,0 +1,87 @@
+"""Compares creating cases one request at a time with creating them in bulk.
+
+Usage:
+    python -m benchmarks.bulk_create --cases 1000 --database-url sqlite:///bulk_create.db
+
+Each case is created with its notes, people, eligibility outcomes, tracker and adaptations.
+The database is created, and emptied, by the benchmark, so never point it at a database containing real data.
+"""
+
+import argparse
+import time
+
+from sqlmodel import SQLModel, create_engine
+
+from app.config import Config
+from app.db.session import CustomSession
+from app.models.cases import CaseRequest
+
+CASE_DATA = {
+    "case_type": "Check if your client qualifies for legal aid",
+    "notes": [
+        {"note_type": "Other", "content": ""},
+        {"note_type": "Adaptation", "content": "This is user needs adaptations"},
+    ],
+    "people": [
+        {
+            "name": "Jane Smith",
+            "address": "1 Street",
+            "phone_number": "0202 21212",
+            "postcode": "SW1 1AA",
+            "email": "jane.smith@example.com",
+        }
+    ],
+    "case_tracker": {"gtm_anon_id": "string", "journey": {}},
+    "eligibility_outcomes": [
+        {"eligibility_type": "CCQ", "outcome": "In scope", "answers": {}}
+    ],
+    "case_adaptations": {
+        "languages": ["EN", "CY"],
+        "needed_adaptations": ["BSL - Webcam", "Text Relay"],
+    },
+}
+
+
+def create_one_at_a_time(session: CustomSession, count: int) -> None:
+    for _ in range(count):
+        CaseRequest(**CASE_DATA).create(session)
+
+
+def create_in_bulk(session: CustomSession, count: int, batch_size: int) -> None:
+    for start in range(0, count, batch_size):
+        requests = [
+            CaseRequest(**CASE_DATA) for _ in range(min(batch_size, count - start))
+        ]
+        CaseRequest.bulk_create(session, requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=Config.BULK_CREATE_BATCH_SIZE)
+    parser.add_argument("--database-url", default="sqlite:///bulk_create.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    print(f"Creating {args.cases} cases, bulk batches of {args.batch_size}")
+    for name, create in (
+        ("one at a time", lambda session: create_one_at_a_time(session, args.cases)),
+        (
+            "bulk",
+            lambda session: create_in_bulk(session, args.cases, args.batch_size),
+        ),
+    ):
+        with CustomSession(engine) as session:
+            start = time.perf_counter()
+            create(session)
+            duration = time.perf_counter() - start
+        print(f"  {name:<14} {duration:8.2f}s  {args.cases / duration:10.1f} cases/s")
+
+    SQLModel.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measures the peak memory and throughput of exporting every case, against loading every case at once.
+
+Usage:
+    python -m benchmarks.seed --cases 10000 --database-url sqlite:///benchmark.db
+    python -m benchmarks.export --database-url sqlite:///benchmark.db --chunk-sizes 100 500 2000
+
+Each export is run by stream_export, as GET /cases/export does, with the output discarded. The peak memory
+allocated while exporting is measured with tracemalloc, which slows the export, so the rates should only be
+compared with each other. The peak memory of the exports should depend on the chunk size, not the number of cases.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import tabulate
+from sqlalchemy import make_url, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.session import AsyncCustomSession
+from app.models.cases import Case, CaseResponse
+from app.routers.export import ExportFormat, encode_ndjson, stream_export
+from benchmarks.load_test import ASYNC_DRIVERS
+
+
+def statement():
+    return (
+        select(Case)
+        .options(*CaseResponse.load_options())
+        .order_by(Case.created_at, Case.id)
+    )
+
+
+async def load_all(session) -> int:
+    """Load and encode every case at once, as a single page containing every case would."""
+    cases = (await session.scalars(statement())).all()
+    return len(encode_ndjson(CaseResponse, cases))
+
+
+async def export(session, export_format: ExportFormat, chunk_size: int) -> int:
+    size = 0
+    async for chunk in stream_export(
+        session, statement(), CaseResponse, export_format, chunk_size
+    ):
+        size += len(chunk)
+    return size
+
+
+async def measure(session_maker, run) -> tuple[float, float]:
+    """Run the coroutine function in a new session, returning the seconds taken and the peak MiB allocated."""
+    async with session_maker() as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        await run(session)
+        duration = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return duration, peak / 2**20
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    database_url = make_url(args.database_url)
+    engine = create_async_engine(
+        database_url.set(drivername=ASYNC_DRIVERS[database_url.get_backend_name()])
+    )
+    session_maker = async_sessionmaker(
+        bind=engine, class_=AsyncCustomSession, expire_on_commit=False
+    )
+    async with session_maker() as session:
+        cases = len((await session.scalars(select(Case.id))).all())
+
+    runs = {"load every case": load_all}
+    for chunk_size in args.chunk_sizes:
+        for export_format in ExportFormat:
+            runs[f"{export_format.value} export, chunks of {chunk_size}"] = (
+                lambda session, export_format=export_format, chunk_size=chunk_size: (
+                    export(session, export_format, chunk_size)
+                )
+            )
+
+    table = []
+    for name, run in runs.items():
+        duration, peak = await measure(session_maker, run)
+        table.append([name, f"{cases / duration:.0f}", f"{peak:.1f}"])
+    await engine.dispose()
+
+    print(f"{cases} cases, {database_url.get_backend_name()}")
+    print(tabulate.tabulate(table, headers=["Run", "Cases/s", "Peak MiB"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite:///benchmark.db")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
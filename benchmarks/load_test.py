@@ -0,0 +1,301 @@
+"""Measures the latency, throughput and database queries of the case API against a seeded database.
+
+Usage:
+    python -m benchmarks.seed --cases 10000 --database-url sqlite:///benchmark.db
+    python -m benchmarks.load_test --database-url sqlite:///benchmark.db --save-baseline benchmarks/baselines/sqlite-10k.json
+    python -m benchmarks.load_test --database-url sqlite:///benchmark.db --compare benchmarks/baselines/sqlite-10k.json
+
+The API is run in process, with requests sent by httpx at a fixed concurrency, so the timings include the client.
+The app's lifespan is run as it is by a server, so the timings include writing the audit log.
+Each scenario sends the same number of requests, the database should be re-seeded when comparing against a
+baseline as the create and update scenarios change it.
+
+When comparing against a baseline the exit code is 1 if any scenario has regressed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+from uuid import UUID
+
+import httpx
+import tabulate
+from sqlalchemy import create_engine, make_url, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.audit.writer import audit_log_writer
+from app.auth.revocation import revocation_list
+from app.db import get_async_session
+from app.db.query_counter import QueryCounter
+from app.db.session import AsyncCustomSession
+from app.main import create_app
+from app.metrics import Timer
+from app.models.cases import Case
+from app.models.types.case_types import CaseTypes
+from benchmarks.bulk_create import CASE_DATA
+from benchmarks.seed import BENCHMARK_PASSWORD, BENCHMARK_USERNAME
+
+# The asyncio driver used by the API for each database.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+# Seconds a SQLite connection waits for another connection's write to complete.
+SQLITE_BUSY_TIMEOUT = 60
+
+
+@dataclass
+class LoadTestContext:
+    client: httpx.AsyncClient
+    case_ids: List[UUID]
+    headers: Dict[str, str] = field(default_factory=dict)
+    # Seeded so every run requests the same cases
+    choices: random.Random = field(default_factory=lambda: random.Random(0))
+
+
+async def login(context: LoadTestContext) -> httpx.Response:
+    return await context.client.post(
+        "/latest/token",
+        data={"username": BENCHMARK_USERNAME, "password": BENCHMARK_PASSWORD},
+    )
+
+
+async def read_case(context: LoadTestContext) -> httpx.Response:
+    case_id = context.choices.choice(context.case_ids)
+    return await context.client.get(f"/latest/cases/{case_id}", headers=context.headers)
+
+
+async def list_cases(context: LoadTestContext) -> httpx.Response:
+    return await context.client.get("/latest/cases/", headers=context.headers)
+
+
+async def create_case(context: LoadTestContext) -> httpx.Response:
+    return await context.client.post(
+        "/latest/cases/", json=CASE_DATA, headers=context.headers
+    )
+
+
+async def update_case(context: LoadTestContext) -> httpx.Response:
+    case_id = context.choices.choice(context.case_ids)
+    case_type = context.choices.choice(list(CaseTypes))
+    return await context.client.put(
+        f"/latest/cases/{case_id}",
+        json={"case_type": case_type.value},
+        headers=context.headers,
+    )
+
+
+SCENARIOS: Dict[str, Callable[[LoadTestContext], Awaitable[httpx.Response]]] = {
+    "token": login,
+    "read_case": read_case,
+    "list_cases": list_cases,
+    "create_case": create_case,
+    "update_case": update_case,
+}
+
+
+async def run_scenario(
+    name: str,
+    context: LoadTestContext,
+    engine: AsyncEngine,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """Send the requests for a scenario from concurrency workers, returning its results."""
+    scenario = SCENARIOS[name]
+    timer = Timer(name, max_samples=requests)
+    errors = 0
+    # Shared between the workers, so each request is sent exactly once.
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(context)
+            timer.observe(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    with QueryCounter(engine.sync_engine) as counter:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        # The audit events recorded by the scenario are part of its cost.
+        await audit_log_writer.flush()
+        duration = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": requests / duration,
+        "p50_ms": timer.percentile(50) * 1000,
+        "p95_ms": timer.percentile(95) * 1000,
+        "p99_ms": timer.percentile(99) * 1000,
+        "queries_per_request": counter.count / requests,
+    }
+
+
+def read_case_ids(database_url: str, limit: int) -> List[UUID]:
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        case_ids = list(connection.scalars(select(Case.id).limit(limit)))
+    engine.dispose()
+    if not case_ids:
+        sys.exit("The database has no cases, seed it first with benchmarks.seed")
+    return case_ids
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, dict]:
+    database_url = make_url(args.database_url)
+    backend = database_url.get_backend_name()
+    # SQLite allows a single writer at a time, so requests wait longer for the audit log writer than the default
+    # five seconds rather than failing.
+    connect_args = {"timeout": SQLITE_BUSY_TIMEOUT} if backend == "sqlite" else {}
+    engine = create_async_engine(
+        database_url.set(drivername=ASYNC_DRIVERS[backend]), connect_args=connect_args
+    )
+    session_maker = async_sessionmaker(
+        bind=engine,
+        class_=AsyncCustomSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    async def get_benchmark_session():
+        async with session_maker() as session:
+            yield session
+
+    app = create_app()
+    app.dependency_overrides[get_async_session] = get_benchmark_session
+    # The background tasks started by the lifespan use the benchmark database too.
+    audit_log_writer.session_factory = session_maker
+    revocation_list.session_factory = session_maker
+
+    results = {}
+    # ASGITransport does not send lifespan events, so the app's lifespan is entered here to start the audit log
+    # writer and the revocation list, as a server would.
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        ) as client,
+    ):
+        context = LoadTestContext(
+            client=client, case_ids=read_case_ids(args.database_url, 1000)
+        )
+        response = await login(context)
+        response.raise_for_status()
+        context.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        for name in args.scenarios:
+            # Warm up, so the first requests are not slowed by caches being filled.
+            await SCENARIOS[name](context)
+            results[name] = await run_scenario(
+                name, context, engine, args.requests, args.concurrency
+            )
+    await engine.dispose()
+    return results
+
+
+def find_regressions(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """Compare the results with a baseline.
+
+    Latency and throughput vary between runs, so only changes larger than the tolerance are regressions.
+    The number of queries per request should not vary, so an increase is a regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.1f}ms, baseline {expected['p95_ms']:.1f}ms"
+            )
+        if result["requests_per_second"] < expected["requests_per_second"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                f"{name}: {result['requests_per_second']:.1f} requests/s, "
+                f"baseline {expected['requests_per_second']:.1f} requests/s"
+            )
+        # Allow for updates which happen to set the values a case already has, and so write nothing.
+        if result["queries_per_request"] > expected["queries_per_request"] + 0.1:
+            regressions.append(
+                f"{name}: {result['queries_per_request']:.2f} queries per request, "
+                f"baseline {expected['queries_per_request']:.2f}"
+            )
+    return regressions
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    headers = ["Scenario", "Requests", "Errors", "Requests/s", "p50 ms", "p95 ms"]
+    headers += ["p99 ms", "Queries/request"]
+    table = [
+        [
+            name,
+            result["requests"],
+            result["errors"],
+            f"{result['requests_per_second']:.1f}",
+            f"{result['p50_ms']:.1f}",
+            f"{result['p95_ms']:.1f}",
+            f"{result['p99_ms']:.1f}",
+            f"{result['queries_per_request']:.2f}",
+        ]
+        for name, result in results.items()
+    ]
+    print(tabulate.tabulate(table, headers=headers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite:///benchmark.db")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--save-baseline", help="Save the results to this file")
+    parser.add_argument("--compare", help="Compare the results with this baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Fraction latency and throughput can be worse than the baseline by",
+    )
+    args = parser.parse_args()
+
+    # Every request is logged by httpx otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run_load_test(args))
+    print(
+        f"{args.requests} requests per scenario, concurrency {args.concurrency}, "
+        f"{make_url(args.database_url).get_backend_name()}"
+    )
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions compared with the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions compared with the baseline")
+
+
+if __name__ == "__main__":
+    main()
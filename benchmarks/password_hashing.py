@@ -0,0 +1,121 @@
+"""Reports the latency and memory cost of the argon2 parameters, and the event loop stall caused by logins.
+
+Usage:
+    python -m benchmarks.password_hashing --time-cost 3 --memory-cost 65536 --parallelism 4
+
+Parameters default to the values in app.config.
+"""
+
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+from passlib.hash import argon2
+
+from app.auth.password_pool import PasswordHashingPool
+from app.config import Config
+
+
+def percentile(samples: list[float], percentile: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+def time_calls(function, iterations: int) -> list[float]:
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def max_rss_kib() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def measure_event_loop_lag(logins, interval: float = 0.001) -> float:
+    """Run the logins while measuring the longest time the event loop was unable to run other tasks."""
+    max_lag = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - start - interval)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(interval * 2)
+    await logins()
+    running = False
+    await ticker_task
+    return max_lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--time-cost", type=int, default=Config.ARGON2_TIME_COST)
+    parser.add_argument("--memory-cost", type=int, default=Config.ARGON2_MEMORY_COST)
+    parser.add_argument("--parallelism", type=int, default=Config.ARGON2_PARALLELISM)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=Config.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--concurrent-logins", type=int, default=8)
+    args = parser.parse_args()
+
+    hasher = argon2.using(
+        rounds=args.time_cost,
+        memory_cost=args.memory_cost,
+        parallelism=args.parallelism,
+    )
+    rss_before = max_rss_kib()
+    hashed_password = hasher.hash("benchmark-password")
+    hash_durations = time_calls(
+        lambda: hasher.hash("benchmark-password"), args.iterations
+    )
+    verify_durations = time_calls(
+        lambda: hasher.verify("benchmark-password", hashed_password), args.iterations
+    )
+    rss_growth = max_rss_kib() - rss_before
+
+    def verify():
+        return hasher.verify("benchmark-password", hashed_password)
+
+    async def inline_logins():
+        for _ in range(args.concurrent_logins):
+            verify()
+
+    pool = PasswordHashingPool(workers=args.workers, queue_size=args.concurrent_logins)
+
+    async def pooled_logins():
+        await asyncio.gather(*(pool.run(verify) for _ in range(args.concurrent_logins)))
+
+    inline_lag = asyncio.run(measure_event_loop_lag(inline_logins))
+    pooled_lag = asyncio.run(measure_event_loop_lag(pooled_logins))
+
+    print(
+        f"argon2id t={args.time_cost} m={args.memory_cost}KiB p={args.parallelism}, "
+        f"{args.iterations} iterations"
+    )
+    for name, durations in (("hash", hash_durations), ("verify", verify_durations)):
+        print(
+            f"  {name:<7} mean {statistics.mean(durations) * 1000:8.1f}ms"
+            f"  p95 {percentile(durations, 95) * 1000:8.1f}ms"
+        )
+    print(f"  memory per hash         {args.memory_cost / 1024:8.1f}MiB")
+    print(f"  peak RSS growth         {rss_growth / 1024:8.1f}MiB")
+    print(
+        f"  pool memory bound       {args.workers * args.memory_cost / 1024:8.1f}MiB "
+        f"({args.workers} workers)"
+    )
+    print(
+        f"  event loop stall for {args.concurrent_logins} logins: "
+        f"inline {inline_lag * 1000:.1f}ms, pooled {pooled_lag * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Seeds a database with cases for the load test.
+
+Usage:
+    python -m benchmarks.seed --cases 10000 --database-url sqlite:///benchmark.db
+
+The saved baselines use volumes of 10,000, 100,000 and 1,000,000 cases.
+The tables are created if they do not already exist, along with a user who has every scope.
+"""
+
+import argparse
+import time
+
+from sqlmodel import SQLModel, create_engine
+
+from app.auth.security import get_password_hash
+from app.config import Config
+from app.db.session import CustomSession
+from app.models.cases import CaseRequest
+from app.models.users import User, UserScopes
+from benchmarks.bulk_create import CASE_DATA
+
+BENCHMARK_USERNAME = "benchmark"
+BENCHMARK_PASSWORD = "benchmark"
+
+
+def add_benchmark_user(session: CustomSession) -> None:
+    if session.get(User, BENCHMARK_USERNAME) is not None:
+        return
+    session.add(
+        User(
+            username=BENCHMARK_USERNAME,
+            hashed_password=get_password_hash(BENCHMARK_PASSWORD),
+            scopes=UserScopes.as_list(),
+        )
+    )
+    session.commit()
+
+
+def seed(session: CustomSession, cases: int, batch_size: int) -> None:
+    for start in range(0, cases, batch_size):
+        requests = [
+            CaseRequest(**CASE_DATA) for _ in range(min(batch_size, cases - start))
+        ]
+        CaseRequest.bulk_create(session, requests)
+        print(f"  {start + len(requests)}/{cases} cases", end="\r")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=Config.BULK_CREATE_BATCH_SIZE)
+    parser.add_argument("--database-url", default="sqlite:///benchmark.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    SQLModel.metadata.create_all(engine)
+    start = time.perf_counter()
+    with CustomSession(engine) as session:
+        add_benchmark_user(session)
+        seed(session, args.cases, args.batch_size)
+    print(f"Seeded {args.cases} cases in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compares the throughput of encoding a case response with FastAPI's default path against the fast path.
+
+Usage:
+    python -m benchmarks.serialisation --items 1 10 100 1000 --repeat 5
+
+The default path validates the case against CaseResponse, dumps it to JSON compatible values and encodes them with
+json.dumps, as FastAPI does for an endpoint returning a model. The fast path is BaseResponse.serialise encoded by
+SerialisedJSONResponse. Each case has the given number of notes, people and eligibility outcomes, and is built in
+memory so no database is needed.
+"""
+
+import argparse
+import json
+import timeit
+
+import tabulate
+from fastapi.responses import JSONResponse
+from sqlmodel import Session, create_engine
+
+from app.models.cases import Case, CaseResponse
+from app.routers.responses import serialised_response
+from benchmarks.translate import build_request
+
+
+def default_path(case: Case) -> bytes:
+    content = CaseResponse.model_validate(case).model_dump(mode="json")
+    return JSONResponse(content).body
+
+
+def fast_path(case: Case) -> bytes:
+    return serialised_response(CaseResponse, case).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    session = Session(create_engine("sqlite://"))
+    table = []
+    for items in args.items:
+        case = build_request(items).build(session)
+        if json.loads(default_path(case)) != json.loads(fast_path(case)):
+            raise AssertionError(
+                f"The paths encode the case with {items} items differently"
+            )
+        size = len(fast_path(case))
+        number = max(1, 2000 // items)
+        row = [items, size]
+        rates = []
+        for path in (default_path, fast_path):
+            best = min(
+                timeit.repeat(lambda: path(case), number=number, repeat=args.repeat)
+            )
+            rates.append(size * number / best)
+            row.append(f"{best / number * 1000:.3f}")
+        row += [f"{rate / 1e6:.1f}" for rate in rates]
+        row.append(f"{rates[1] / rates[0]:.1f}x")
+        table.append(row)
+
+    print(f"Best of {args.repeat} runs")
+    print(
+        tabulate.tabulate(
+            table,
+            headers=[
+                "Items per list",
+                "Bytes",
+                "Default ms",
+                "Fast ms",
+                "Default MB/s",
+                "Fast MB/s",
+                "Speed up",
+            ],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Compares the throughput of the API served by a single uvicorn process against gunicorn with several workers.
+
+Usage:
+    python -m benchmarks.server --workers 1 2 4 --duration 10
+
+Each profile is started as its own server, then sent requests from client processes for the duration.
+The default path is the documentation page, which does not use the database, so the results measure the server
+rather than the database. To include the database, run against Postgres with an authenticated path:
+    python -m benchmarks.server --path /latest/cases/ --token <access token>
+
+The client processes share the machine with the server, so use fewer client processes than cores.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import tabulate
+
+PORT = 8099
+
+
+def profiles(workers: list[int]) -> dict[str, list[str]]:
+    """The command used to start the server for each profile."""
+    uvicorn = [sys.executable, "-m", "uvicorn", "app:case_api", "--port", str(PORT)]
+    gunicorn = [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"]
+    gunicorn += ["--bind", f"127.0.0.1:{PORT}", "app:case_api"]
+    return {
+        "uvicorn asyncio h11": uvicorn + ["--loop", "asyncio", "--http", "h11"],
+        "uvicorn uvloop httptools": uvicorn
+        + ["--loop", "uvloop", "--http", "httptools"],
+        **{
+            f"gunicorn {count} workers": gunicorn + ["--workers", str(count)]
+            for count in workers
+        },
+    }
+
+
+def wait_for_server(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server did not start listening on {url}")
+
+
+async def send_requests(
+    url: str, headers: dict, concurrency: int, duration: float
+) -> tuple[int, int]:
+    """Send requests over keep-alive connections for the duration, returning the number sent and the errors."""
+    sent = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, headers=headers) as client:
+
+        async def worker():
+            nonlocal sent, errors
+            while time.monotonic() < deadline:
+                response = await client.get(url)
+                sent += 1
+                if response.status_code >= 400:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sent, errors
+
+
+def client_process(args: tuple[str, dict, int, float]) -> tuple[int, int]:
+    return asyncio.run(send_requests(*args))
+
+
+def run_profile(command: list[str], args: argparse.Namespace) -> tuple[int, int]:
+    url = f"http://127.0.0.1:{PORT}{args.path}"
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    environment = {**os.environ, "DB_CONNECTION_BUDGET": str(args.connection_budget)}
+    server = subprocess.Popen(
+        command, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(url)
+        with multiprocessing.Pool(args.client_processes) as pool:
+            results = pool.map(
+                client_process,
+                [(url, headers, args.concurrency, args.duration)]
+                * args.client_processes,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    return sum(sent for sent, _ in results), sum(errors for _, errors in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-processes", type=int, default=1)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--token", help="Access token sent with each request")
+    parser.add_argument(
+        "--connection-budget",
+        type=int,
+        default=1000,
+        help="Skips reading the budget from the database when it is not running",
+    )
+    args = parser.parse_args()
+
+    table = []
+    single_process_rate = None
+    for name, command in profiles(args.workers).items():
+        sent, errors = run_profile(command, args)
+        rate = sent / args.duration
+        if name == "uvicorn uvloop httptools":
+            single_process_rate = rate
+        gain = f"{rate / single_process_rate:.2f}x" if single_process_rate else ""
+        table.append([name, sent, errors, f"{rate:.1f}", gain])
+
+    print(
+        f"GET {args.path}, {args.client_processes} client processes with {args.concurrency} connections each, "
+        f"{os.cpu_count()} cores"
+    )
+    print(
+        tabulate.tabulate(
+            table,
+            headers=["Profile", "Requests", "Errors", "Requests/s", "vs one process"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measures how long CaseRequest.translate takes for payloads with many related items.
+
+Usage:
+    python -m benchmarks.translate --items 10 100 1000 --repeat 5
+
+Each payload has the given number of notes, people and eligibility outcomes. Requests are translated as they are
+when creating a case, so no database queries are made and only the translation itself is timed.
+"""
+
+import argparse
+import timeit
+
+import tabulate
+from sqlmodel import Session, create_engine
+
+from app.models.cases import CaseRequest
+from benchmarks.bulk_create import CASE_DATA
+
+
+def build_request(items: int) -> CaseRequest:
+    return CaseRequest(
+        **{
+            **CASE_DATA,
+            "notes": CASE_DATA["notes"][:1] * items,
+            "people": CASE_DATA["people"] * items,
+            "eligibility_outcomes": CASE_DATA["eligibility_outcomes"] * items,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    session = Session(create_engine("sqlite://"))
+    table = []
+    for items in args.items:
+        request = build_request(items)
+        # Run enough times for each measurement to take around a second for the smallest payload.
+        number = max(1, 10000 // items)
+        best = min(
+            timeit.repeat(
+                lambda: request.translate(session, create=True),
+                number=number,
+                repeat=args.repeat,
+            )
+        )
+        per_call = best / number
+        table.append(
+            [items, f"{per_call * 1000:.3f}", f"{per_call / (items * 3) * 1e6:.2f}"]
+        )
+
+    print(f"Best of {args.repeat} runs")
+    print(
+        tabulate.tabulate(
+            table, headers=["Items per list", "ms per translate", "µs per item"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
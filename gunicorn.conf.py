@@ -0,0 +1,48 @@
+"""Gunicorn settings used to serve the API in production.
+
+Usage:
+    gunicorn --config gunicorn.conf.py app:case_api
+
+Each worker is a separate process with its own event loop and database connection pool.
+Settings are read from app.config, see the server documentation for what each does.
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import Config
+from app.db import db_url
+from app.db.pool import check_connection_budget, read_connection_budget
+
+bind = f"0.0.0.0:{Config.SERVER_PORT}"
+workers = Config.WEB_CONCURRENCY
+worker_class = "app.server.UvicornWorker"
+backlog = Config.SERVER_BACKLOG
+keepalive = Config.SERVER_KEEPALIVE
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS_JITTER
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+
+
+def on_starting(server):
+    """Refuse to start if the workers' connection pools could exhaust the database's connections."""
+    budget = Config.DB_CONNECTION_BUDGET
+    if not budget:
+        # A separate engine is used, so the connection is not inherited by the forked workers.
+        engine = create_engine(db_url, poolclass=NullPool)
+        try:
+            budget = read_connection_budget(engine)
+        except Exception as e:
+            server.log.warning(f"Could not read the database connection budget: {e}")
+            return
+        finally:
+            engine.dispose()
+    connections = check_connection_budget(
+        workers=server.cfg.workers,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        budget=budget,
+    )
+    server.log.info(
+        f"{server.cfg.workers} workers can open up to {connections} of {budget} database connections"
+    )
@@ -3,12 +3,24 @@
 
 import tabulate
 import typer
+from datetime import date
+import json
+import os
 from typing import List, Optional
 from typing_extensions import Annotated
 from sqlmodel import Session
 from sqlmodel.sql.expression import select
 from fastapi import Depends
 from fastapi.params import Security
+from app.auth.keys import (
+    generate_signing_key as generate_jwk,
+    parse_jwk,
+    public_jwk,
+    write_key_file,
+)
+from app.config import Config
+from app.db.partitions import create_partitions, expire_partitions
+from app.models.audit_log import AuditLogEvent
 from app.models.users import User, UserScopes
 from app.auth.security import get_password_hash
 from app.db import get_session
@@ -173,6 +185,77 @@ def list_users():
     print(tabulate.tabulate(table, headers=headers, tablefmt="fancy_grid"))
 
 
+@app.command()
+def manage_audit_partitions(
+    ahead: Annotated[int, typer.Option()] = Config.AUDIT_PARTITIONS_AHEAD,
+    retention_months: Annotated[int, typer.Option()] = Config.AUDIT_RETENTION_MONTHS,
+    archive: Annotated[bool, typer.Option()] = False,
+):
+    """Create the audit log's upcoming monthly partitions, and drop, or with --archive detach, expired ones."""
+    connection = app.db_session.connection()
+    if connection.dialect.name != "postgresql":
+        print("The audit log is only partitioned on Postgres")
+        return
+    table = AuditLogEvent.__tablename__
+    today = date.today()
+    for name in create_partitions(connection, table, today, ahead):
+        print(f"Created partition {name}")
+    for name in expire_partitions(
+        connection, table, today, retention_months, archive=archive
+    ):
+        print(f"{'Detached' if archive else 'Dropped'} partition {name}")
+    app.db_session.commit()
+
+
+def require_jwks_file(jwks_file: str | None) -> None:
+    if jwks_file is None:
+        print("Set --jwks-file or JWT_JWKS_FILE")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def generate_signing_key(
+    kid: str,
+    output: Annotated[str, typer.Option()],
+    jwks_file: Annotated[Optional[str], typer.Option()] = Config.JWT_JWKS_FILE,
+    algorithm: Annotated[str, typer.Option()] = "RS256",
+):
+    """Write a new private key to output, and add its public key to the JWK set in jwks_file."""
+    require_jwks_file(jwks_file)
+    if os.path.exists(output):
+        print(f"{output} already exists")
+        raise typer.Exit(code=1)
+    key = generate_jwk(kid, algorithm)
+    jwks = {"keys": []}
+    if os.path.exists(jwks_file):
+        with open(jwks_file) as file:
+            jwks = json.load(file)
+    if any(existing.get("kid") == kid for existing in jwks["keys"]):
+        print(f"Key {kid} is already in {jwks_file}")
+        raise typer.Exit(code=1)
+    jwks["keys"].append(public_jwk(parse_jwk(key, private=True)))
+    write_key_file(output, key)
+    write_key_file(jwks_file, jwks)
+    print(f"Written key {kid} to {output} and added it to {jwks_file}")
+
+
+@app.command()
+def remove_signing_key(
+    kid: str,
+    jwks_file: Annotated[Optional[str], typer.Option()] = Config.JWT_JWKS_FILE,
+):
+    """Remove a public key from the JWK set in jwks_file, so tokens signed with it are no longer accepted."""
+    require_jwks_file(jwks_file)
+    with open(jwks_file) as file:
+        jwks = json.load(file)
+    keys = [key for key in jwks["keys"] if key.get("kid") != kid]
+    if len(keys) == len(jwks["keys"]):
+        print(f"Key {kid} is not in {jwks_file}")
+        raise typer.Exit(code=1)
+    write_key_file(jwks_file, {"keys": keys})
+    print(f"Removed key {kid} from {jwks_file}")
+
+
 def get_scopes_from_dependencies(dependencies: List[Depends]):
     scopes = []
     for dependency in dependencies:
@@ -0,0 +1,65 @@
+from datetime import UTC, datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from typer.testing import CliRunner
+from app.models.audit_log import AuditLogEvent, EventType
+from manage import app as management_app, init_session
+from tests.cases.utils import create_test_case
+
+
+def add_events(session: Session, case_id, days):
+    events = [
+        AuditLogEvent(
+            event_type=EventType.case_updated,
+            case_id=case_id,
+            username="cla_admin",
+            created_at=datetime(2024, 10, day, tzinfo=UTC),
+        )
+        for day in days
+    ]
+    session.add_all(events)
+    session.commit()
+    return events
+
+
+def test_read_case_audit_log(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    other_case = create_test_case(session)
+    events = add_events(session, case.id, [1, 2, 3])
+    add_events(session, other_case.id, [1])
+
+    first_page = client_authed.get(f"latest/cases/{case.id}/audit", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert [event["id"] for event in first_page.json()["items"]] == [
+        str(event.id) for event in events[:2]
+    ]
+    assert first_page.json()["items"][0]["event_type"] == "Case Updated"
+    assert first_page.json()["items"][0]["username"] == "cla_admin"
+
+    second_page = client_authed.get(
+        f"latest/cases/{case.id}/audit",
+        params={"limit": 2, "cursor": first_page.json()["next"]},
+    ).json()
+    assert [event["id"] for event in second_page["items"]] == [str(events[2].id)]
+    assert second_page["next"] is None
+
+
+def test_read_case_audit_log_date_filters(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    events = add_events(session, case.id, [1, 2, 3])
+
+    response = client_authed.get(
+        f"latest/cases/{case.id}/audit",
+        params={
+            "created_after": "2024-10-02T00:00:00",
+            "created_before": "2024-10-03T00:00:00",
+        },
+    )
+    assert [event["id"] for event in response.json()["items"]] == [str(events[1].id)]
+
+
+def test_manage_audit_partitions_requires_postgres(session: Session):
+    init_session(management_app, session)
+    result = CliRunner().invoke(management_app, ["manage-audit-partitions"])
+    assert result.exit_code == 0
+    assert "only partitioned on Postgres" in result.stdout
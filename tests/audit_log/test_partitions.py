@@ -0,0 +1,42 @@
+from datetime import date
+from app.db.partitions import (
+    add_months,
+    create_partition_sql,
+    expired_months,
+    is_partition,
+    partition_name,
+)
+
+
+def test_add_months():
+    assert add_months(date(2024, 11, 1), 1) == date(2024, 12, 1)
+    assert add_months(date(2024, 11, 1), 2) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert add_months(date(2024, 1, 1), -24) == date(2022, 1, 1)
+
+
+def test_create_partition_sql():
+    assert partition_name("audit_log", date(2024, 10, 1)) == "audit_log_2024_10"
+    assert create_partition_sql("audit_log", date(2024, 12, 15)) == (
+        "CREATE TABLE IF NOT EXISTS audit_log_2024_12 PARTITION OF audit_log "
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+    )
+
+
+def test_expired_months():
+    partitions = {
+        date(2024, month, 1): f"audit_log_2024_{month:02}" for month in range(1, 13)
+    }
+    # Partitions are only expired once every row in them is older than the retention period.
+    assert expired_months(partitions, date(2024, 12, 20), retention_months=9) == [
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+    ]
+    assert expired_months(partitions, date(2024, 12, 20), retention_months=12) == []
+
+
+def test_is_partition():
+    assert is_partition("audit_log_2024_10")
+    assert is_partition("audit_log_default")
+    assert not is_partition("audit_log")
+    assert not is_partition("cases")
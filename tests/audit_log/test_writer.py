@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app import case_api
+from app.audit.writer import (
+    DROP_NEWEST,
+    DROP_OLDEST,
+    AuditLogWriter,
+    audit_log_writer,
+)
+from app.db.query_counter import QueryCounter
+from app.db.session import AsyncCustomSession
+from app.models.audit_log import AuditLogEvent, EventType
+from tests.cases.utils import get_case_test_data
+
+
+def create_writer(session: Session, **options) -> AuditLogWriter:
+    options = {"max_size": 100, "batch_size": 2, "flush_interval": 0.01, **options}
+    return AuditLogWriter(
+        lambda: AsyncCustomSession(sync_session_class=lambda **kwargs: session),
+        **options,
+    )
+
+
+def written_events(session: Session) -> list[AuditLogEvent]:
+    return list(session.exec(select(AuditLogEvent).order_by(AuditLogEvent.created_at)))
+
+
+def test_flush_writes_batches(session: Session):
+    writer = create_writer(session)
+    for _ in range(5):
+        writer.record(EventType.user_authenticated, username="cla_admin")
+
+    with QueryCounter(session.get_bind()) as counter:
+        asyncio.run(writer.flush())
+    # One multi-row INSERT for each batch of two events
+    assert counter.count == 3
+    assert len(writer) == 0
+    assert len(written_events(session)) == 5
+
+
+@pytest.mark.parametrize(
+    "overflow,expected",
+    [
+        (DROP_NEWEST, [EventType.case_created, EventType.case_updated]),
+        (DROP_OLDEST, [EventType.case_updated, EventType.case_deleted]),
+    ],
+)
+def test_overflow(session: Session, overflow, expected):
+    writer = create_writer(session, max_size=2, overflow=overflow)
+    dropped = writer.dropped.value
+    for event_type in (
+        EventType.case_created,
+        EventType.case_updated,
+        EventType.case_deleted,
+    ):
+        writer.record(event_type)
+
+    assert len(writer) == 2
+    assert writer.dropped.value == dropped + 1
+    asyncio.run(writer.flush())
+    assert [event.event_type for event in written_events(session)] == expected
+
+
+def test_unknown_overflow_policy(session: Session):
+    with pytest.raises(ValueError):
+        create_writer(session, overflow="block")
+
+
+def test_background_task_writes_and_drains(session: Session):
+    writer = create_writer(session, batch_size=100, flush_interval=0.01)
+    flush = writer.flush
+
+    async def run():
+        flushed = asyncio.Event()
+
+        async def flush_and_notify():
+            await flush()
+            flushed.set()
+
+        writer.flush = flush_and_notify
+        writer.start()
+        writer.record(EventType.user_authenticated, username="cla_admin")
+        # Written once the flush interval has passed, although the batch is not full
+        await asyncio.wait_for(flushed.wait(), timeout=5)
+        assert len(writer) == 0
+        written = len(written_events(session))
+        writer.record(EventType.user_wrong_password, username="cla_admin")
+        await writer.stop()
+        return written
+
+    assert asyncio.run(run()) == 1
+    assert [event.event_type for event in written_events(session)] == [
+        EventType.user_authenticated,
+        EventType.user_wrong_password,
+    ]
+
+
+def test_failed_batch_dropped(session: Session):
+    def broken_session():
+        raise ConnectionError("Database unavailable")
+
+    writer = AuditLogWriter(
+        broken_session, max_size=10, batch_size=10, flush_interval=1
+    )
+    writer.record(EventType.other)
+    errors = writer.flush_errors.value
+
+    asyncio.run(writer.flush())
+    assert len(writer) == 0
+    assert writer.flush_errors.value == errors + 1
+
+
+def test_requests_record_events(client_authed: TestClient):
+    # Logging in to create client_authed recorded an event
+    assert [event.event_type for event in audit_log_writer._queue] == [
+        EventType.user_authenticated
+    ]
+    case_id = client_authed.post("latest/cases/", json=get_case_test_data()).json()[
+        "id"
+    ]
+    client_authed.put(f"latest/cases/{case_id}", json={"notes": []})
+    client_authed.post("latest/token", data={"username": "cla_admin", "password": "no"})
+
+    events = list(audit_log_writer._queue)[1:]
+    assert [(event.event_type, str(event.case_id)) for event in events[:2]] == [
+        (EventType.case_created, case_id),
+        (EventType.case_updated, case_id),
+    ]
+    assert all(event.username == "cla_admin" for event in events)
+    assert events[2].event_type == EventType.user_wrong_password
+
+
+def test_events_written_on_shutdown(session: Session, client: TestClient, monkeypatch):
+    monkeypatch.setattr(
+        audit_log_writer,
+        "session_factory",
+        lambda: AsyncCustomSession(sync_session_class=lambda **kwargs: session),
+    )
+    monkeypatch.setattr(audit_log_writer, "flush_interval", 60)
+    with TestClient(case_api) as running_client:
+        running_client.post(
+            "latest/token", data={"username": "cla_admin", "password": "cla_admin"}
+        )
+    assert [event.event_type for event in written_events(session)] == [
+        EventType.user_authenticated
+    ]
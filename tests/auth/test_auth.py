@@ -93,7 +93,7 @@ def test_create_token():
     token = create_access_token(
         data={"sub": "cla_admin"}, expires_delta=timedelta(minutes=30), scopes=[]
     )
-    expected_keys = ["sub", "scopes", "exp"]
+    expected_keys = ["sub", "scopes", "exp", "iat", "jti"]
     token_data = token_decode(token)
     assert list(token_data.keys()) == expected_keys
 
@@ -0,0 +1,240 @@
+import json
+import os
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from jwt.exceptions import InvalidTokenError
+from typer.testing import CliRunner
+
+from app.auth import security
+from app.auth.keys import (
+    SigningKeys,
+    generate_signing_key,
+    parse_jwk,
+    public_jwk,
+    write_key_file,
+)
+from app.routers import security as security_router
+from manage import app as management_app
+
+runner = CliRunner()
+
+
+def write_keys(tmp_path, signing_kid, jwks_kids, keys):
+    write_key_file(str(tmp_path / "signing_key.json"), keys[signing_kid])
+    write_key_file(
+        str(tmp_path / "jwks.json"),
+        {"keys": [public_jwk(parse_jwk(keys[kid])) for kid in jwks_kids]},
+    )
+
+
+def create_signing_keys(tmp_path, reload_interval=60) -> SigningKeys:
+    return SigningKeys(
+        str(tmp_path / "signing_key.json"),
+        str(tmp_path / "jwks.json"),
+        reload_interval=reload_interval,
+        secret_key="TEST_KEY",
+    )
+
+
+@pytest.fixture
+def keys():
+    return {
+        "rsa-1": generate_signing_key("rsa-1", "RS256"),
+        "ed-1": generate_signing_key("ed-1", "EdDSA"),
+    }
+
+
+@pytest.mark.parametrize("kid", ["rsa-1", "ed-1"])
+def test_sign_and_verify(tmp_path, keys, kid):
+    write_keys(tmp_path, kid, [kid], keys)
+    signing_keys = create_signing_keys(tmp_path)
+
+    token = signing_keys.encode({"sub": "cla_admin"})
+    header = jwt.get_unverified_header(token)
+    assert header["kid"] == kid
+    assert header["alg"] == keys[kid]["alg"]
+    assert signing_keys.decode(token) == {"sub": "cla_admin"}
+
+
+@pytest.mark.parametrize("kid", ["rsa-1", "ed-1"])
+def test_verify_with_signing_key_only(tmp_path, keys, kid):
+    write_key_file(str(tmp_path / "signing_key.json"), keys[kid])
+    signing_keys = SigningKeys(
+        str(tmp_path / "signing_key.json"),
+        None,
+        reload_interval=60,
+        secret_key="TEST_KEY",
+    )
+
+    token = signing_keys.encode({"sub": "cla_admin"})
+    assert signing_keys.decode(token) == {"sub": "cla_admin"}
+    [jwk] = signing_keys.jwks()["keys"]
+    assert jwk["kid"] == kid
+    assert "d" not in jwk
+
+
+def test_jwks_has_only_public_keys(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1", "ed-1"], keys)
+    jwks = create_signing_keys(tmp_path).jwks()
+
+    assert [key["kid"] for key in jwks["keys"]] == ["rsa-1", "ed-1"]
+    assert all("d" not in key for key in jwks["keys"])
+
+
+def test_reject_unknown_and_missing_kid(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path)
+    other_key = parse_jwk(keys["ed-1"])
+
+    unknown_kid = jwt.encode(
+        {"sub": "cla_admin"}, other_key.key, algorithm="EdDSA", headers={"kid": "ed-1"}
+    )
+    with pytest.raises(InvalidTokenError, match="unknown key"):
+        signing_keys.decode(unknown_kid)
+
+    secret_key_token = jwt.encode({"sub": "cla_admin"}, "TEST_KEY", algorithm="HS256")
+    with pytest.raises(InvalidTokenError, match="no kid"):
+        signing_keys.decode(secret_key_token)
+
+
+def test_reject_token_signed_with_other_algorithm(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path)
+    other_key = parse_jwk(keys["ed-1"])
+
+    # Signed by another key, claiming to be the RSA key
+    token = jwt.encode(
+        {"sub": "cla_admin"}, other_key.key, algorithm="EdDSA", headers={"kid": "rsa-1"}
+    )
+    with pytest.raises(InvalidTokenError):
+        signing_keys.decode(token)
+
+
+def test_reject_symmetric_keys(tmp_path, keys):
+    write_key_file(str(tmp_path / "signing_key.json"), keys["rsa-1"])
+    write_key_file(
+        str(tmp_path / "jwks.json"),
+        {"keys": [{"kty": "oct", "k": "VEVTVF9LRVk", "kid": "secret"}]},
+    )
+    with pytest.raises(ValueError, match="HS256"):
+        create_signing_keys(tmp_path)
+
+
+def test_rotate_keys(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path, reload_interval=0)
+    old_token = signing_keys.encode({"sub": "cla_admin"})
+
+    # Publish the new key, then sign with it
+    write_keys(tmp_path, "rsa-1", ["rsa-1", "ed-1"], keys)
+    assert len(signing_keys.jwks()["keys"]) == 2
+    write_keys(tmp_path, "ed-1", ["rsa-1", "ed-1"], keys)
+    new_token = signing_keys.encode({"sub": "cla_admin"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "ed-1"
+    assert signing_keys.decode(old_token) == {"sub": "cla_admin"}
+
+    # Once tokens signed with the old key have expired, remove it
+    write_keys(tmp_path, "ed-1", ["ed-1"], keys)
+    assert signing_keys.decode(new_token) == {"sub": "cla_admin"}
+    with pytest.raises(InvalidTokenError):
+        signing_keys.decode(old_token)
+
+
+def test_keys_cached_between_reloads(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path, reload_interval=60)
+
+    write_keys(tmp_path, "ed-1", ["ed-1"], keys)
+    token = signing_keys.encode({"sub": "cla_admin"})
+    assert jwt.get_unverified_header(token)["kid"] == "rsa-1"
+
+
+def test_unknown_kid_reloads_keys(tmp_path, keys, monkeypatch):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path, reload_interval=60)
+    # Signed by another worker, which has already read the new key
+    write_keys(tmp_path, "ed-1", ["rsa-1", "ed-1"], keys)
+    other_worker = create_signing_keys(tmp_path)
+    token = other_worker.encode({"sub": "cla_admin"})
+
+    monkeypatch.setattr(signing_keys, "_checked_at", signing_keys._checked_at - 1)
+    assert signing_keys.decode(token) == {"sub": "cla_admin"}
+
+
+def test_reload_failure_keeps_keys(tmp_path, keys):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path, reload_interval=0)
+    token = signing_keys.encode({"sub": "cla_admin"})
+    errors = signing_keys.reload_errors.value
+
+    with open(tmp_path / "jwks.json", "w") as file:
+        file.write("{")
+    assert signing_keys.decode(token) == {"sub": "cla_admin"}
+    assert signing_keys.reload_errors.value == errors + 1
+
+
+def test_secret_key_without_signing_key():
+    signing_keys = SigningKeys(None, None, reload_interval=60, secret_key="TEST_KEY")
+    token = signing_keys.encode({"sub": "cla_admin"})
+
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert jwt.decode(token, "TEST_KEY", algorithms=["HS256"]) == {"sub": "cla_admin"}
+    assert signing_keys.jwks() == {"keys": []}
+
+
+def test_verify_token_with_published_keys(
+    client: TestClient, tmp_path, keys, monkeypatch
+):
+    write_keys(tmp_path, "rsa-1", ["rsa-1"], keys)
+    signing_keys = create_signing_keys(tmp_path)
+    monkeypatch.setattr(security, "signing_keys", signing_keys)
+    monkeypatch.setattr(security_router, "signing_keys", signing_keys)
+
+    response = client.post(
+        "latest/token", data={"username": "cla_admin", "password": "cla_admin"}
+    )
+    token = response.json()["access_token"]
+    response = client.get("latest/cases/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    # Another service verifies the token with the published keys
+    response = client.get("latest/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    jwk_set = jwt.PyJWKSet.from_dict(response.json())
+    key = jwk_set[jwt.get_unverified_header(token)["kid"]]
+    claims = jwt.decode(token, key.key, algorithms=[key.algorithm_name])
+    assert claims["sub"] == "cla_admin"
+
+
+def test_generate_and_remove_signing_key_commands(tmp_path):
+    jwks_file = str(tmp_path / "jwks.json")
+    for kid, algorithm in [("rsa-1", "RS256"), ("ed-1", "EdDSA")]:
+        result = runner.invoke(
+            management_app,
+            [
+                "generate-signing-key",
+                kid,
+                "--output",
+                str(tmp_path / f"{kid}.json"),
+                "--jwks-file",
+                jwks_file,
+                "--algorithm",
+                algorithm,
+            ],
+        )
+        assert result.exit_code == 0, result.stdout
+    assert os.stat(tmp_path / "ed-1.json").st_mode & 0o777 == 0o600
+
+    os.rename(tmp_path / "ed-1.json", tmp_path / "signing_key.json")
+    signing_keys = create_signing_keys(tmp_path)
+    assert [key["kid"] for key in signing_keys.jwks()["keys"]] == ["rsa-1", "ed-1"]
+
+    result = runner.invoke(
+        management_app, ["remove-signing-key", "rsa-1", "--jwks-file", jwks_file]
+    )
+    assert result.exit_code == 0, result.stdout
+    with open(jwks_file) as file:
+        assert [key["kid"] for key in json.load(file)["keys"]] == ["ed-1"]
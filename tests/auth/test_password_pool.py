@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from app.auth.password_pool import PasswordHashingPool, PasswordPoolSaturatedError
+from app.auth.security import get_password_hash, verify_password
+
+
+def test_password_pool_runs_function():
+    pool = PasswordHashingPool(workers=1, queue_size=0)
+    hashed_password = get_password_hash("password")
+    assert asyncio.run(pool.run(verify_password, "password", hashed_password))
+    assert pool.in_flight == 0
+
+
+def test_password_pool_rejects_when_saturated():
+    pool = PasswordHashingPool(workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def saturate():
+        blocked = [
+            asyncio.ensure_future(pool.run(release.wait)),
+            asyncio.ensure_future(pool.run(release.wait)),
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordPoolSaturatedError):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        # Slots are freed once the queued calls complete
+        return await pool.run(lambda: "done")
+
+    assert asyncio.run(saturate()) == "done"
+
+
+def test_login_returns_503_when_saturated(client: TestClient, monkeypatch):
+    pool = PasswordHashingPool(workers=1, queue_size=0)
+    release = threading.Event()
+    pool._executor.submit(release.wait)
+    assert pool._slots.acquire(blocking=False)
+    monkeypatch.setattr("app.auth.security.password_pool", pool)
+
+    response = client.post(
+        "latest/token",
+        data={"username": "cla_admin", "password": "cla_admin"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    release.set()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
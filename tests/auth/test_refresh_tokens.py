@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.auth import security
+from app.auth.refresh_tokens import hash_refresh_token, logins, refreshes, reused
+from app.models.refresh_tokens import RefreshToken
+from app.models.users import User
+
+
+@pytest.fixture
+def tokens(client: TestClient) -> dict:
+    response = client.post(
+        "latest/token", data={"username": "cla_admin", "password": "cla_admin"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(client: TestClient, refresh_token: str):
+    return client.post("latest/token/refresh", data={"refresh_token": refresh_token})
+
+
+def test_login_returns_hashed_refresh_token(session: Session, tokens):
+    refresh_token = session.get(
+        RefreshToken, hash_refresh_token(tokens["refresh_token"])
+    )
+    assert refresh_token.username == "cla_admin"
+    assert refresh_token.used_at is None
+    assert session.get(RefreshToken, tokens["refresh_token"]) is None
+
+
+def test_refresh(client: TestClient, session: Session, tokens, monkeypatch):
+    def verify_password(*args):
+        raise AssertionError("Refreshing a token should not verify a password")
+
+    monkeypatch.setattr(security, "verify_password", verify_password)
+    login_count, refresh_count = logins.value, refreshes.value
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["token_type"] == "bearer"
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert (logins.value, refreshes.value) == (login_count, refresh_count + 1)
+
+    response = client.get(
+        "latest/cases/",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    used = session.get(RefreshToken, hash_refresh_token(tokens["refresh_token"]))
+    rotated = session.get(RefreshToken, hash_refresh_token(refreshed["refresh_token"]))
+    assert used.used_at is not None
+    # Rotated tokens expire with the login they came from
+    assert (rotated.family_id, rotated.expires_at) == (used.family_id, used.expires_at)
+
+
+def test_login_counted(client: TestClient):
+    login_count = logins.value
+    client.post("latest/token", data={"username": "cla_admin", "password": "cla_admin"})
+    assert logins.value == login_count + 1
+
+
+def test_reused_refresh_token_revokes_family(
+    client: TestClient, session: Session, tokens
+):
+    reused_count = reused.value
+    refreshed = refresh(client, tokens["refresh_token"]).json()
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid refresh token"
+    assert reused.value == reused_count + 1
+
+    # The token issued in exchange for the reused token is revoked too
+    assert refresh(client, refreshed["refresh_token"]).status_code == 401
+    assert session.exec(select(RefreshToken)).all() == []
+
+
+def test_unknown_refresh_token(client: TestClient, tokens):
+    assert refresh(client, "unknown").status_code == 401
+    assert refresh(client, tokens["refresh_token"]).status_code == 200
+
+
+def test_expired_refresh_token(client: TestClient, session: Session, tokens):
+    refresh_token = session.get(
+        RefreshToken, hash_refresh_token(tokens["refresh_token"])
+    )
+    refresh_token.expires_at = datetime.now() - timedelta(hours=24)
+    session.add(refresh_token)
+    session.commit()
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_login_removes_expired_refresh_tokens(
+    client: TestClient, session: Session, tokens
+):
+    refresh_token = session.get(
+        RefreshToken, hash_refresh_token(tokens["refresh_token"])
+    )
+    refresh_token.expires_at = datetime.now() - timedelta(hours=24)
+    session.add(refresh_token)
+    session.commit()
+
+    client.post("latest/token", data={"username": "cla_admin", "password": "cla_admin"})
+    assert len(session.exec(select(RefreshToken)).all()) == 1
+    assert (
+        session.get(RefreshToken, hash_refresh_token(tokens["refresh_token"])) is None
+    )
+
+
+def test_refresh_disabled_user(client: TestClient, session: Session, tokens):
+    user = session.get(User, "cla_admin")
+    user.disabled = True
+    session.add(user)
+    session.commit()
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_revoke_refresh_token(client: TestClient, session: Session, tokens):
+    refreshed = refresh(client, tokens["refresh_token"]).json()
+
+    response = client.post(
+        "latest/token/revoke",
+        data={"refresh_token": refreshed["refresh_token"]},
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert response.status_code == 204
+    assert refresh(client, refreshed["refresh_token"]).status_code == 401
+    assert session.exec(select(RefreshToken)).all() == []
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.auth.revocation import RevocationList
+from app.auth.security import token_decode
+from app.config import Config
+from app.models.revoked_tokens import RevokedToken
+from app.models.users import User
+
+
+@pytest.fixture
+def claims_mode(monkeypatch):
+    monkeypatch.setattr(Config, "AUTH_VERIFICATION_MODE", "claims")
+
+
+def test_revoke_token(
+    client_authed: TestClient, session: Session, auth_token, test_revocation_list
+):
+    assert client_authed.get("latest/cases/").status_code == 200
+
+    response = client_authed.post("latest/token/revoke")
+    assert response.status_code == 204
+    revoked = session.get(RevokedToken, token_decode(auth_token)["jti"])
+    assert revoked.username == "cla_admin"
+
+    response = client_authed.get("latest/cases/")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Could not validate credentials"
+
+
+def test_revoked_token_read_by_other_workers(
+    client_authed: TestClient, session: Session, auth_token, test_revocation_list
+):
+    client_authed.post("latest/token/revoke")
+    # Another worker has not seen the revocation until it refreshes its list
+    test_revocation_list.revoked_tokens = frozenset()
+    assert client_authed.get("latest/cases/").status_code == 200
+
+    asyncio.run(test_revocation_list.refresh())
+    assert client_authed.get("latest/cases/").status_code == 401
+
+
+def test_claims_mode_trusts_token_scopes(
+    client_authed: TestClient, session: Session, test_revocation_list, claims_mode
+):
+    asyncio.run(test_revocation_list.refresh())
+    user = session.get(User, "cla_admin")
+    user.scopes = []
+    session.add(user)
+    session.commit()
+
+    # The token was issued with the read scope, so is accepted without reading the user.
+    assert client_authed.get("latest/cases/").status_code == 200
+
+
+def test_claims_mode_rejects_disabled_users(
+    client_authed: TestClient, session: Session, test_revocation_list, claims_mode
+):
+    user = session.get(User, "cla_admin")
+    user.disabled = True
+    session.add(user)
+    session.commit()
+    asyncio.run(test_revocation_list.refresh())
+
+    response = client_authed.get("latest/cases/")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User Disabled"
+
+
+def test_claims_mode_rejects_deleted_users(
+    client_authed: TestClient, session: Session, test_revocation_list, claims_mode
+):
+    asyncio.run(test_revocation_list.refresh())
+    assert client_authed.get("latest/cases/").status_code == 200
+
+    session.delete(session.get(User, "cla_admin"))
+    session.commit()
+    asyncio.run(test_revocation_list.refresh())
+
+    response = client_authed.get("latest/cases/")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Could not validate credentials"
+
+
+def test_claims_mode_reads_users_created_since_refresh(
+    client_authed: TestClient, test_revocation_list, claims_mode
+):
+    asyncio.run(test_revocation_list.refresh())
+    # The user was created by another process after the list was read
+    test_revocation_list.user_versions = {}
+    assert client_authed.get("latest/cases/").status_code == 200
+
+
+def test_claims_mode_checks_token_scopes(
+    client: TestClient, session: Session, test_revocation_list, claims_mode
+):
+    asyncio.run(test_revocation_list.refresh())
+    response = client.post(
+        "latest/token", data={"username": "cla_admin", "password": "cla_admin"}
+    )
+    token = response.json()["access_token"]
+    user = session.get(User, "cla_admin")
+    user.scopes = ["read"]
+    session.add(user)
+    session.commit()
+
+    # Scopes added after the token was issued are not trusted
+    client.headers["Authorization"] = f"Bearer {token}"
+    assert client.get("latest/cases/").status_code == 200
+    assert client.post("latest/cases/", json={}).status_code == 422
+
+
+def test_claims_mode_reads_database_until_loaded(
+    client_authed: TestClient, session: Session, test_revocation_list, claims_mode
+):
+    user = session.get(User, "cla_admin")
+    user.scopes = []
+    session.add(user)
+    session.commit()
+
+    assert not test_revocation_list.loaded
+    assert client_authed.get("latest/cases/").status_code == 401
+
+
+def test_refresh_failure_keeps_list():
+    def broken_session():
+        raise ConnectionError("Database unavailable")
+
+    revocations = RevocationList(broken_session, refresh_interval=30)
+    revocations.revoked_tokens = frozenset({"revoked"})
+    errors = revocations.refresh_errors.value
+
+    asyncio.run(revocations.refresh())
+    assert revocations.is_revoked("revoked")
+    assert not revocations.loaded
+    assert revocations.refresh_errors.value == errors + 1
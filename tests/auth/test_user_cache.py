@@ -0,0 +1,114 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+from sqlmodel import Session
+from typer.testing import CliRunner
+from app.auth.user_cache import cache_user, user_cache
+from app.cache import TTLCache
+from app.db.query_counter import QueryCounter
+from app.models.users import User
+from manage import app as management_app, init_session
+
+
+def test_ttl_cache_expires():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_cache_user_copies_user(session: Session):
+    user = session.get(User, "cla_admin")
+    # Read from the JSON column, so the scopes are strings rather than UserScopes
+    assert all(type(scope) is str for scope in user.scopes)
+
+    cached = cache_user(user)
+    assert cached is not user
+    assert cached.scopes == user.scopes
+    assert user_cache.get("cla_admin") is cached
+
+
+def test_authenticated_user_is_cached(client_authed: TestClient, session: Session):
+    assert client_authed.get("latest/cases/").status_code == 200
+    session.expunge_all()
+    with QueryCounter(session.get_bind()) as counter:
+        assert client_authed.get("latest/cases/").status_code == 200
+    assert not any("FROM users" in statement for statement in counter.statements)
+
+
+def test_cached_user_is_detached(client_authed: TestClient):
+    client_authed.get("latest/cases/")
+    cached_user = user_cache.get("cla_admin")
+    assert isinstance(cached_user, User)
+    assert cached_user._sa_instance_state.session_id is None
+
+
+def test_user_update_invalidates_cache(
+    client_authed: TestClient, session: Session, monkeypatch
+):
+    assert client_authed.get("latest/cases/").status_code == 200
+    assert user_cache.get("cla_admin") is not None
+
+    init_session(management_app, session)
+    monkeypatch.setattr("builtins.input", lambda prompt: "y")
+    CliRunner().invoke(management_app, ["update-user", "cla_admin", "--disable"])
+    assert user_cache.get("cla_admin") is None
+
+    response = client_authed.get("latest/cases/")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User Disabled"
+
+
+def test_user_delete_invalidates_cache(client_authed: TestClient, session: Session):
+    assert client_authed.get("latest/cases/").status_code == 200
+    session.delete(session.get(User, "cla_admin"))
+    session.commit()
+    assert client_authed.get("latest/cases/").status_code == 401
+
+
+def test_change_by_other_process_invalidates_cache(
+    client_authed: TestClient, session: Session, test_revocation_list
+):
+    asyncio.run(test_revocation_list.refresh())
+    assert client_authed.get("latest/cases/").status_code == 200
+    assert user_cache.get("cla_admin") is not None
+
+    # A bulk UPDATE does not run the ORM events, as with a change committed by another process
+    session.execute(
+        update(User).where(User.username == "cla_admin").values(disabled=True)
+    )
+    session.commit()
+    assert user_cache.get("cla_admin") is not None
+
+    asyncio.run(test_revocation_list.refresh())
+    assert user_cache.get("cla_admin") is None
+    response = client_authed.get("latest/cases/")
+    assert response.json()["detail"] == "User Disabled"
+
+
+def test_delete_by_other_process_invalidates_cache(
+    client_authed: TestClient, session: Session, test_revocation_list
+):
+    asyncio.run(test_revocation_list.refresh())
+    assert client_authed.get("latest/cases/").status_code == 200
+
+    session.execute(delete(User).where(User.username == "cla_admin"))
+    session.commit()
+    asyncio.run(test_revocation_list.refresh())
+    assert user_cache.get("cla_admin") is None
+    assert client_authed.get("latest/cases/").status_code == 401
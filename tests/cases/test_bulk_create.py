@@ -0,0 +1,97 @@
+import json
+from uuid import UUID
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app.config import Config
+from app.db.query_counter import QueryCounter
+from app.models.case_notes import CaseNote
+from app.models.cases import Case
+from app.models.person import Person
+from tests.cases.utils import get_case_test_data, assert_dicts_equal
+from app.models.cases import CaseResponse
+
+
+def test_bulk_create_cases(client_authed: TestClient, session: Session):
+    test_data = [get_case_test_data() for _ in range(3)]
+    response = client_authed.post("latest/cases/bulk", json=test_data)
+    assert response.status_code == 201
+    response_json = response.json()
+    assert response_json["created"] == 3
+    assert response_json["failed"] == 0
+    assert [result["index"] for result in response_json["results"]] == [0, 1, 2]
+
+    for result in response_json["results"]:
+        case = session.get(Case, UUID(result["id"]))
+        assert_dicts_equal(
+            CaseResponse.model_validate(case).model_dump(mode="json"), test_data[0]
+        )
+    assert len(session.exec(select(Person)).all()) == 3
+    assert len(session.exec(select(CaseNote)).all()) == 6
+
+
+def test_bulk_create_invalid_cases(client_authed: TestClient, session: Session):
+    test_data = [get_case_test_data(), {"case_type": "Not a case type"}, {}]
+    response = client_authed.post("latest/cases/bulk", json=test_data)
+    assert response.status_code == 207
+    response_json = response.json()
+    assert response_json["created"] == 1
+    assert response_json["failed"] == 2
+    results = response_json["results"]
+    assert results[0]["id"] is not None
+    assert results[1]["id"] is None
+    assert results[1]["errors"][0]["loc"] == ["case_type"]
+    assert results[2]["errors"][0]["type"] == "missing"
+    assert len(session.exec(select(Case)).all()) == 1
+
+
+def test_bulk_create_ndjson(client_authed: TestClient, session: Session):
+    lines = [json.dumps(get_case_test_data()) for _ in range(2)] + ["not json"]
+    response = client_authed.post(
+        "latest/cases/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 207
+    response_json = response.json()
+    assert response_json["created"] == 2
+    assert response_json["results"][2]["id"] is None
+    assert len(session.exec(select(Case)).all()) == 2
+
+
+def test_bulk_create_batches(client_authed: TestClient, session: Session, monkeypatch):
+    """Each batch should insert its rows with one statement per table."""
+    monkeypatch.setattr(Config, "BULK_CREATE_BATCH_SIZE", 2)
+    test_data = [get_case_test_data() for _ in range(5)]
+    with QueryCounter(session.get_bind()) as counter:
+        response = client_authed.post("latest/cases/bulk", json=test_data)
+    assert response.status_code == 201
+    inserts = [
+        statement for statement in counter.statements if statement.startswith("INSERT")
+    ]
+    # 3 batches, each inserting into the 6 case tables
+    assert len(inserts) == 18
+    assert len(session.exec(select(Case)).all()) == 5
+
+
+def test_bulk_create_too_many_cases(
+    client_authed: TestClient, session: Session, monkeypatch
+):
+    monkeypatch.setattr(Config, "BULK_CREATE_MAX_CASES", 2)
+    test_data = [get_case_test_data() for _ in range(3)]
+    response = client_authed.post("latest/cases/bulk", json=test_data)
+    assert response.status_code == 413
+    assert session.exec(select(Case)).all() == []
+
+
+def test_bulk_create_not_a_list(client_authed: TestClient):
+    response = client_authed.post("latest/cases/bulk", json=get_case_test_data())
+    assert response.status_code == 422
+
+
+def test_bulk_create_request_schema(client: TestClient):
+    openapi = client.get("latest/openapi.json").json()
+    content = openapi["paths"]["/latest/cases/bulk"]["post"]["requestBody"]["content"]
+    case_schema = "#/components/schemas/CaseRequest"
+    assert content["application/json"]["schema"]["items"]["$ref"] == case_schema
+    assert content["application/x-ndjson"]["schema"]["$ref"] == case_schema
+    assert "CaseRequest" in openapi["components"]["schemas"]
@@ -0,0 +1,95 @@
+import asyncio
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.cache.backends import LRUCacheBackend, RedisCacheBackend
+from app.cache.case_cache import CaseCache, case_cache, create_backend
+from app.config import Config
+from tests.cases.utils import create_test_case
+
+
+def test_read_case_cached(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    hits = case_cache.hits.value
+    misses = case_cache.misses.value
+
+    first = client_authed.get(f"latest/cases/{case.id}")
+    second = client_authed.get(f"latest/cases/{case.id}")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.headers["Content-Type"] == "application/json"
+    assert case_cache.misses.value == misses + 1
+    assert case_cache.hits.value == hits + 1
+
+
+def test_update_case_invalidates_cache(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    client_authed.get(f"latest/cases/{case.id}")
+    assert asyncio.run(case_cache.backend.get(f"case:{case.id}")) is not None
+
+    client_authed.put(f"latest/cases/{case.id}", json={"notes": []})
+    assert asyncio.run(case_cache.backend.get(f"case:{case.id}")) is None
+    assert client_authed.get(f"latest/cases/{case.id}").json()["notes"] == []
+
+
+def test_stale_cache_entry_not_used(client_authed: TestClient, session: Session):
+    """An entry for an older version of the case, i.e. cached by another worker, is never returned."""
+    case = create_test_case(session)
+    asyncio.run(case_cache.set(case.id, '"stale"', b'{"stale": true}'))
+
+    response = client_authed.get(f"latest/cases/{case.id}")
+    assert response.json()["id"] == str(case.id)
+    assert response.headers["ETag"] != '"stale"'
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUCacheBackend("test.cache", maxsize=2)
+    evictions = backend.evictions.value
+
+    async def fill():
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        await backend.get("a")
+        await backend.set("c", b"3")
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(fill()) == [b"1", None, b"3"]
+    assert backend.evictions.value == evictions + 1
+
+
+def test_redis_backend():
+    backend = RedisCacheBackend(
+        "test.redis_cache", url="", ttl=60, client=fakeredis.FakeAsyncRedis()
+    )
+    cache = CaseCache(backend)
+
+    async def round_trip():
+        await cache.set("case-id", '"etag"', b"{}")
+        cached = await cache.get("case-id", '"etag"')
+        cache.invalidate("case-id")
+        # Deletes are sent in the background
+        await asyncio.gather(*backend._deletes)
+        return cached, await cache.get("case-id", '"etag"')
+
+    assert asyncio.run(round_trip()) == (b"{}", None)
+
+
+def test_redis_backend_errors_are_misses():
+    class FailingClient:
+        async def get(self, key):
+            raise ConnectionError("Connection refused")
+
+    backend = RedisCacheBackend(
+        "test.redis_cache", url="", ttl=60, client=FailingClient()
+    )
+    errors = backend.errors.value
+    assert asyncio.run(CaseCache(backend).get("case-id", '"etag"')) is None
+    assert backend.errors.value == errors + 1
+
+
+def test_unknown_backend(monkeypatch):
+    monkeypatch.setattr(Config, "CASE_CACHE_BACKEND", "memcached")
+    with pytest.raises(ValueError):
+        create_backend(Config)
@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncScalarResult
+from sqlmodel import Session, select
+from app.config import Config
+from app.db.session import AsyncCustomSession
+from app.models.cases import Case, CaseResponse
+from app.routers.export import (
+    ExportFormat,
+    exported_rows,
+    stopped_exports,
+    stream_export,
+)
+from tests.cases.utils import create_test_case
+
+
+def test_export_ndjson(client_authed: TestClient, session: Session, monkeypatch):
+    # Smaller than the number of cases, so they are read in several chunks.
+    monkeypatch.setattr(Config, "CASE_EXPORT_CHUNK_SIZE", 2)
+    cases = [create_test_case(session) for _ in range(5)]
+    rows = exported_rows.value
+    first_case = client_authed.get(f"latest/cases/{cases[0].id}").json()
+
+    response = client_authed.get("latest/cases/export")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [str(case.id) for case in cases]
+    assert lines[0].pop("cursor")
+    assert lines[0] == first_case
+    assert exported_rows.value == rows + 5
+
+
+def test_export_csv(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+
+    response = client_authed.get("latest/cases/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/csv")
+    [row] = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(row) == [*CaseResponse.model_fields, "cursor"]
+    assert row["id"] == str(case.id)
+    assert row["case_type"] == "Check if your client qualifies for legal aid"
+    # Timestamps are in the same format as the NDJSON export and the JSON columns
+    [line] = client_authed.get("latest/cases/export").text.splitlines()
+    assert row["created_at"] == json.loads(line)["created_at"]
+    assert row["created_at"].endswith("Z")
+    assert json.loads(row["notes"])[0]["created_at"].endswith("Z")
+    assert [note["note_type"] for note in json.loads(row["notes"])] == [
+        "Other",
+        "Adaptation",
+    ]
+    assert json.loads(row["case_adaptations"])["languages"] == ["EN", "CY"]
+
+
+def test_export_resumes_from_cursor(client_authed: TestClient, session: Session):
+    cases = [create_test_case(session) for _ in range(3)]
+    lines = client_authed.get("latest/cases/export").text.splitlines()
+    cursor = json.loads(lines[0])["cursor"]
+
+    response = client_authed.get("latest/cases/export", params={"cursor": cursor})
+    ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+    assert ids == [str(case.id) for case in cases[1:]]
+
+
+def test_export_csv_resumes_from_cursor(client_authed: TestClient, session: Session):
+    cases = [create_test_case(session) for _ in range(3)]
+    response = client_authed.get("latest/cases/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    response = client_authed.get(
+        "latest/cases/export", params={"format": "csv", "cursor": rows[1]["cursor"]}
+    )
+    [row] = list(csv.DictReader(io.StringIO(response.text)))
+    assert row["id"] == str(cases[2].id)
+
+
+def test_export_filters(client_authed: TestClient, session: Session):
+    create_test_case(session)
+
+    response = client_authed.get(
+        "latest/cases/export", params={"case_type": "Civil Legal Advice"}
+    )
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_export_closes_cursor_when_stopped(session: Session, monkeypatch):
+    """When the client disconnects the response stops reading from the generator, which is then closed."""
+    for _ in range(3):
+        create_test_case(session)
+    closed = []
+    close = AsyncScalarResult.close
+
+    async def record_close(result):
+        closed.append(result)
+        await close(result)
+
+    monkeypatch.setattr(AsyncScalarResult, "close", record_close)
+    stopped = stopped_exports.value
+
+    async def read_first_chunk():
+        async_session = AsyncCustomSession(sync_session_class=lambda **kwargs: session)
+        chunks = stream_export(
+            async_session,
+            select(Case).order_by(Case.created_at),
+            CaseResponse,
+            ExportFormat.ndjson,
+            chunk_size=1,
+        )
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        return first
+
+    assert len(asyncio.run(read_first_chunk()).splitlines()) == 1
+    assert len(closed) == 1
+    assert stopped_exports.value == stopped + 1
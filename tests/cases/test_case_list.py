@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, UTC
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.models.cases import Case
+from app.models.eligibility_outcomes import (
+    EligibilityOutcomes,
+    EligibilityOutcomeType,
+    EligibilityType,
+)
+from app.models.types.case_types import CaseTypes
+
+
+def create_cases(session: Session, count: int, **kwargs) -> list[Case]:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    cases = [
+        Case(created_at=start + timedelta(minutes=index), **kwargs)
+        for index in range(count)
+    ]
+    session.add_all(cases)
+    session.commit()
+    return cases
+
+
+def read_all_pages(client: TestClient, url: str) -> list[dict]:
+    items = []
+    response_json = client.get(url).json()
+    items.extend(response_json["items"])
+    while response_json["next"]:
+        separator = "&" if "?" in url else "?"
+        response_json = client.get(
+            f"{url}{separator}cursor={response_json['next']}"
+        ).json()
+        items.extend(response_json["items"])
+    return items
+
+
+def test_read_all_cases_page(client_authed: TestClient, session: Session):
+    cases = create_cases(session, 3, case_type=CaseTypes.CLA)
+    response = client_authed.get("latest/cases/?limit=2")
+    assert response.status_code == 200
+    response_json = response.json()
+    assert [item["id"] for item in response_json["items"]] == [
+        str(case.id) for case in cases[:2]
+    ]
+    assert response_json["next"] is not None
+
+
+def test_read_all_cases_follows_cursor(client_authed: TestClient, session: Session):
+    cases = create_cases(session, 5, case_type=CaseTypes.CLA)
+    items = read_all_pages(client_authed, "latest/cases/?limit=2")
+    assert [item["id"] for item in items] == [str(case.id) for case in cases]
+
+
+def test_read_all_cases_same_created_at(client_authed: TestClient, session: Session):
+    """Cases created at the same time should not be skipped or repeated between pages."""
+    created_at = datetime(2024, 1, 1, tzinfo=UTC)
+    cases = [Case(case_type=CaseTypes.CLA, created_at=created_at) for _ in range(4)]
+    session.add_all(cases)
+    session.commit()
+    items = read_all_pages(client_authed, "latest/cases/?limit=1")
+    assert sorted(item["id"] for item in items) == sorted(
+        str(case.id) for case in cases
+    )
+
+
+def test_read_all_cases_filter_case_type(client_authed: TestClient, session: Session):
+    create_cases(session, 2, case_type=CaseTypes.CLA)
+    ccq_cases = create_cases(session, 2, case_type=CaseTypes.CCQ)
+    items = read_all_pages(
+        client_authed, f"latest/cases/?case_type={CaseTypes.CCQ.value}"
+    )
+    assert sorted(item["id"] for item in items) == sorted(
+        str(case.id) for case in ccq_cases
+    )
+
+
+def test_read_all_cases_filter_outcome(client_authed: TestClient, session: Session):
+    cases = create_cases(session, 2, case_type=CaseTypes.CLA)
+    session.add(
+        EligibilityOutcomes(
+            case_id=cases[1].id,
+            eligibility_type=EligibilityType.CCQ,
+            outcome=EligibilityOutcomeType.OUTOFSCOPE,
+            answers={},
+        )
+    )
+    session.commit()
+    items = read_all_pages(client_authed, "latest/cases/?outcome=Out of scope")
+    assert [item["id"] for item in items] == [str(cases[1].id)]
+
+
+def test_read_all_cases_filter_created(client_authed: TestClient, session: Session):
+    cases = create_cases(session, 5, case_type=CaseTypes.CLA)
+    items = read_all_pages(
+        client_authed,
+        "latest/cases/?created_after=2024-01-01T00:01:00&created_before=2024-01-01T00:03:00",
+    )
+    assert [item["id"] for item in items] == [str(case.id) for case in cases[1:3]]
+
+
+def test_read_all_cases_invalid_cursor(client_authed: TestClient):
+    response = client_authed.get("latest/cases/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_read_all_cases_limit_bounds(client_authed: TestClient):
+    assert client_authed.get("latest/cases/?limit=0").status_code == 422
+    assert client_authed.get("latest/cases/?limit=100000").status_code == 422
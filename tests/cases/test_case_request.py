@@ -1,8 +1,14 @@
 import time
 import uuid
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlmodel import Session
-from app.models.cases import Case
+from app.db.query_counter import QueryCounter
+from app.models.base import RelatedField
+from app.models.case_notes import CaseNote, CaseNotesUpdateRequest
+from app.models.case_tracker import CaseTracker, CaseTrackerUpdateRequest
+from app.models.cases import Case, CaseRequest, CaseUpdateRequest
 from tests.cases.utils import (
     assert_dicts_equal,
     get_case_test_data,
@@ -139,3 +145,59 @@ def test_case_update_invalid_id_request(client_authed: TestClient, session: Sess
 
     response = client_authed.put(f"latest/cases/{case.id}", json=test_data)
     assert response.status_code == 404
+
+
+def test_case_update_request_reads_related_instances_together(session: Session):
+    """Test that the related instances referenced by id are read with one query per model."""
+    cases = [create_test_case(session) for _ in range(3)]
+    note_ids = [note.id for case in cases for note in case.notes]
+    person_ids = [person.id for case in cases for person in case.people]
+    request = CaseUpdateRequest(
+        notes=[{"id": note_id, "content": "Updated"} for note_id in note_ids],
+        people=[
+            {"id": person_id, "name": "John Doe", "address": None, "email": None}
+            for person_id in person_ids
+        ],
+    )
+    session.expunge_all()
+
+    with QueryCounter(session.get_bind()) as counter:
+        data = request.translate(session)
+    assert counter.count == 2
+    assert [note.id for note in data["notes"]] == note_ids
+    assert all(note.content == "Updated" for note in data["notes"])
+    assert [person.id for person in data["people"]] == person_ids
+
+
+def test_case_update_request_missing_related_instance(session: Session):
+    case = create_test_case(session)
+    missing_id = uuid.uuid4()
+    request = CaseUpdateRequest(
+        notes=[{"id": case.notes[0].id}, {"id": missing_id}],
+    )
+    with pytest.raises(HTTPException) as error:
+        request.translate(session)
+    assert error.value.status_code == 404
+    assert error.value.detail == f"CaseNote with id {missing_id} not found"
+
+
+def test_case_request_translation_plan():
+    plan = CaseUpdateRequest.translation_plan()
+    # Built once per class
+    assert CaseUpdateRequest.translation_plan() is plan
+    assert plan.fields == {"case_type"}
+    assert plan.related["notes"] == RelatedField(CaseNotesUpdateRequest, many=True)
+    assert plan.related["case_tracker"] == RelatedField(
+        CaseTrackerUpdateRequest, many=False
+    )
+    assert set(plan.default_factories) == {"id", "created_at", "updated_at"}
+
+
+def test_case_request_translate_create(session: Session):
+    data = CaseRequest(**get_case_test_data()).translate(session, create=True)
+    assert data["case_type"] == "Check if your client qualifies for legal aid"
+    assert all(isinstance(note, CaseNote) for note in data["notes"])
+    assert isinstance(data["case_tracker"], CaseTracker)
+    # The defaults are set by the translation, as they are when the model is created
+    assert isinstance(data["id"], uuid.UUID)
+    assert data["notes"][0].id != data["notes"][1].id
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session
+from app.db.case_stats import read_case_stats
+from app.models.case_adaptations import CaseAdaptations
+from app.models.case_stats import DateBucket
+from app.models.cases import CaseRequest
+from tests.cases.utils import create_test_case, get_case_test_data
+
+
+def create_case_at(session: Session, created_at: datetime, **data):
+    case = CaseRequest(**{**get_case_test_data(), **data}).create(session)
+    case.created_at = created_at
+    session.add(case)
+    session.commit()
+    return case
+
+
+def test_case_stats(client_authed: TestClient, session: Session):
+    create_test_case(session)
+    create_test_case(session)
+    create_case_at(
+        session,
+        datetime.now(),
+        case_type="Civil Legal Advice",
+        notes=[],
+        eligibility_outcomes=[],
+        case_adaptations={"languages": ["CY"], "needed_adaptations": []},
+    )
+
+    response = client_authed.get("latest/cases/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total"] == 3
+    assert stats["case_types"] == [
+        {"value": "Check if your client qualifies for legal aid", "count": 2},
+        {"value": "Civil Legal Advice", "count": 1},
+    ]
+    assert stats["eligibility_outcomes"] == [
+        {"eligibility_type": "CCQ", "outcome": "In scope", "count": 2}
+    ]
+    assert stats["note_types"] == [
+        {"value": "Adaptation", "count": 2},
+        {"value": "Other", "count": 2},
+    ]
+    assert stats["adaptations"] == [
+        {"value": "BSL - Webcam", "count": 2},
+        {"value": "Text Relay", "count": 2},
+    ]
+    assert stats["languages"] == [
+        {"value": "CY", "count": 3},
+        {"value": "EN", "count": 2},
+    ]
+    assert stats["created"] == [
+        {"start": datetime.now().date().replace(day=1).isoformat(), "count": 3}
+    ]
+
+
+def test_case_stats_date_filters(client_authed: TestClient, session: Session):
+    create_case_at(session, datetime(2024, 1, 10))
+    create_case_at(session, datetime(2024, 1, 12))
+    create_case_at(session, datetime(2024, 2, 1))
+
+    stats = client_authed.get(
+        "latest/cases/stats",
+        params={"created_after": "2024-01-11T00:00:00", "bucket": "day"},
+    ).json()
+    assert stats["total"] == 2
+    assert stats["languages"] == [
+        {"value": "CY", "count": 2},
+        {"value": "EN", "count": 2},
+    ]
+    assert stats["created"] == [
+        {"start": "2024-01-12", "count": 1},
+        {"start": "2024-02-01", "count": 1},
+    ]
+
+    stats = client_authed.get(
+        "latest/cases/stats", params={"created_before": "2024-02-01T00:00:00"}
+    ).json()
+    assert stats["total"] == 2
+    assert stats["note_types"] == [
+        {"value": "Adaptation", "count": 2},
+        {"value": "Other", "count": 2},
+    ]
+    assert stats["created"] == [{"start": "2024-01-01", "count": 2}]
+
+
+def test_case_stats_weeks_start_on_monday(session: Session):
+    # 2024-01-07 is a Sunday and 2024-01-08 a Monday.
+    for day in (7, 8, 14):
+        create_case_at(session, datetime(2024, 1, day, 12))
+
+    stats = read_case_stats(session, bucket=DateBucket.week)
+    assert [(bucket.start.isoformat(), bucket.count) for bucket in stats.created] == [
+        ("2024-01-01", 1),
+        ("2024-01-08", 2),
+    ]
+
+
+def test_case_stats_null_adaptations(session: Session):
+    create_test_case(session)
+    # Stored as JSON null, rather than SQL NULL
+    session.execute(update(CaseAdaptations).values(languages=None))
+    session.commit()
+
+    stats = read_case_stats(session)
+    assert stats.languages == []
+    assert [count.value for count in stats.adaptations] == [
+        "BSL - Webcam",
+        "Text Relay",
+    ]
+
+
+def test_case_stats_cached(client_authed: TestClient, session: Session):
+    create_test_case(session)
+    assert client_authed.get("latest/cases/stats").json()["total"] == 1
+
+    create_test_case(session)
+    assert client_authed.get("latest/cases/stats").json()["total"] == 1
+    # Different filters are cached separately.
+    created_after = (datetime.now() - timedelta(days=1)).isoformat()
+    stats = client_authed.get(
+        "latest/cases/stats", params={"created_after": created_after}
+    ).json()
+    assert stats["total"] == 2
@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.db.etag import etag_matches
+from app.db.query_counter import QueryCounter
+from tests.cases.utils import create_test_case
+
+
+def test_read_case_etag(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    response = client_authed.get(f"latest/cases/{case.id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    # The ETag only changes when the case does
+    assert client_authed.get(f"latest/cases/{case.id}").headers["ETag"] == etag
+
+
+def test_read_case_not_modified(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    etag = client_authed.get(f"latest/cases/{case.id}").headers["ETag"]
+    session.expunge_all()
+
+    with QueryCounter(session.get_bind()) as counter:
+        response = client_authed.get(
+            f"latest/cases/{case.id}", headers={"If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # A single query reads the versions, without loading the case
+    assert counter.count == 1
+
+
+def test_read_case_modified(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    etag = client_authed.get(f"latest/cases/{case.id}").headers["ETag"]
+    case_json = client_authed.put(
+        f"latest/cases/{case.id}", json={"notes": [{"content": "A new note"}]}
+    ).json()
+
+    response = client_authed.get(
+        f"latest/cases/{case.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["notes"] == case_json["notes"]
+
+
+def test_read_case_not_modified_missing_case(client_authed: TestClient):
+    response = client_authed.get(
+        "latest/cases/2a5d3e1c-4f10-4f5f-9d2b-5a6d2c8f0b11",
+        headers={"If-None-Match": '"etag"'},
+    )
+    assert response.status_code == 404
+
+
+def test_update_case_etag(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    etag = client_authed.get(f"latest/cases/{case.id}").headers["ETag"]
+    response = client_authed.put(
+        f"latest/cases/{case.id}",
+        json={"case_type": "Civil Legal Advice"},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    # The ETag returned by the update matches the one read afterwards
+    assert client_authed.get(f"latest/cases/{case.id}").headers["ETag"] == new_etag
+
+
+def test_update_case_etag_changed(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    etag = client_authed.get(f"latest/cases/{case.id}").headers["ETag"]
+    client_authed.put(
+        f"latest/cases/{case.id}", json={"case_type": "Civil Legal Advice"}
+    )
+
+    response = client_authed.put(
+        f"latest/cases/{case.id}",
+        json={"case_type": "Check if your client qualifies for legal aid"},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 412
+    assert client_authed.get(f"latest/cases/{case.id}").json()["case_type"] == (
+        "Civil Legal Advice"
+    )
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    # Weak ETags only match when using weak comparison
+    assert not etag_matches('W/"a"', '"a"')
+    assert etag_matches('W/"a"', '"a"', weak=True)
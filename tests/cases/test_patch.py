@@ -0,0 +1,209 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.db.query_counter import QueryCounter
+from tests.cases.utils import create_test_case
+
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+
+
+def patch_case(client: TestClient, case_id, patch: dict, **kwargs):
+    return client.patch(
+        f"latest/cases/{case_id}",
+        json=patch,
+        headers={**MERGE_PATCH, **kwargs.pop("headers", {})},
+    )
+
+
+def test_patch_case_type(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    case_json = client_authed.get(f"latest/cases/{case.id}").json()
+
+    response = patch_case(client_authed, case.id, {"case_type": "Civil Legal Advice"})
+    assert response.status_code == 200
+    patched = response.json()
+    assert patched["case_type"] == "Civil Legal Advice"
+    # Everything missing from the patch is left unchanged
+    for field in ("notes", "people", "case_tracker", "eligibility_outcomes"):
+        assert patched[field] == case_json[field]
+    assert client_authed.get(f"latest/cases/{case.id}").json() == patched
+
+
+def test_patch_related_field(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    person = client_authed.get(f"latest/cases/{case.id}").json()["people"][0]
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"people": [{"id": person["id"], "phone_number": "01632 960 001"}]},
+    )
+    assert response.status_code == 200
+    [patched] = response.json()["people"]
+    # The required fields do not need to be sent
+    assert patched["phone_number"] == "01632 960 001"
+    assert patched["name"] == person["name"]
+    assert patched["email"] == person["email"]
+
+
+def test_patch_list_adds_and_removes(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    notes = client_authed.get(f"latest/cases/{case.id}").json()["notes"]
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"notes": [{"id": notes[1]["id"]}, {"content": "A new note"}]},
+    )
+    assert response.status_code == 200
+    patched_notes = client_authed.get(f"latest/cases/{case.id}").json()["notes"]
+    assert len(patched_notes) == 2
+    assert notes[0]["id"] not in [note["id"] for note in patched_notes]
+    assert {note["content"] for note in patched_notes} == {
+        notes[1]["content"],
+        "A new note",
+    }
+
+
+def test_patch_null_removes(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    response = patch_case(client_authed, case.id, {"notes": None, "case_tracker": None})
+    assert response.status_code == 200
+    case_json = client_authed.get(f"latest/cases/{case.id}").json()
+    assert case_json["notes"] == []
+    assert case_json["case_tracker"] is None
+
+
+def test_patch_one_to_one(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    tracker = client_authed.get(f"latest/cases/{case.id}").json()["case_tracker"]
+
+    response = patch_case(
+        client_authed, case.id, {"case_tracker": {"journey": {"a": 1}}}
+    )
+    assert response.status_code == 200
+    patched = response.json()["case_tracker"]
+    assert patched["id"] == tracker["id"]
+    assert patched["journey"] == {"a": 1}
+    assert patched["gtm_anon_id"] == tracker["gtm_anon_id"]
+
+
+def test_patch_json_merged(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    patch_case(
+        client_authed,
+        case.id,
+        {"case_tracker": {"journey": {"a": 1, "keep": {"x": 1}}}},
+    )
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"case_tracker": {"journey": {"b": 2, "keep": {"y": 2}}}},
+    )
+    assert response.status_code == 200
+    assert response.json()["case_tracker"]["journey"] == {
+        "a": 1,
+        "b": 2,
+        "keep": {"x": 1, "y": 2},
+    }
+
+
+def test_patch_json_null_removes_key(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    patch_case(
+        client_authed,
+        case.id,
+        {"case_tracker": {"journey": {"a": 1, "keep": {"x": 1}}}},
+    )
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"case_tracker": {"journey": {"a": None, "keep": {"x": None}, "b": None}}},
+    )
+    assert response.status_code == 200
+    journey = client_authed.get(f"latest/cases/{case.id}").json()["case_tracker"][
+        "journey"
+    ]
+    assert journey == {"keep": {}}
+
+
+def test_patch_invalid(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    person = client_authed.get(f"latest/cases/{case.id}").json()["people"][0]
+
+    response = patch_case(client_authed, case.id, {"case_type": None})
+    assert response.status_code == 422
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"people": [{"id": person["id"], "phone_number": "not a phone number"}]},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == [
+        "body",
+        "people",
+        0,
+        "phone_number",
+    ]
+    # A new person must have every required field
+    response = patch_case(client_authed, case.id, {"people": [{"name": "Jane"}]})
+    assert response.status_code == 422
+    assert client_authed.get(f"latest/cases/{case.id}").json()["people"] == [person]
+
+
+def test_patch_unknown_related_id(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    other_case = create_test_case(session)
+    other_note = client_authed.get(f"latest/cases/{other_case.id}").json()["notes"][0]
+
+    # Notes of another case cannot be patched through this case
+    response = patch_case(client_authed, case.id, {"notes": [{"id": other_note["id"]}]})
+    assert response.status_code == 404
+    assert client_authed.get(f"latest/cases/{case.id}").json()["notes"] != []
+
+
+def test_patch_missing_case(client_authed: TestClient):
+    response = patch_case(
+        client_authed,
+        "2a5d3e1c-4f10-4f5f-9d2b-5a6d2c8f0b11",
+        {"case_type": "Civil Legal Advice"},
+    )
+    assert response.status_code == 404
+
+
+def test_patch_if_match(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    etag = client_authed.get(f"latest/cases/{case.id}").headers["ETag"]
+    patch_case(client_authed, case.id, {"case_type": "Civil Legal Advice"})
+
+    response = patch_case(
+        client_authed,
+        case.id,
+        {"case_type": "Check if your client qualifies for legal aid"},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 412
+
+
+def test_patch_query_count(client_authed: TestClient, session: Session):
+    """Patching a single related instance should only update its row."""
+    case = create_test_case(session)
+    note_id = client_authed.get(f"latest/cases/{case.id}").json()["notes"][0]["id"]
+    notes_patch = [{"id": note_id, "content": "Changed"}, {"id": str(case.notes[1].id)}]
+    session.expunge_all()
+
+    with QueryCounter(session.get_bind()) as counter:
+        response = patch_case(client_authed, case.id, {"notes": notes_patch})
+    assert response.status_code == 200
+    writes = [
+        statement
+        for statement in counter.statements
+        if not statement.startswith("SELECT")
+    ]
+    assert len(writes) == 1
+    assert writes[0].startswith("UPDATE case_notes SET")
+    # Only the changed column is written, along with the timestamp
+    assert "content" in writes[0]
+    assert "note_type" not in writes[0]
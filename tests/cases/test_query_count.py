@@ -0,0 +1,93 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.cache.case_cache import case_cache
+from app.db.query_counter import QueryCounter
+from tests.cases.utils import create_test_case, get_case_test_data
+
+
+def count_queries(session: Session, client: TestClient, url: str) -> int:
+    # Make a request first so the authenticated user is cached, as it would be in the steady state.
+    client.get(url)
+    # Clear the session so every object has to be read from the database, as it would be in a new request.
+    session.expunge_all()
+    with QueryCounter(session.get_bind()) as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    return counter.count
+
+
+def test_read_all_cases_query_count(client_authed: TestClient, session: Session):
+    """The number of queries used to read a page of cases should not grow with the number of cases."""
+    create_test_case(session)
+    single_case_count = count_queries(session, client_authed, "latest/cases/")
+
+    for _ in range(5):
+        create_test_case(session)
+    many_cases_count = count_queries(session, client_authed, "latest/cases/")
+
+    assert single_case_count == many_cases_count
+
+
+def test_read_case_query_count(
+    client_authed: TestClient, session: Session, monkeypatch
+):
+    monkeypatch.setattr(case_cache, "backend", None)
+    case = create_test_case(session)
+    query_count = count_queries(session, client_authed, f"latest/cases/{case.id}")
+    # The case with its one-to-one relationships, and one query per collection.
+    assert query_count == 4
+
+
+def test_read_cached_case_query_count(client_authed: TestClient, session: Session):
+    case = create_test_case(session)
+    # Only the case's ETag is read, the response is cached by the first request
+    query_count = count_queries(session, client_authed, f"latest/cases/{case.id}")
+    assert query_count == 1
+
+
+def count_write_queries(session: Session, client: TestClient, send) -> list[str]:
+    # Make a request first so the authenticated user is cached, as it would be in the steady state.
+    client.get("latest/cases/")
+    session.expunge_all()
+    with QueryCounter(session.get_bind()) as counter:
+        response = send()
+    assert response.status_code in (200, 201)
+    return counter.statements
+
+
+def test_create_case_query_count(client_authed: TestClient, session: Session):
+    """Creating a case should insert into each table once, without reading anything back."""
+    statements = count_write_queries(
+        session,
+        client_authed,
+        lambda: client_authed.post("latest/cases/", json=get_case_test_data()),
+    )
+    # New rows are inserted within a savepoint, see CustomSession.commit.
+    assert statements[0].startswith("SAVEPOINT")
+    assert statements[-1].startswith("RELEASE SAVEPOINT")
+    inserts = statements[1:-1]
+    assert len(inserts) == 6
+    assert all(statement.startswith("INSERT") for statement in inserts)
+
+
+def test_update_case_query_count(client_authed: TestClient, session: Session):
+    """Updating a case should read it once, then only write the changed rows."""
+    case = create_test_case(session)
+    update = {
+        "case_type": "Civil Legal Advice",
+        "notes": [
+            {"id": str(case.notes[0].id), "content": "Updated content"},
+            {"id": str(case.notes[1].id)},
+        ],
+    }
+    statements = count_write_queries(
+        session,
+        client_authed,
+        lambda: client_authed.put(f"latest/cases/{case.id}", json=update),
+    )
+    reads = [statement for statement in statements if statement.startswith("SELECT")]
+    writes = statements[len(reads) :]
+    # The case with its one-to-one relationships, and one query per collection.
+    assert len(reads) == 4
+    assert len(writes) == 2
+    assert all(statement.startswith("UPDATE") for statement in writes)
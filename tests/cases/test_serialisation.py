@@ -0,0 +1,46 @@
+import json
+import uuid
+from sqlmodel import Session
+from app.models.cases import Case, CaseRequest, CaseResponse
+from app.routers.export import encode_ndjson
+from app.routers.responses import serialised_response
+from tests.cases.utils import create_test_case
+
+
+def assert_serialised_as_pydantic(case: Case):
+    """The fast path should produce exactly the same JSON as validating the case against its response model."""
+    expected = CaseResponse.model_validate(case).model_dump_json()
+    assert serialised_response(CaseResponse, case).body == expected.encode()
+
+
+def test_serialise_written_case(session: Session):
+    # Timestamps are timezone aware on instances which have just been written
+    assert_serialised_as_pydantic(create_test_case(session))
+
+
+def test_serialise_read_case(session: Session):
+    case_id = create_test_case(session).id
+    session.expunge_all()
+    case = session.get(Case, case_id, options=CaseResponse.load_options())
+    assert_serialised_as_pydantic(case)
+
+
+def test_serialise_minimal_case(session: Session):
+    case = CaseRequest(case_type="Civil Legal Advice").create(session)
+    assert_serialised_as_pydantic(case)
+    assert (
+        json.loads(serialised_response(CaseResponse, case).body)["case_tracker"] is None
+    )
+
+
+def test_serialise_driver_uuid(session: Session):
+    """asyncpg reads UUID columns as a subclass of UUID, which orjson does not encode itself."""
+
+    class DriverUUID(uuid.UUID):
+        pass
+
+    case = create_test_case(session)
+    expected = serialised_response(CaseResponse, case).body
+    case.id = DriverUUID(str(case.id))
+    assert serialised_response(CaseResponse, case).body == expected
+    assert json.loads(encode_ndjson(CaseResponse, [case]))["id"] == str(case.id)
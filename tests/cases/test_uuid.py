@@ -1,9 +1,17 @@
+import asyncio
 import pytest
+from types import SimpleNamespace
 from app.models.cases import Case
+from app.models.case_notes import CaseNote
+from app.models.users import User
 import uuid
-from sqlmodel import Session
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 from pydantic import ValidationError
 from app.models.types.case_types import CaseTypes
+from app.db.session import AsyncCustomSession, is_uuid_collision
+from app.metrics import registry
 
 
 def test_id_is_uuid():
@@ -26,6 +34,7 @@ def test_uuid_collision(session: Session):
     # As there was going to be a collision both UUIDs will be re-generated.
     assert case_1.id != case_id
     assert case_2.id != case_id
+    assert len(session.exec(select(Case)).all()) == 2
 
 
 # This test will raise a warning around conflicting IDs, this is what we are testing for so can safely ignore it.
@@ -45,6 +54,84 @@ def test_existing_uuid_collision(session: Session):
     assert (
         original_case.id == original_id
     )  # Ensure the original case keeps its original ID.
+    assert session.get(Case, new_case.id) is not None
+
+
+# This test will raise a warning around conflicting IDs, this is what we are testing for so can safely ignore it.
+@pytest.mark.filterwarnings("ignore: New instance")
+def test_uuid_collision_keeps_other_changes(session: Session):
+    """Only the savepoint is rolled back after a collision, changes to existing rows and new children should still
+    be written."""
+    retries = registry.counter(
+        "db.uuid_collision_retries",
+        "Flushes retried with new ids after a UUID4 collision",
+    )
+    retries_before = retries.value
+    original_case = Case(case_type=CaseTypes.CLA)
+    session.add(original_case)
+    session.commit()
+    original_case.case_type = CaseTypes.CCQ
+    original_case.notes.append(CaseNote(content="Added to the original case"))
+    new_case = Case(
+        id=original_case.id,
+        case_type=CaseTypes.CLA,
+        notes=[CaseNote(content="Added to the new case")],
+    )
+    session.add(new_case)
+    session.commit()
+    original_id, new_id = original_case.id, new_case.id
+    session.expunge_all()
+
+    assert retries.value == retries_before + 1
+    assert session.get(Case, original_id).case_type == CaseTypes.CCQ
+    notes = {note.content: note.case_id for note in session.exec(select(CaseNote))}
+    assert notes == {
+        "Added to the original case": original_id,
+        "Added to the new case": new_id,
+    }
+
+
+@pytest.mark.filterwarnings("ignore: New instance")
+def test_uuid_collision_max_retries(session: Session, monkeypatch):
+    existing_case = Case(case_type=CaseTypes.CLA)
+    session.add(existing_case)
+    session.commit()
+    # Every new id collides with the existing case
+    monkeypatch.setattr(uuid, "uuid4", lambda: existing_case.id)
+    session.add(Case(id=existing_case.id, case_type=CaseTypes.CLA))
+    with pytest.raises(HTTPException) as error:
+        session.commit()
+    assert error.value.status_code == 500
+
+
+def test_other_unique_violations_are_not_retried(session: Session):
+    """Only UUID primary keys can be fixed by generating a new id, a duplicate username should fail."""
+    session.add(User(username="cla_admin", hashed_password="password"))
+    with pytest.raises(IntegrityError):
+        session.commit()
+
+
+class PostgresError(Exception):
+    def __init__(self, sqlstate: str, constraint_name: str):
+        self.sqlstate = sqlstate
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+@pytest.mark.parametrize(
+    "sqlstate,constraint_name,expected",
+    [
+        ("23505", "cases_pkey", True),
+        ("23505", "case_notes_pkey", True),
+        ("23505", "users_pkey", False),
+        ("23505", "ix_some_unique_index", False),
+        ("23503", "cases_pkey", False),
+    ],
+)
+def test_is_uuid_collision_postgres(sqlstate, constraint_name, expected):
+    error = IntegrityError(
+        "INSERT", {}, PostgresError(sqlstate=sqlstate, constraint_name=constraint_name)
+    )
+    assert is_uuid_collision(error) is expected
 
 
 def test_invalid_uuid_int(session: Session):
@@ -55,3 +142,16 @@ def test_invalid_uuid_int(session: Session):
 def test_invalid_uuid_str(session: Session):
     with pytest.raises(ValidationError):
         Case(id="string", case_type=CaseTypes.CLA)
+
+
+def test_async_uuid_collision(session: Session):
+    """The asyncio session should commit using the CustomSession, so collisions are handled in the same way."""
+    async_session = AsyncCustomSession(sync_session_class=lambda **kwargs: session)
+    case_id = uuid.UUID("1b08fd0e-724f-4d6b-af74-2b7ce3432dbc")
+    case_1 = Case(id=case_id, case_type=CaseTypes.CLA)
+    case_2 = Case(id=case_id, case_type=CaseTypes.CLA)
+    async_session.add(case_1)
+    async_session.add(case_2)
+    asyncio.run(async_session.commit())
+    assert case_1.id != case_id
+    assert case_2.id != case_id
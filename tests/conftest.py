@@ -1,17 +1,33 @@
 import pytest
 from sqlmodel import SQLModel, create_engine, Session, StaticPool
 from app import case_api
-from app.db import get_session
-from app.db.session import CustomSession
+from app.db import get_session, get_async_session
+from app.db.session import CustomSession, AsyncCustomSession
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import sessionmaker
 
+from app.audit.writer import audit_log_writer
+from app.auth.revocation import revocation_list
 from app.auth.security import get_password_hash
+from app.auth.user_cache import user_cache
+from app.cache.backends import LRUCacheBackend
+from app.cache.case_cache import case_cache
+from app.config import Config
+from app.db.case_stats import stats_cache
 from app.models.users import User, UserScopes
 
 SECRET_KEY = "TEST_KEY"
 
 
+@pytest.fixture(autouse=True)
+def case_cache_backend(monkeypatch):
+    """Each test caches cases in a new memory backend, whichever backend is configured, so the cache is tested
+    without a shared server, and cases cached by previous tests are never read."""
+    backend = LRUCacheBackend("cases.cache", maxsize=Config.CASE_CACHE_SIZE)
+    monkeypatch.setattr(case_cache, "backend", backend)
+    return backend
+
+
 @pytest.fixture(name="session")
 def session_fixture():
     engine = create_engine(
@@ -21,6 +37,10 @@ def session_fixture():
         autocommit=False, autoflush=False, bind=engine, class_=CustomSession
     )
     SQLModel.metadata.create_all(engine)
+    # Each test has a new database, so users and cases cached by previous tests no longer exist.
+    user_cache.clear()
+    stats_cache.clear()
+    audit_log_writer.clear()
     users_to_add = [
         {"username": "cla_admin", "password": "cla_admin", "disabled": False},
         {"username": "jane_doe", "password": "password", "disabled": True},
@@ -54,7 +74,12 @@ def client_fixture(session: Session):
     def get_session_override():
         return session
 
+    def get_async_session_override():
+        # Wrap the test session so the API shares the same in-memory database and identity map as the tests.
+        return AsyncCustomSession(sync_session_class=lambda **kwargs: session)
+
     case_api.dependency_overrides[get_session] = get_session_override
+    case_api.dependency_overrides[get_async_session] = get_async_session_override
 
     client = TestClient(case_api)
     yield client
@@ -93,3 +118,18 @@ def auth_token_disabled_user(client):
     token_data = response.json()
     assert "access_token" in token_data
     return token_data["access_token"]
+
+
+@pytest.fixture
+def test_revocation_list(session: Session, monkeypatch):
+    """The revocation list, reading from the test database."""
+    monkeypatch.setattr(
+        revocation_list,
+        "session_factory",
+        lambda: AsyncCustomSession(sync_session_class=lambda **kwargs: session),
+    )
+    monkeypatch.setattr(revocation_list, "revoked_tokens", frozenset())
+    monkeypatch.setattr(revocation_list, "disabled_users", frozenset())
+    monkeypatch.setattr(revocation_list, "user_versions", {})
+    monkeypatch.setattr(revocation_list, "refreshed_at", None)
+    return revocation_list
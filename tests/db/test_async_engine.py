@@ -0,0 +1,124 @@
+import asyncio
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import case_api
+from app.audit.writer import AuditLogWriter
+from app.auth.security import get_password_hash
+from app.auth.user_cache import user_cache
+from app.db import get_async_read_session, get_async_session
+from app.db.session import AsyncCustomSession
+from app.models.audit_log import AuditLogEvent, EventType
+from app.models.cases import Case
+from app.models.users import User, UserScopes
+from tests.cases.utils import get_case_test_data
+
+
+@pytest.fixture
+def async_session_factory(tmp_path):
+    """Sessions of a real async engine, rather than the wrapped synchronous session used by other tests.
+
+    A file is used as each connection is opened on the event loop of the request using it.
+    """
+    path = tmp_path / "test.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        session.add(
+            User(
+                username="cla_admin",
+                hashed_password=get_password_hash("cla_admin"),
+                scopes=[UserScopes.CREATE, UserScopes.READ, UserScopes.UPDATE],
+            )
+        )
+        session.commit()
+    user_cache.clear()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    yield async_sessionmaker(
+        bind=engine, class_=AsyncCustomSession, expire_on_commit=False
+    )
+    asyncio.run(engine.dispose())
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def async_client(async_session_factory):
+    async def get_async_session_override():
+        async with async_session_factory() as session:
+            yield session
+
+    case_api.dependency_overrides[get_async_session] = get_async_session_override
+    case_api.dependency_overrides[get_async_read_session] = get_async_session_override
+    client = TestClient(case_api)
+    response = client.post(
+        "latest/token", data={"username": "cla_admin", "password": "cla_admin"}
+    )
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    yield client
+    case_api.dependency_overrides.clear()
+
+
+def test_timestamps_written_as_naive_utc():
+    dialect = asyncpg.dialect()
+    created_at = Case.__table__.c.created_at
+    process = created_at.type.bind_processor(dialect) or (lambda value: value)
+    bst = timezone(timedelta(hours=1))
+
+    # asyncpg rejects timezone aware values for timestamp without time zone columns
+    value = process(datetime(2024, 10, 17, 10, tzinfo=bst))
+    assert value == datetime(2024, 10, 17, 9)
+    assert value.tzinfo is None
+
+
+def test_write_and_filter_through_async_engine(async_client: TestClient):
+    before = datetime.now(UTC) - timedelta(seconds=1)
+    response = async_client.post("latest/cases/", json=get_case_test_data())
+    assert response.status_code == 201, response.text
+    case = response.json()
+
+    response = async_client.patch(
+        f"latest/cases/{case['id']}",
+        json={"case_type": "Civil Legal Advice"},
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    assert response.status_code == 200, response.text
+    patched = async_client.get(f"latest/cases/{case['id']}").json()
+    assert patched["case_type"] == "Civil Legal Advice"
+    assert datetime.fromisoformat(patched["updated_at"]) > before
+
+    response = async_client.post("latest/cases/bulk", json=[get_case_test_data()])
+    assert response.status_code == 201, response.text
+
+    # Filters can be timezone aware
+    response = async_client.get(
+        "latest/cases/", params={"created_after": before.isoformat()}
+    )
+    assert len(response.json()["items"]) == 2
+    response = async_client.get(
+        "latest/cases/", params={"created_before": before.isoformat()}
+    )
+    assert response.json()["items"] == []
+
+
+def test_audit_log_written_through_async_engine(async_session_factory):
+    writer = AuditLogWriter(
+        async_session_factory, max_size=10, batch_size=10, flush_interval=1
+    )
+    errors = writer.flush_errors.value
+    writer.record(EventType.user_authenticated, username="cla_admin")
+    asyncio.run(writer.flush())
+    assert writer.flush_errors.value == errors
+
+    async def read_events():
+        async with async_session_factory() as session:
+            return (await session.exec(select(AuditLogEvent))).all()
+
+    [event] = asyncio.run(read_events())
+    assert event.created_at.tzinfo == UTC
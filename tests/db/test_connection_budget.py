@@ -0,0 +1,21 @@
+import pytest
+from app.db.pool import ConnectionBudgetExceededError, check_connection_budget
+
+
+def test_connection_budget():
+    connections = check_connection_budget(
+        workers=4, pool_size=5, max_overflow=10, budget=100
+    )
+    assert connections == 60
+
+
+def test_connection_budget_exactly_used():
+    assert (
+        check_connection_budget(workers=2, pool_size=5, max_overflow=5, budget=20) == 20
+    )
+
+
+def test_connection_budget_exceeded():
+    with pytest.raises(ConnectionBudgetExceededError) as error:
+        check_connection_budget(workers=8, pool_size=5, max_overflow=10, budget=100)
+    assert "120 database connections" in str(error.value)
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+import app.db
+from app.db import get_async_read_session
+from app.db.replicas import (
+    PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    ReplicaSelector,
+    is_pinned_to_primary,
+)
+
+
+def fake_engine(name: str, checked_out: int = 0):
+    pool = SimpleNamespace(checkedout=lambda: checked_out)
+    return SimpleNamespace(name=name, sync_engine=SimpleNamespace(pool=pool))
+
+
+def request_with_cookie(cookie: str | None = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_round_robin():
+    selector = ReplicaSelector([fake_engine("a"), fake_engine("b")], "round_robin")
+    assert [selector.choose().name for _ in range(4)] == ["a", "b", "a", "b"]
+
+
+def test_least_connections():
+    selector = ReplicaSelector(
+        [fake_engine("a", checked_out=3), fake_engine("b", checked_out=1)],
+        "least_connections",
+    )
+    assert selector.choose().name == "b"
+
+
+def test_unknown_selection():
+    with pytest.raises(ValueError):
+        ReplicaSelector([fake_engine("a")], "random")
+
+
+def test_is_pinned_to_primary():
+    assert not is_pinned_to_primary(request_with_cookie())
+    assert is_pinned_to_primary(
+        request_with_cookie(f"{PRIMARY_COOKIE}={time.time() + 5}")
+    )
+    assert not is_pinned_to_primary(
+        request_with_cookie(f"{PRIMARY_COOKIE}={time.time() - 5}")
+    )
+    assert not is_pinned_to_primary(request_with_cookie(f"{PRIMARY_COOKIE}=invalid"))
+
+
+def read_session_bind(request: Request, monkeypatch) -> str:
+    """The engine used by the read session for a request, when there is a replica."""
+    replica = fake_engine("replica")
+    monkeypatch.setattr(app.db, "replica_selector", ReplicaSelector([replica]))
+    monkeypatch.setattr(
+        app.db, "AsyncCustomSessionLocal", lambda bind: FakeSessionContext(bind)
+    )
+    primary_session = SimpleNamespace(name="primary")
+
+    async def first_session():
+        sessions = get_async_read_session(request, primary_session)
+        session = await sessions.__anext__()
+        await sessions.aclose()
+        return session.name
+
+    return asyncio.run(first_session())
+
+
+class FakeSessionContext:
+    def __init__(self, bind):
+        self.bind = bind
+
+    async def __aenter__(self):
+        return self.bind
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def test_read_session_uses_replica(monkeypatch):
+    assert read_session_bind(request_with_cookie(), monkeypatch) == "replica"
+
+
+def test_read_session_pinned_to_primary(monkeypatch):
+    request = request_with_cookie(f"{PRIMARY_COOKIE}={time.time() + 5}")
+    assert read_session_bind(request, monkeypatch) == "primary"
+
+
+def test_read_your_writes_middleware():
+    pinned_app = FastAPI()
+    pinned_app.add_middleware(ReadYourWritesMiddleware, pin_seconds=5)
+
+    @pinned_app.get("/")
+    def read():
+        return {}
+
+    @pinned_app.post("/")
+    def write():
+        return {}
+
+    @pinned_app.put("/")
+    def failed_write():
+        raise HTTPException(status_code=400)
+
+    client = TestClient(pinned_app)
+    assert PRIMARY_COOKIE not in client.get("/").cookies
+    response = client.post("/")
+    pinned_until = float(response.cookies[PRIMARY_COOKIE])
+    assert time.time() < pinned_until <= time.time() + 5
+    # Failed writes did not change anything, so do not pin the client
+    assert PRIMARY_COOKIE not in TestClient(pinned_app).put("/").cookies
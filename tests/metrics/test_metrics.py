@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+from sqlmodel import create_engine
+from app.db.pool import instrumented_pool_class, register_pool_metrics
+from app.config import Config
+from app.metrics import MetricsRegistry, registry
+
+
+def test_counter():
+    counter = MetricsRegistry().counter("requests", "Requests served")
+    counter.inc()
+    counter.inc(2)
+    assert counter.value == 3
+
+
+def test_registry_returns_existing_metric():
+    metrics = MetricsRegistry()
+    assert metrics.counter("requests", "Requests served") is metrics.counter(
+        "requests", "Requests served"
+    )
+
+
+def test_timer_percentiles():
+    timer = MetricsRegistry().timer("latency", "Request latency")
+    for milliseconds in range(1, 101):
+        timer.observe(milliseconds / 1000)
+    snapshot = timer.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["max_seconds"] == 0.1
+    assert snapshot["p50_seconds"] == 0.051
+    assert snapshot["p99_seconds"] == 0.1
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=instrumented_pool_class("test_pool"),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    register_pool_metrics("test_pool", engine)
+
+    with engine.connect():
+        metrics = registry.snapshot()
+        assert metrics["db.pool.test_pool.checked_out"]["value"] == 1
+        # The pool is exhausted so the next checkout should time out
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    metrics = registry.snapshot()
+    assert metrics["db.pool.test_pool.checked_out"]["value"] == 0
+    assert metrics["db.pool.test_pool.checkout_wait"]["count"] == 2
+    assert metrics["db.pool.test_pool.checkout_wait"]["max_seconds"] >= 0.1
+    assert metrics["db.pool.test_pool.checkout_timeouts"]["value"] == 1
+
+
+def test_metrics_endpoint(client_authed: TestClient):
+    response = client_authed.get("latest/metrics/")
+    assert response.status_code == 200
+    metrics = response.json()
+    assert metrics["db.pool.primary.size"]["value"] == Config.DB_POOL_SIZE
+    assert "db.pool.primary.overflow" in metrics
+
+
+def test_metrics_endpoint_requires_auth(client: TestClient):
+    assert client.get("latest/metrics/").status_code == 401